@@ -0,0 +1,70 @@
+'''
+Benchmark of the adjacent-mine computation on large custom board sizes.
+
+Compares the historical per-cell loop (GameBoard._count_near_mines on every cell)
+with the pure-Python row-sum path and the NumPy path of src.model.neighbors.
+
+Usage: python -m benchmarks.bench_adjacent [--sizes 200 500 1000] [--density 0.15]
+'''
+import argparse
+import random
+import time
+
+from src.model.compact_board import CompactBoard
+from src.model.game_model import GameBoard
+from src.model.neighbors import HAS_NUMPY, count_adjacent_mines
+
+
+def make_board(size : int, density : float, seed : int = 0) -> GameBoard:
+    '''
+    Build a square board with randomly placed mines, without computing the counts.
+    '''
+    board = GameBoard.__new__(GameBoard)
+    board.rows = board.cols = size
+    board.board = CompactBoard(size, size)
+    rng = random.Random(seed)
+    for index in rng.sample(range(size * size), int(size * size * density)):
+        board.board.mines[index] = 1
+    return board
+
+
+def per_cell(board : GameBoard) -> bytearray:
+    adjacent = bytearray(board.board.size)
+    for row in range(board.rows):
+        for col in range(board.cols):
+            index = row * board.cols + col
+            if not board.board.mines[index]:
+                adjacent[index] = board._count_near_mines(row, col)
+    return adjacent
+
+
+def timed(func, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500, 1000])
+    parser.add_argument('--density', type=float, default=0.15)
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'per-cell':>10} {'python':>10} {'numpy':>10} {'speedup':>9}")
+    for size in args.sizes:
+        board = make_board(size, args.density)
+        t_cell, reference = timed(per_cell, board)
+        t_python, result = timed(count_adjacent_mines, board.board.mines, size, size, False)
+        assert result == reference
+        best = t_python
+        numpy_column = f"{'-':>10}"
+        if HAS_NUMPY:
+            t_numpy, result = timed(count_adjacent_mines, board.board.mines, size, size, True)
+            assert result == reference
+            best = t_numpy
+            numpy_column = f'{t_numpy:>9.3f}s'
+        print(f'{size:>8} {t_cell:>9.3f}s {t_python:>9.3f}s {numpy_column} {t_cell / best:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
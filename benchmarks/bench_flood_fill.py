@@ -0,0 +1,87 @@
+'''
+Benchmark of the opening reveal on large sparse boards, where one click opens most of the grid.
+
+Compares the former 8-neighbor stack fill with the scanline fill of src.model.flood_fill
+and reports the number of stack pushes of the former one.
+
+Usage: python -m benchmarks.bench_flood_fill [--sizes 500 2000] [--density 0.01]
+'''
+import argparse
+import random
+import time
+
+from src.model.compact_board import CompactBoard
+from src.model.flood_fill import reveal_opening
+from src.model.neighbors import count_adjacent_mines
+
+NEIGHBORS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+
+
+def make_board(size : int, density : float, seed : int = 0) -> CompactBoard:
+    board = CompactBoard(size, size)
+    rng = random.Random(seed)
+    for index in rng.sample(range(size * size), int(size * size * density)):
+        board.mines[index] = 1
+    board.adjacent = count_adjacent_mines(board.mines, size, size)
+    return board
+
+
+def stack_fill(board : CompactBoard, row : int, col : int) -> tuple[int, int]:
+    '''
+    The fill formerly used by GameBoard._reveal_adjacent_cells.
+    :return: The number of revealed cells and of stack pushes.
+    '''
+    revealed, adjacent = board.revealed, board.adjacent
+    stack = [(row, col)]
+    pushes = 1
+    count = 0
+    while stack:
+        r, c = stack.pop()
+        if not (0 <= r < board.rows and 0 <= c < board.cols):
+            continue
+        index = r * board.cols + c
+        if revealed[index]:
+            continue
+        revealed[index] = 1
+        count += 1
+        if adjacent[index] == 0:
+            for dx, dy in NEIGHBORS:
+                stack.append((r + dx, c + dy))
+                pushes += 1
+    return count, pushes
+
+
+def largest_zero(board : CompactBoard) -> int:
+    # Start from the first zero cell, on a sparse board it belongs to the main opening
+    for index in range(board.size):
+        if not board.mines[index] and board.adjacent[index] == 0:
+            return index
+    raise ValueError('No zero cell on the board')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000])
+    parser.add_argument('--density', type=float, default=0.01)
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'opened':>9} {'stack':>9} {'pushes':>10} {'scanline':>9} {'speedup':>8}")
+    for size in args.sizes:
+        board = make_board(size, args.density)
+        start_index = largest_zero(board)
+        row, col = divmod(start_index, size)
+
+        start = time.perf_counter()
+        opened, pushes = stack_fill(board, row, col)
+        t_stack = time.perf_counter() - start
+
+        board.revealed = bytearray(board.size)
+        start = time.perf_counter()
+        changed = reveal_opening(board, (start_index,))
+        t_scan = time.perf_counter() - start
+        assert len(changed) == opened
+        print(f'{size:>6} {opened:>9} {t_stack:>8.3f}s {pushes:>10} {t_scan:>8.3f}s {t_stack / t_scan:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
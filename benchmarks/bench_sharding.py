@@ -0,0 +1,75 @@
+'''
+Throughput of the game server as the sessions are sharded over more worker processes.
+
+For each number of workers, a server is started in its own process (0 workers: every session
+in the server process) and loaded by client processes playing sessions on large boards, where
+most of the work is the flood fill of the openings and the encoding of the revealed cells.
+Scaling needs free cores for the front process and the clients as well as the workers.
+
+Usage: python -m benchmarks.bench_sharding [--workers 0 1 2 4] [--clients 2] [--duration 5]
+'''
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from src.server.loadtest import LoadReport, run_load
+
+
+def start_server(workers : int) -> tuple[subprocess.Popen, int]:
+    process = subprocess.Popen([sys.executable, '-m', 'src.server', '--port', '0', '--workers', str(workers)],
+                               stdout=subprocess.PIPE, text=True)
+    # "Serving on host:port"
+    port = int(process.stdout.readline().rsplit(':', 1)[1])
+    return process, port
+
+
+def load(port : int, connections : int, sessions : int, duration : float, spec : dict, seed : int) -> LoadReport:
+    return asyncio.run(run_load(port=port, connections=connections, sessions=sessions, duration=duration,
+                                spec=spec, seed=seed))
+
+
+def measure(workers : int, clients : int, connections : int, sessions : int, duration : float,
+            spec : dict) -> LoadReport:
+    server, port = start_server(workers)
+    try:
+        with ProcessPoolExecutor(clients) as pool:
+            reports = list(pool.map(load, [port] * clients, [connections] * clients, [sessions] * clients,
+                                    [duration] * clients, [spec] * clients, range(clients)))
+    finally:
+        server.terminate()
+        server.wait()
+    return LoadReport(sum(report.sessions for report in reports), max(report.seconds for report in reports),
+                      [latency for report in reports for latency in report.latencies],
+                      sum(report.moves for report in reports), sum(report.errors for report in reports),
+                      sum(report.events for report in reports))
+
+
+def main() -> None:
+    cores = os.cpu_count()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=[0] + [2 ** i for i in range(cores.bit_length()) if 2 ** i <= max(cores - 2, 1)])
+    parser.add_argument('--clients', type=int, default=max(cores // 4, 1), help='load client processes')
+    parser.add_argument('--connections', type=int, default=50, help='connections per client process')
+    parser.add_argument('--sessions', type=int, default=20, help='sessions per connection')
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--size', type=int, default=120, help='rows and columns of the boards')
+    parser.add_argument('--density', type=float, default=0.12)
+    args = parser.parse_args()
+
+    spec = {'rows': args.size, 'cols': args.size, 'density': args.density}
+    print(f"{cores} cores, {args.clients} client processes, {args.clients * args.connections * args.sessions} "
+          f"sessions of {args.size}x{args.size} at density {args.density}")
+    base = None
+    for workers in args.workers:
+        report = measure(workers, args.clients, args.connections, args.sessions, args.duration, spec)
+        base = base or report.moves_per_second
+        print(f"workers {workers:>3}: {report.moves_per_second:>9,.0f} moves/s  x{report.moves_per_second / base:.2f}  "
+              f"p50 {report.percentile(0.5) * 1000:.2f} ms  p99 {report.percentile(0.99) * 1000:.2f} ms", flush=True)
+
+
+if __name__ == '__main__':
+    main()
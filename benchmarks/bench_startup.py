@@ -0,0 +1,62 @@
+'''
+Cold-start benchmark: time from launching the game to its first interactive frame.
+
+Each run starts a fresh interpreter on main.py with MINESWEEPER_STARTUP_BENCH=1, which makes
+the game print the time to its first frame and quit. Both the time measured inside the game
+(from the first line of main.py) and the wall time of the launch are reported.
+
+Usage: python -m benchmarks.bench_startup [--runs 10] [--offscreen] [--no-guess]
+'''
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+
+def cold_start(offscreen : bool, game_args : list[str]) -> tuple[float, float]:
+    '''
+    Launch the game once.
+    :return: The time to the first frame measured by the game and the wall time since the launch.
+    '''
+    env = dict(os.environ, MINESWEEPER_STARTUP_BENCH='1')
+    if offscreen:
+        env['QT_QPA_PLATFORM'] = 'offscreen'
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, MAIN, *game_args], env=env, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True)
+    in_game = None
+    for line in process.stdout:
+        if line.startswith('first_frame'):
+            in_game = float(line.split()[1])
+            break
+    wall = time.perf_counter() - start
+    process.wait()
+    if in_game is None:
+        raise RuntimeError(f"The game exited with code {process.returncode} before its first frame")
+    return in_game, wall
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--offscreen', action='store_true', help="use the offscreen Qt platform (no display)")
+    parser.add_argument('--no-guess', action='store_true', help="start the game in no-guess mode")
+    args = parser.parse_args()
+
+    game_args = ['--no-guess'] if args.no_guess else []
+    # One launch to warm the file system cache
+    cold_start(args.offscreen, game_args)
+    results = [cold_start(args.offscreen, game_args) for _ in range(args.runs)]
+
+    print(f"{'':>12} {'median':>9} {'min':>9} {'max':>9}")
+    for name, times in (('in game', [r[0] for r in results]), ('wall', [r[1] for r in results])):
+        print(f'{name:>12} {statistics.median(times) * 1000:>7.1f}ms {min(times) * 1000:>7.1f}ms '
+              f'{max(times) * 1000:>7.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+'''
+Benchmark suite of the hot paths of the model, the controller and the view.
+
+Every case is timed on square boards of each size and mine density, on `repeat` boards built
+from the same seeds, so that two runs measure the same work; the time of a board is the best
+of ROUNDS rounds. The reveal and update_view cases click the largest opening of the board.
+The results are written as JSON; the compare command flags the cases whose median time got
+slower between two result files.
+
+The update_view case drives GameController.update_view against an offscreen GameView
+(QT_QPA_PLATFORM=offscreen is set when no platform is chosen); the end-of-game dialogs and
+sounds are left out of the measurement. It is skipped when PyQt6 is not installed.
+
+Usage:
+    python -m benchmarks.suite run [-o results.json] [--sizes 16 64 256] [--densities 0.1 0.2] [--repeat 5]
+    python -m benchmarks.suite compare base.json results.json [--threshold 0.2]
+
+Timings of a fraction of a millisecond move by 10-40% between runs on a busy or virtualized
+machine: compare runs made on the same quiet machine, or raise the threshold.
+'''
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from src.model.game_model import GameBoard
+from src.model.neighbors import HAS_NUMPY
+from src.model.openings import OpeningIndex
+
+# Rounds per board: each board's time is the best of them
+ROUNDS = 3
+# Differences below this many seconds are noise, whatever their ratio
+NOISE_FLOOR = 5e-6
+
+
+def make_board(size : int, density : float, seed : int) -> GameBoard:
+    return GameBoard('Custom', rows=size, cols=size, density=density, seed=seed)
+
+
+def largest_opening(board : GameBoard) -> tuple[int, int] | None:
+    '''
+    A cell of the largest opening of the board, or None if it has no zero cell.
+    '''
+    openings = OpeningIndex(board.board)
+    if not len(openings):
+        return None
+    return divmod(max(openings.zeros, key=len)[0], board.cols)
+
+
+def first_number(board : GameBoard) -> tuple[int, int] | None:
+    grid = board.board
+    for index in range(grid.size):
+        if not grid.mines[index] and grid.adjacent[index]:
+            return divmod(index, board.cols)
+    return None
+
+
+# Each case builds its own state and returns the seconds spent in the measured call,
+# or None when the board has nothing to measure (e.g. no opening on a dense board).
+
+def bench_construct(size : int, density : float, seed : int) -> float:
+    start = time.perf_counter()
+    make_board(size, density, seed)
+    return time.perf_counter() - start
+
+
+def bench_place_mines(size : int, density : float, seed : int) -> float:
+    board = make_board(size, density, seed)
+    board.board = board._create_board()
+    start = time.perf_counter()
+    board._place_mines()
+    return time.perf_counter() - start
+
+
+def bench_set_adjacent_mines(size : int, density : float, seed : int) -> float:
+    board = make_board(size, density, seed)
+    start = time.perf_counter()
+    board._set_adjacent_mines()
+    return time.perf_counter() - start
+
+
+def bench_reveal_opening(size : int, density : float, seed : int) -> float | None:
+    board = make_board(size, density, seed)
+    cell = largest_opening(board)
+    if cell is None:
+        return None
+    start = time.perf_counter()
+    board._reveal_cell(*cell)
+    return time.perf_counter() - start
+
+
+def bench_reveal_number(size : int, density : float, seed : int) -> float | None:
+    board = make_board(size, density, seed)
+    cell = first_number(board)
+    if cell is None:
+        return None
+    start = time.perf_counter()
+    board._reveal_cell(*cell)
+    return time.perf_counter() - start
+
+
+def bench_check_victory(size : int, density : float, seed : int) -> float:
+    board = make_board(size, density, seed)
+    cell = largest_opening(board)
+    if cell is not None:
+        board._reveal_cell(*cell)
+    start = time.perf_counter()
+    board._check_victory()
+    return time.perf_counter() - start
+
+
+class ViewHarness:
+    '''
+    One offscreen GameView and a controller around it, reused across the boards of a size.
+    '''
+
+    def __init__(self) -> None:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        os.environ.setdefault('MINESWEEPER_AUDIO', 'null')
+        from PyQt6.QtWidgets import QApplication
+        from src.controller.game_controller import GameController
+        from src.controller.instrumentation import NullProfiler
+        from src.view.game_view import GameView
+        self.app = QApplication.instance() or QApplication(sys.argv[:1])
+        self.view_class, self.controller_class = GameView, GameController
+        self.null_profiler = NullProfiler
+        self.controller = None
+
+    def controller_for(self, board : GameBoard):
+        settings = board.get_board_settings()
+        if self.controller is None:
+            view = self.view_class(settings)
+            # Modal dialogs and sounds are not part of the measurement
+            view.show_message = view.play_sound = lambda *args: None
+            # The controller without its start-up (intro, save, replay, board pool)
+            self.controller = self.controller_class.__new__(self.controller_class)
+            self.controller.view, self.controller.recorder, self.controller.board_pool = view, None, None
+            self.controller.profiler = self.null_profiler()
+        else:
+            self.controller.view.reset(settings)
+        self.controller.model = board
+        return self.controller
+
+
+_harness = None
+
+
+def bench_update_view(size : int, density : float, seed : int) -> float | None:
+    global _harness
+    if _harness is None:
+        _harness = ViewHarness()
+    board = make_board(size, density, seed)
+    cell = largest_opening(board)
+    if cell is None:
+        return None
+    controller = _harness.controller_for(board)
+    board._reveal_cell(*cell)
+    start = time.perf_counter()
+    controller.update_view()
+    return time.perf_counter() - start
+
+
+CASES = {
+    'construct': bench_construct,
+    'place_mines': bench_place_mines,
+    'set_adjacent_mines': bench_set_adjacent_mines,
+    'reveal_opening': bench_reveal_opening,
+    'reveal_number': bench_reveal_number,
+    'check_victory': bench_check_victory,
+    'update_view': bench_update_view,
+}
+
+
+def has_qt() -> bool:
+    try:
+        import PyQt6.QtWidgets  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def run(cases : list[str], sizes : list[int], densities : list[float], repeat : int) -> dict:
+    '''
+    Time every case on every board.
+    :return: The results, as written to the JSON file.
+    '''
+    results = []
+    for name in cases:
+        if name == 'update_view' and not has_qt():
+            print("update_view skipped: PyQt6 is not installed", file=sys.stderr)
+            continue
+        for size in sizes:
+            for density in densities:
+                # Warm-up: caches, lazy imports, view rebuilt for the size
+                CASES[name](size, density, repeat)
+                times = []
+                for seed in range(repeat):
+                    # Best of a few rounds on the same board
+                    rounds = [CASES[name](size, density, seed) for _ in range(ROUNDS)]
+                    if rounds[0] is not None:
+                        times.append(min(rounds))
+                if not times:
+                    continue
+                result = {'case': name, 'size': size, 'density': density, 'runs': len(times),
+                          'min': min(times), 'median': statistics.median(times)}
+                results.append(result)
+                print(f"{key(result):<36} min {result['min'] * 1000:10.4f} ms  "
+                      f"median {result['median'] * 1000:10.4f} ms", flush=True)
+    return {
+        'meta': {'python': platform.python_version(), 'platform': platform.platform(), 'numpy': HAS_NUMPY,
+                 'repeat': repeat, 'date': time.strftime('%Y-%m-%dT%H:%M:%S')},
+        'results': results,
+    }
+
+
+def key(result : dict) -> str:
+    return f"{result['case']}/{result['size']}x{result['size']}/{result['density']}"
+
+
+def compare(base : dict, current : dict, threshold : float) -> list[str]:
+    '''
+    Compare the median times of the cases measured in both runs.
+    :return: The keys of the cases slower by more than `threshold` (0.2: 20%).
+    '''
+    before = {key(result): result for result in base['results']}
+    regressions = []
+    for result in current['results']:
+        old = before.get(key(result))
+        if old is None:
+            continue
+        ratio = result['median'] / old['median'] if old['median'] else float('inf')
+        noise = abs(result['median'] - old['median']) < NOISE_FLOOR
+        if ratio > 1 + threshold and not noise:
+            status = 'REGRESSION'
+            regressions.append(key(result))
+        elif ratio < 1 - threshold and not noise:
+            status = 'faster'
+        else:
+            status = ''
+        print(f"{key(result):<36} {old['median'] * 1000:10.4f} -> {result['median'] * 1000:10.4f} ms  "
+              f"x{ratio:6.2f}  {status}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    measure = commands.add_parser('run', help='run the benchmarks')
+    measure.add_argument('-o', '--output', help='JSON file of the results')
+    measure.add_argument('--cases', nargs='+', choices=sorted(CASES), default=list(CASES))
+    measure.add_argument('--sizes', type=int, nargs='+', default=[16, 64, 256])
+    measure.add_argument('--densities', type=float, nargs='+', default=[0.1, 0.15, 0.2])
+    measure.add_argument('--repeat', type=int, default=5)
+    check = commands.add_parser('compare', help='flag the regressions between two runs')
+    check.add_argument('base')
+    check.add_argument('current')
+    check.add_argument('--threshold', type=float, default=0.2, help='slowdown flagged, as a fraction')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        results = run(args.cases, args.sizes, args.densities, args.repeat)
+        if args.output:
+            with open(args.output, 'w') as file:
+                json.dump(results, file, indent=1)
+        return
+
+    with open(args.base) as file:
+        base = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    regressions = compare(base, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regressions over {args.threshold:.0%}")
+        raise SystemExit(1)
+    print("No regression")
+
+
+if __name__ == '__main__':
+    main()
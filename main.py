@@ -1,16 +1,45 @@
+import time
+START = time.perf_counter()
+
+import argparse
+import os
 import sys
+from PyQt6.QtCore import QEvent, QObject, QTimer
 from PyQt6.QtWidgets import QApplication
 from src.controller.game_controller import GameController
 
+class FirstFrameProbe(QObject):
+    '''
+    Startup benchmark (MINESWEEPER_STARTUP_BENCH=1): print the time to the first frame of the window and quit.
+    The window is interactive once the event loop is back to idle after its first paint.
+    '''
+    def eventFilter(self, obj : QObject, event : QEvent) -> bool:
+        if event.type() == QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            QTimer.singleShot(0, self.report)
+        return False
+
+    def report(self) -> None:
+        print(f"first_frame {time.perf_counter() - START:.6f}", flush=True)
+        QApplication.instance().exit(0)
+
 def main():
-    
-    app = QApplication(sys.argv)
-    
-    controller = GameController()
-    
+
+    parser = argparse.ArgumentParser(description="Haunted Manor - Minesweeper")
+    parser.add_argument('--no-guess', action='store_true', help="only deal boards solvable without guessing")
+    parser.add_argument('--profile', nargs='?', const='1', metavar='PATH',
+                        help="time the phases of each click, report on exit (and write it as JSON to PATH)")
+    # Unknown arguments are left to Qt
+    args, qt_args = parser.parse_known_args()
+
+    app = QApplication(sys.argv[:1] + qt_args)
+
+    controller = GameController(no_guess=args.no_guess, profile=args.profile)
+    if os.environ.get('MINESWEEPER_STARTUP_BENCH'):
+        probe = FirstFrameProbe()
+        controller.view.installEventFilter(probe)
+
     sys.exit(app.exec())
-    
+
 if __name__ == '__main__':
     main()
-
-
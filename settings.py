@@ -22,10 +22,24 @@ FLOOR_SOUNDS = [
 ]
 
 NUMBERS_SOUNDS = [
-    os.path.join(BASE_DIR, 'minesweeper', 'src', 'assets', 'sounds', 'number', f'{i}.wav')
+    os.path.join(BASE_DIR, 'minesweeper', 'src', 'assets', 'sounds', 'number', f'{i}.mp3')
     for i in range(1, 4)
 ]
 
+# Saved game, written on exit when a game is in progress
+SAVE_PATH = os.environ.get('MINESWEEPER_SAVE_PATH',
+                           os.path.join(os.path.expanduser('~'), '.haunted_manor', 'save.hmsv'))
+
+# Replays of the games played (seed, board size and clicks), appended when a game is left
+REPLAY_PATH = os.environ.get('MINESWEEPER_REPLAY_PATH',
+                             os.path.join(os.path.expanduser('~'), '.haunted_manor', 'replays.hmrp'))
+
+# Number of replays the replay file keeps, the oldest are dropped; 0 turns the recording off
+MAX_REPLAYS = int(os.environ.get('MINESWEEPER_MAX_REPLAYS', '100'))
+
+# Click latency instrumentation: '' off, '1' report on exit, or the path of a JSON report
+PROFILE = os.environ.get('MINESWEEPER_PROFILE', '')
+
 # Images paths
 ICON_PATH = os.path.join(BASE_DIR, 'minesweeper', 'src', 'assets', 'images', 'icon.png')
 
@@ -51,6 +65,9 @@ GAME_STATUS = [
     os.path.join(BASE_DIR, 'minesweeper', 'src', 'assets', 'images', 'intro', '2.png')
 ]
 
+# Random choice of the sprites and sounds, separate from the RNG of the games
+ASSETS_RNG = random.Random()
+
 # Choose a random image from a list
 def get_random_image(image_list : str) -> str:
     '''
@@ -66,4 +83,4 @@ def get_random_image(image_list : str) -> str:
         case 'floor_sound' :
             list = FLOOR_SOUNDS
             
-    return random.choice(list)
+    return ASSETS_RNG.choice(list)
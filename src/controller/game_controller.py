@@ -1,16 +1,48 @@
+import os
+import sys
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+import settings as st
+from ..model.endless import EndlessBoard
 from ..model.game_model import GameBoard
+from ..model.persistence import SaveFormatError, load_game, save_game
+from ..model.replay import ReplayRecorder, save_replays
 from ..view.game_view import GameView, CustomButton
+from .instrumentation import create_profiler
 
 class GameController:
 
-    def __init__(self):
+    def __init__(self, *, no_guess : bool = False, profile : str = None):
         
-        self.model = GameBoard()
+        # Click latency histograms, see instrumentation (no-ops unless enabled)
+        self.profiler = create_profiler(st.PROFILE if profile is None else profile)
+        # No-guess boards are generated in background processes
+        self.board_pool = None
+        if no_guess:
+            # Imported here: the process pool machinery is not needed for the classic mode
+            from ..model.generator import NoGuessPool
+            self.board_pool = NoGuessPool()
+        if self.board_pool is not None and QApplication.instance() is not None:
+            QApplication.instance().aboutToQuit.connect(self.board_pool.shutdown)
+        self.model = self.create_model(*GameBoard.DIFFICULTIES['Easy'], 'Easy')
+        self.start_recording()
         self.view = GameView(self.model.get_board_settings())
-        self.view.show_message('intro')
+        self.profiler.instrument(self.view)
+        # The intro dialog waits for the board to be on screen
+        QTimer.singleShot(0, self.show_intro)
+        # The game in progress is saved when the application quits
+        if QApplication.instance() is not None:
+            QApplication.instance().aboutToQuit.connect(self.save_on_exit)
+            QApplication.instance().aboutToQuit.connect(self.profiler.dump)
         # Connect buttons in the view to their respective handler methods
         self.connect_buttons()
+        # Show the start opening of a no-guess board
+        self.update_view()
             
+    @property
+    def endless(self) -> bool:
+        return isinstance(self.model, EndlessBoard)
+
     def connect_buttons(self) -> None:
         '''
         Conenct the buttons and combo Box
@@ -19,22 +51,135 @@ class GameController:
         self.view.difficulty_selector.currentIndexChanged.connect(self.on_difficulty_changed)
         self.view.new_game_button.clicked.connect(self.on_new_game_clicked)
         self.view.help_button.clicked.connect(self.on_help_clicked)
+        self.view.undo_shortcut.activated.connect(self.undo)
+        self.view.redo_shortcut.activated.connect(self.redo)
         
-        buttons = self.view.get_buttons()
-        for row in buttons:
-            for btn in row:
-                btn.click_signal.connect(self.handle_button_click)
+        self.view.connect_cell_clicks(self.handle_button_click)
             
     def handle_button_click(self, click_type : str, button : CustomButton) -> None:
         '''
-        Handle button click event based on type (left or right).
+        Handle button click event based on type (left, right or chord).
         '''
         if not self.model.is_game_over and not self.model.is_game_won:
-            if click_type == "left":
-                self.model._reveal_cell(button.row, button.col)
-            elif click_type == "right":
-                self.model._flag_cell(button.row, button.col)
-                
+            with self.profiler.click():
+                if self.recorder is not None:
+                    self.recorder.record(click_type, button.row, button.col)
+                with self.profiler.phase('model'):
+                    if click_type == "left":
+                        self.model._reveal_cell(button.row, button.col)
+                    elif click_type == "right":
+                        self.model._flag_cell(button.row, button.col)
+                    elif click_type == "chord":
+                        # All the neighbors at once, refreshed by a single update_view
+                        self.model._chord_cell(button.row, button.col)
+                    
+                self.update_view()
+
+    def show_intro(self) -> None:
+        '''
+        Show the intro, then offer to resume the game saved on the last exit.
+        '''
+        self.view.show_message('intro')
+        self.offer_resume()
+
+    def offer_resume(self) -> None:
+        '''
+        Restore the saved game if there is one and the player wants it; a declined save is deleted.
+        '''
+        if not os.path.exists(st.SAVE_PATH):
+            return
+        model = None
+        if self.view.ask_resume():
+            try:
+                model = load_game(st.SAVE_PATH)
+            except (OSError, SaveFormatError) as error:
+                print(f"Could not resume the saved game: {error}", file=sys.stderr)
+        if model is None:
+            self.delete_save()
+            return
+        self.save_replay()
+        self.close_model()
+        self.model = model
+        # A restored board has no seed, it can't be replayed
+        self.start_recording()
+        if self.view.reset(self.model.get_board_settings()):
+            self.view.connect_cell_clicks(self.handle_button_click)
+        # Paint the cells already revealed or flagged
+        self.model._record_visible_cells()
+        self.update_view()
+
+    def save_on_exit(self) -> None:
+        '''
+        Save the game if it is in progress, otherwise forget the previous save.
+        '''
+        self.save_replay()
+        model = self.model
+        if self.endless:
+            # Endless games are not saved
+            self.close_model()
+            self.delete_save()
+            return
+        started = model.count_flags > 0 or model.safe_remaining < model.rows * model.cols - model.num_mines
+        if not started or model.is_game_over or model.is_game_won:
+            self.delete_save()
+            return
+        try:
+            save_game(model, st.SAVE_PATH)
+        except OSError as error:
+            print(f"Could not save the game: {error}", file=sys.stderr)
+
+    def start_recording(self) -> None:
+        '''
+        Record the clicks of the current game, if its board can be rebuilt from a seed
+        and the replays are kept (MAX_REPLAYS).
+        '''
+        seeded = not self.endless and self.model.seed is not None
+        self.recorder = ReplayRecorder(self.model) if seeded and st.MAX_REPLAYS > 0 else None
+
+    def save_replay(self) -> None:
+        '''
+        Append the replay of the current game to the replay file, once it has clicks.
+        The file keeps the last MAX_REPLAYS games.
+        '''
+        if self.recorder is None or not self.recorder.replay.clicks:
+            return
+        replay = self.recorder.finish(self.model)
+        self.recorder = None
+        try:
+            os.makedirs(os.path.dirname(st.REPLAY_PATH), exist_ok=True)
+            save_replays([replay], st.REPLAY_PATH, append=True, keep=st.MAX_REPLAYS)
+        except OSError as error:
+            print(f"Could not save the replay: {error}", file=sys.stderr)
+
+    def close_model(self) -> None:
+        '''
+        Release the chunk cache of an endless game that is left.
+        '''
+        if self.endless:
+            self.model.close()
+
+    def delete_save(self) -> None:
+        try:
+            os.remove(st.SAVE_PATH)
+        except FileNotFoundError:
+            pass
+
+    def undo(self) -> None:
+        '''
+        Take back the last move (also after a game over).
+        '''
+        if self.model.undo():
+            if self.recorder is not None:
+                self.recorder.record('undo')
+            self.update_view()
+
+    def redo(self) -> None:
+        '''
+        Play again the last move taken back.
+        '''
+        if self.model.redo():
+            if self.recorder is not None:
+                self.recorder.record('redo')
             self.update_view()
 
     def on_difficulty_changed(self) -> None:
@@ -43,6 +188,9 @@ class GameController:
         :param index: The index of the selected item in the combo box.
         '''
         self.model.difficulty = self.view.difficulty_selector.currentText()
+        if self.board_pool is not None and self.model.difficulty in GameBoard.DIFFICULTIES:
+            # Start generating boards of the new difficulty before New Game is clicked
+            self.board_pool.prepare(*GameBoard.DIFFICULTIES[self.model.difficulty], self.model.difficulty)
         
     def on_new_game_clicked(self) -> None:
         '''
@@ -60,59 +208,95 @@ class GameController:
         '''
         Initialize a new game according to the chosen difficulty (call the model's methods to generate a new grid).
         '''
-        difficulty = self.model.get_difficulty()
-        
-        # Clean up old view and model
-        if hasattr(self, 'view') and self.view:
-            # Mark the old view for deletion
-            self.view.deleteLater()  
+        rows, cols, num_mines, difficulty = self.model.get_board_settings()
             
-        # Create new model and view instances  
-        self.model = GameBoard(difficulty)
-        self.view = GameView(self.model.get_board_settings())
-        # Reconnect the buttons
-        self.connect_buttons()
+        # Create the new model, the view is reused
+        if difficulty in GameBoard.DIFFICULTIES:
+            rows, cols, num_mines = GameBoard.DIFFICULTIES[difficulty]
+        self.save_replay()
+        self.close_model()
+        self.model = self.create_model(rows, cols, num_mines, difficulty)
+        self.start_recording()
+        if self.view.reset(self.model.get_board_settings()):
+            # The board changed size: connect the new cells
+            self.view.connect_cell_clicks(self.handle_button_click)
+        self.update_view()
+
+    def create_model(self, rows : int, cols : int, num_mines : int, difficulty : str) -> GameBoard:
+        '''
+        Create the board of a new game.
+        In no-guess mode, the board is taken from the background pool and its start opening is revealed.
+        An endless board starts with the opening around (0, 0), which never holds a mine.
+        '''
+        if difficulty == EndlessBoard.DIFFICULTY:
+            model = EndlessBoard()
+            model._reveal_cell(0, 0)
+            return model
+        if self.board_pool is None:
+            if difficulty == 'Custom':
+                return GameBoard(rows=rows, cols=cols, num_mines=num_mines)
+            return GameBoard(difficulty)
+        generated = self.board_pool.get(rows, cols, num_mines, difficulty)
+        if generated is None:
+            # The pool is still warming up: generate in place (a few milliseconds for the presets)
+            from ..model.generator import NoGuessGenerator
+            generated = NoGuessGenerator(rows, cols, num_mines, difficulty).generate()
+        model, start = generated
+        model._reveal_cell(*start)
+        # The start opening is part of the board, not a move to undo
+        model.history.clear()
+        return model
         
     def update_view(self) -> None:
         """
         Update the view based on the model.
-        This method updates each button to reflect the state of the corresponding cell in the model.
+        Only the cells changed by the last model operations are repainted,
+        so the cost follows the size of the move and not the size of the board.
         """
-        for row in range(self.model.rows):
-            for col in range(self.model.cols):
-                cell = self.model.board[row][col]
-                button = self.view.get_buttons()[row][col]
-                
-                # Update button appearance based on flagged status
-                if cell.is_flagged:
-                    self.view.flag_cell(True, button)
-                else:
-                    self.view.flag_cell(False, button)
-                    
-                # Update button appearance based on reveal status
-                if cell.is_revealed:
-                    # SPIRITS
-                    if cell.is_mine:
-                        self.view.reveal_cell('mine', button)
-                    elif cell.adjacent_mines == 0:
-                        # FLOOR
-                        self.view.reveal_cell('safe', button)
-                    else:
-                        self.view.reveal_cell('number', button, cell.adjacent_mines)
-                else:
-                    button.setText("")  # Clear text if the cell is not revealed
-
+        with self.profiler.phase('repaint'):
+            buttons = self.view.get_buttons()
+            changed = self.model.pop_changed_cells()
+            for row, col in changed:
+                self.update_cell(row, col, buttons[row][col])
+            # mine_counter updated in view
+            self.update_mine_counter()
+        self.profiler.count('cells', len(changed))
     
         # game over or win check
         self.game_over_or_win_check()
-        
-        # mine_counter updated in view
-        self.update_mine_counter()
+
+    def update_cell(self, row : int, col : int, button : CustomButton) -> None:
+        """
+        Update one button to reflect the state of the corresponding cell in the model.
+        """
+        cell = self.model.board[row][col]
+                
+        # Update button appearance based on flagged status
+        if cell.is_flagged:
+            self.view.flag_cell(True, button)
+        else:
+            self.view.flag_cell(False, button)
+            
+        # Update button appearance based on reveal status
+        if cell.is_revealed:
+            # SPIRITS
+            if cell.is_mine:
+                self.view.reveal_cell('mine', button)
+            elif cell.adjacent_mines == 0:
+                # FLOOR
+                self.view.reveal_cell('safe', button)
+            else:
+                self.view.reveal_cell('number', button, cell.adjacent_mines)
+        else:
+            self.view.hide_cell(button)  # Hidden again after an undo
 
     def update_mine_counter(self) -> None:
         '''
-        Update the number of remaining mines in the view.
+        Update the number of remaining mines in the view (the score of an endless game).
         '''
+        if self.endless:
+            self.view.update_view_score(self.model.revealed_safe)
+            return
         self.view.update_view_mine_counter(self.model.get_count_mines())
 
     def game_over_or_win_check(self) -> None:
@@ -120,7 +304,8 @@ class GameController:
         Check if the game is over or won.
         Update the view with appropriate messages.
         '''
-        self.model._check_victory()
+        with self.profiler.phase('victory'):
+            self.model._check_victory()
         if self.model.is_game_won:
             self.view.play_sound('victory')
             self.view.show_message('victory')
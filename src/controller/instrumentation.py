@@ -0,0 +1,241 @@
+'''
+Optional latency instrumentation of the click handling.
+
+Enabled with MINESWEEPER_PROFILE (or main.py --profile): 1 prints the report on exit,
+a path also writes it there as JSON. Every click is timed by phase:
+
+- model: the reveal, flag or chord in the model
+- repaint: the changed cells and the mine counter in the view
+- victory: the end-of-game check
+- sound: the sound dispatch (also when it happens during the repaint)
+- dialog: the end-of-game dialogs, left out of the click time (they wait for the player)
+- click: the whole click
+
+Phases are exclusive: a phase started inside another one (the sound of a flag during the
+repaint) is taken out of the time of the outer one. The phases of a click add up to its time,
+and the rest (the dispatch between the phases) is shown as 'other' in the breakdown.
+
+Times go into power-of-two histograms, a few integer increments per phase. The report
+ends with the breakdown of the slowest click, to tell which phase made a big click lag.
+'''
+import contextlib
+import json
+import sys
+import time
+
+# Phases not counted in the click time
+EXCLUDED = ('dialog',)
+
+
+class LogHistogram:
+    '''
+    Counts of non-negative integers in power-of-two buckets:
+    bucket 0 holds 0 and bucket b holds the values in [2 ** (b - 1), 2 ** b).
+    '''
+    __slots__ = ('buckets', 'count', 'total', 'max')
+
+    BUCKETS = 64
+
+    def __init__(self) -> None:
+        self.buckets = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value : int) -> None:
+        self.buckets[min(value.bit_length(), self.BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, fraction : float) -> int:
+        '''
+        Upper bound of the values below the given fraction of the records, within a factor of 2.
+        '''
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min((1 << bucket) - 1, self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> dict:
+        return {'count': self.count, 'total': self.total, 'max': self.max,
+                'buckets': {str(bucket): count for bucket, count in enumerate(self.buckets) if count}}
+
+
+class _Timer:
+    __slots__ = ('profiler', 'name', 'start', 'nested')
+
+    def __init__(self, profiler : 'ClickProfiler', name : str) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> None:
+        # Time of the phases started inside this one, not counted in it
+        self.nested = 0
+        self.profiler._running.append(self)
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter_ns() - self.start
+        running = self.profiler._running
+        running.pop()
+        if running:
+            running[-1].nested += elapsed
+        self.profiler.record(self.name, elapsed - self.nested)
+
+
+class _Click:
+    __slots__ = ('profiler', 'start')
+
+    def __init__(self, profiler : 'ClickProfiler') -> None:
+        self.profiler = profiler
+
+    def __enter__(self) -> None:
+        self.profiler._phases = {}
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter_ns() - self.start
+        self.profiler._end_click(elapsed)
+
+
+class ClickProfiler:
+    '''
+    Histograms of the phases of the clicks, in nanoseconds, and of the cells changed per click.
+    '''
+
+    def __init__(self, path : str = None) -> None:
+        # Where the JSON report is written on dump, if anywhere
+        self.path = path
+        self.histograms = {}
+        # Phases of the slowest click: (click time, {phase: time or count})
+        self.slowest = None
+        self._phases = None
+        # Phases being timed, innermost last
+        self._running = []
+
+    def phase(self, name : str) -> _Timer:
+        '''
+        Time a block: with profiler.phase('model'): ...
+        '''
+        return _Timer(self, name)
+
+    def click(self) -> _Click:
+        '''
+        Time a whole click; the phases inside it make up its breakdown.
+        '''
+        return _Click(self)
+
+    def record(self, name : str, value : int) -> None:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LogHistogram()
+        histogram.record(value)
+        if self._phases is not None:
+            self._phases[name] = self._phases.get(name, 0) + value
+
+    def count(self, name : str, value : int) -> None:
+        '''
+        Record a quantity that is not a time (e.g. the number of changed cells).
+        '''
+        self.record(name, value)
+
+    def _end_click(self, elapsed : int) -> None:
+        phases, self._phases = self._phases, None
+        elapsed -= sum(phases.get(name, 0) for name in EXCLUDED)
+        self.record('click', elapsed)
+        if self.slowest is None or elapsed > self.slowest[0]:
+            self.slowest = (elapsed, phases)
+
+    def timed(self, name : str, function):
+        '''
+        Wrap a function so that every call is recorded as a phase.
+        '''
+        def wrapper(*args, **kwargs):
+            with self.phase(name):
+                return function(*args, **kwargs)
+        return wrapper
+
+    def instrument(self, view) -> None:
+        '''
+        Time the sound dispatch and the dialogs of a GameView.
+        '''
+        view.play_sound = self.timed('sound', view.play_sound)
+        view.show_message = self.timed('dialog', view.show_message)
+
+    def report(self) -> str:
+        lines = [f"{'phase':<10}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for name, histogram in self.histograms.items():
+            if name == 'cells':
+                continue
+            values = (histogram.mean, histogram.percentile(0.5), histogram.percentile(0.9),
+                      histogram.percentile(0.99), histogram.max)
+            lines.append(f"{name:<10}{histogram.count:>8}" + ''.join(f"{value / 1e6:>10.3f}" for value in values))
+        cells = self.histograms.get('cells')
+        if cells is not None:
+            lines.append(f"cells per click: mean {cells.mean:.1f}, p99 {cells.percentile(0.99)}, max {cells.max}")
+        if self.slowest is not None:
+            elapsed, phases = self.slowest
+            other = elapsed - sum(value for name, value in phases.items() if name != 'cells' and name not in EXCLUDED)
+            breakdown = ', '.join([f"{name} {value}" if name == 'cells' else f"{name} {value / 1e6:.3f} ms"
+                                   for name, value in phases.items()] + [f"other {other / 1e6:.3f} ms"])
+            lines.append(f"slowest click: {elapsed / 1e6:.3f} ms ({breakdown})")
+        return '\n'.join(lines)
+
+    def to_dict(self) -> dict:
+        return {'unit': 'ns', 'histograms': {name: histogram.to_dict() for name, histogram in self.histograms.items()},
+                'slowest': None if self.slowest is None else {'click': self.slowest[0], 'phases': self.slowest[1]}}
+
+    def dump(self) -> None:
+        '''
+        Print the report on stderr, and write it as JSON to the path if there is one.
+        '''
+        if not self.histograms:
+            return
+        print(self.report(), file=sys.stderr)
+        if self.path:
+            try:
+                with open(self.path, 'w') as file:
+                    json.dump(self.to_dict(), file, indent=1)
+            except OSError as error:
+                print(f"Could not write the profile: {error}", file=sys.stderr)
+
+
+class NullProfiler:
+    '''
+    Instrumentation disabled: every call is a no-op.
+    '''
+    _NULL = contextlib.nullcontext()
+
+    def phase(self, name : str) -> contextlib.nullcontext:
+        return self._NULL
+
+    def click(self) -> contextlib.nullcontext:
+        return self._NULL
+
+    def count(self, name : str, value : int) -> None:
+        pass
+
+    def instrument(self, view) -> None:
+        pass
+
+    def dump(self) -> None:
+        pass
+
+
+def create_profiler(setting : str) -> ClickProfiler | NullProfiler:
+    '''
+    :param setting: '' or '0' disables the instrumentation, '1' prints the report on exit,
+                    any other value is the path of the JSON report.
+    '''
+    if setting in ('', '0'):
+        return NullProfiler()
+    return ClickProfiler(None if setting == '1' else setting)
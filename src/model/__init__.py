@@ -1 +1,5 @@
-from .game_model import Cell, GameBoard
\ No newline at end of file
+from .compact_board import CellView, CompactBoard
+from .game_model import Cell, GameBoard
+from .solver import Hint, Solver
+from .persistence import SaveFormatError, load_game, save_game
+from .endless import EndlessBoard
\ No newline at end of file
@@ -0,0 +1,127 @@
+class CellView:
+    '''
+    Thin proxy exposing the Cell attributes of one position of a CompactBoard.
+    Nothing is stored here: every read and write goes straight to the board planes.
+    '''
+    __slots__ = ('_board', '_index')
+
+    def __init__(self, board : 'CompactBoard', index : int) -> None:
+        self._board = board
+        self._index = index
+
+    @property
+    def is_mine(self) -> bool:
+        return bool(self._board.mines[self._index])
+
+    @is_mine.setter
+    def is_mine(self, value : bool) -> None:
+        self._board.mines[self._index] = 1 if value else 0
+
+    @property
+    def is_revealed(self) -> bool:
+        return bool(self._board.revealed[self._index])
+
+    @is_revealed.setter
+    def is_revealed(self, value : bool) -> None:
+        self._board.revealed[self._index] = 1 if value else 0
+
+    @property
+    def is_flagged(self) -> bool:
+        return bool(self._board.flagged[self._index])
+
+    @is_flagged.setter
+    def is_flagged(self, value : bool) -> None:
+        self._board.flagged[self._index] = 1 if value else 0
+
+    @property
+    def adjacent_mines(self) -> int:
+        return self._board.adjacent[self._index]
+
+    @adjacent_mines.setter
+    def adjacent_mines(self, value : int) -> None:
+        self._board.adjacent[self._index] = value
+
+
+class RowView:
+    '''
+    One row of a CompactBoard, indexable by column like a list of cells.
+    '''
+    __slots__ = ('_board', '_row')
+
+    def __init__(self, board : 'CompactBoard', row : int) -> None:
+        self._board = board
+        self._row = row
+
+    def __len__(self) -> int:
+        return self._board.cols
+
+    def __getitem__(self, col : int) -> CellView:
+        cols = self._board.cols
+        # Same semantic as a list: negative indices count from the end
+        if col < 0:
+            col += cols
+        if not 0 <= col < cols:
+            raise IndexError('Index out of range')
+        return CellView(self._board, self._row * cols + col)
+
+    def __iter__(self):
+        start = self._row * self._board.cols
+        for index in range(start, start + self._board.cols):
+            yield CellView(self._board, index)
+
+
+class CompactBoard:
+    '''
+    Grid of cells stored as four flat byte planes (one byte per cell and per plane):
+
+    - mines: 1 if the cell holds a mine
+    - revealed: 1 if the cell has been revealed
+    - flagged: 1 if the cell carries a flag
+    - adjacent: number of mines around the cell (0 for the mines themselves)
+
+    The cell at (row, col) lives at index row * cols + col in every plane.
+    `board[row][col]` still returns an object with the Cell attributes, so code written
+    against the old list of lists keeps working.
+    '''
+    __slots__ = ('rows', 'cols', 'size', 'mines', 'revealed', 'flagged', 'adjacent')
+
+    def __init__(self, rows : int, cols : int) -> None:
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        self.mines = bytearray(self.size)
+        self.revealed = bytearray(self.size)
+        self.flagged = bytearray(self.size)
+        self.adjacent = bytearray(self.size)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, row : int) -> RowView:
+        if row < 0:
+            row += self.rows
+        if not 0 <= row < self.rows:
+            raise IndexError('Index out of range')
+        return RowView(self, row)
+
+    def __iter__(self):
+        for row in range(self.rows):
+            yield RowView(self, row)
+
+    def index(self, row : int, col : int) -> int:
+        '''
+        Flat index of the cell at (row, col).
+        '''
+        return row * self.cols + col
+
+    def position(self, index : int) -> tuple[int, int]:
+        '''
+        (row, col) of the cell at a flat index.
+        '''
+        return divmod(index, self.cols)
+
+    def cell(self, row : int, col : int) -> CellView:
+        '''
+        Cell-style view of the cell at (row, col).
+        '''
+        return CellView(self, row * self.cols + col)
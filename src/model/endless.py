@@ -0,0 +1,378 @@
+'''
+Endless manor: an unbounded board made of square chunks generated on demand.
+
+- The mines of a chunk only depend on the seed and the chunk coordinates, so a chunk can be
+  generated again at any time; the cells around (0, 0), where the game starts, never hold a mine.
+- A chunk is created (as a CompactBoard) the first time one of its cells is revealed or
+  flagged; the chunks nobody touched take no memory.
+- The adjacent counts of a chunk are computed with count_adjacent_mines on its mines padded
+  with the border cells of the 8 neighbor chunks, whose mines are generated without creating them.
+- Openings are revealed with the scanline fill of flood_fill, chunk by chunk: the zero cells
+  revealed on the edge of a chunk seed the fill of the next chunks.
+- At most max_chunks chunks stay in memory; the least recently used one is evicted and only
+  its revealed and flagged planes are written to disk (the rest is generated again).
+
+Rows and columns are any integers, negative ones included. The board has the interface the
+GameController uses on a GameBoard (board[row][col], _reveal_cell, _flag_cell, _chord_cell,
+pop_changed_cells...), minus the victory: an endless game ends on a mine, its score is the number
+of safe cells revealed. Moves are not journaled, there is no undo.
+'''
+import os
+import random
+import shutil
+import tempfile
+import weakref
+from collections import OrderedDict
+
+from .compact_board import CellView, CompactBoard
+from .flood_fill import reveal_opening
+from .neighbors import count_adjacent_mines
+from .persistence import pack_bits, unpack_bits
+
+NEIGHBORS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+
+
+class EndlessGrid:
+    '''
+    board[row][col] access to the cells of an EndlessBoard, as CellView objects on their chunk.
+    '''
+    __slots__ = ('_board',)
+
+    def __init__(self, board : 'EndlessBoard') -> None:
+        self._board = board
+
+    def __getitem__(self, row : int) -> '_EndlessRow':
+        return _EndlessRow(self._board, row)
+
+
+class _EndlessRow:
+    __slots__ = ('_board', '_row')
+
+    def __init__(self, board : 'EndlessBoard', row : int) -> None:
+        self._board = board
+        self._row = row
+
+    def __getitem__(self, col : int) -> CellView:
+        key, index = self._board.chunk_of(self._row, col)
+        return CellView(self._board.chunk(key), index)
+
+
+class EndlessBoard:
+    '''
+    Unbounded board; cells are addressed by global (row, col) and stored in chunks of
+    chunk_size x chunk_size cells.
+    '''
+
+    # Difficulty label of the endless games
+    DIFFICULTY = 'Endless'
+    CHUNK_SIZE = 32
+    # Cells revealed by one click at most: at low densities an opening can be unbounded
+    FILL_LIMIT = 1 << 18
+
+    def __init__(self, seed : int = None, density : float = 0.16, chunk_size : int = CHUNK_SIZE,
+                 max_chunks : int = 256, cache_dir : str = None, fill_limit : int = FILL_LIMIT) -> None:
+        '''
+        :param seed: Seed of the whole board, drawn at random by default.
+        :param density: Fraction of the cells of a chunk holding a mine.
+        :param max_chunks: The number of chunks kept in memory.
+        :param cache_dir: Directory of the evicted chunks, a temporary one by default (removed by close()).
+        :param fill_limit: The number of cells a single reveal may open; the rest of a larger
+                           opening stays hidden and is opened by clicking its edge.
+        '''
+        if not 0 <= density < 1:
+            raise ValueError(f"density must be in [0, 1), got {density!r}")
+        if chunk_size < 3:
+            raise ValueError(f"chunk_size must be at least 3, got {chunk_size!r}")
+        if max_chunks < 1:
+            raise ValueError(f"max_chunks must be positive, got {max_chunks!r}")
+        self.seed = random.getrandbits(63) if seed is None else seed
+        self.density = density
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.fill_limit = fill_limit
+        if cache_dir is None:
+            self.cache_dir = tempfile.mkdtemp(prefix='endless-')
+            # The temporary directory goes with the board, even if close() is never called
+            self._cleanup = weakref.finalize(self, shutil.rmtree, self.cache_dir, True)
+        else:
+            self.cache_dir = cache_dir
+            self._cleanup = None
+            os.makedirs(self.cache_dir, exist_ok=True)
+        self.difficulty = self.DIFFICULTY
+        # Chunks in memory, least recently used first, and chunks evicted to disk
+        self._chunks = OrderedDict()
+        self._stored = set()
+        self._changed = []
+        self.is_game_over = False
+        self.is_game_won = False
+        self.count_flags = 0
+        # Safe cells revealed: the score of an endless game
+        self.revealed_safe = 0
+
+    @property
+    def board(self) -> EndlessGrid:
+        '''
+        Made on each access: an attribute would be a reference cycle, keeping the board
+        (and its cache directory) alive until the garbage collector runs.
+        '''
+        return EndlessGrid(self)
+
+    def chunk_of(self, row : int, col : int) -> tuple[tuple[int, int], int]:
+        '''
+        :return: The coordinates of the chunk of a cell and the flat index of the cell in it.
+        '''
+        size = self.chunk_size
+        chunk_row, local_row = divmod(row, size)
+        chunk_col, local_col = divmod(col, size)
+        return (chunk_row, chunk_col), local_row * size + local_col
+
+    def _generate_mines(self, key : tuple[int, int]) -> bytearray:
+        '''
+        The mine plane of a chunk, from the seed and the chunk coordinates only.
+        '''
+        size = self.chunk_size
+        mines = bytearray(size * size)
+        # Seeding with a string hashes it (SHA-512): stable across runs and platforms
+        rng = random.Random(f"{self.seed}:{key[0]}:{key[1]}")
+        cells = range(size * size)
+        top, left = key[0] * size, key[1] * size
+        if top <= 1 and top + size > -1 and left <= 1 and left + size > -1:
+            # The start cell and its neighbors stay safe
+            cells = [i for i in cells if not (abs(top + i // size) <= 1 and abs(left + i % size) <= 1)]
+        for index in rng.sample(cells, min(round(self.density * size * size), len(cells))):
+            mines[index] = 1
+        return mines
+
+    def _mines(self, key : tuple[int, int]) -> bytes:
+        board = self._chunks.get(key)
+        return board.mines if board is not None else self._generate_mines(key)
+
+    def _count_adjacent(self, key : tuple[int, int], mines : bytearray) -> bytearray:
+        '''
+        The adjacent counts of a chunk, including the mines of the neighbor chunks.
+        '''
+        size = self.chunk_size
+        padded_size = size + 2
+        padded = bytearray(padded_size * padded_size)
+        for row in range(size):
+            start = (row + 1) * padded_size + 1
+            padded[start:start + size] = mines[row * size:(row + 1) * size]
+        # Border rows and columns: one row or column of each neighbor, one cell of each corner
+        for d_row, d_col in NEIGHBORS:
+            other = self._mines((key[0] + d_row, key[1] + d_col))
+            rows = range(size) if d_row == 0 else (size - 1 if d_row < 0 else 0,)
+            cols = range(size) if d_col == 0 else (size - 1 if d_col < 0 else 0,)
+            for row in rows:
+                padded_row = row + 1 if d_row == 0 else (0 if d_row < 0 else padded_size - 1)
+                for col in cols:
+                    padded_col = col + 1 if d_col == 0 else (0 if d_col < 0 else padded_size - 1)
+                    padded[padded_row * padded_size + padded_col] = other[row * size + col]
+        counts = count_adjacent_mines(padded, padded_size, padded_size)
+        adjacent = bytearray(size * size)
+        for row in range(size):
+            start = (row + 1) * padded_size + 1
+            adjacent[row * size:(row + 1) * size] = counts[start:start + size]
+        return adjacent
+
+    def _path(self, key : tuple[int, int]) -> str:
+        return os.path.join(self.cache_dir, f"{key[0]}_{key[1]}.chunk")
+
+    def chunk(self, key : tuple[int, int]) -> CompactBoard:
+        '''
+        The chunk at the given chunk coordinates, created or loaded back from disk if needed.
+        '''
+        board = self._chunks.get(key)
+        if board is not None:
+            self._chunks.move_to_end(key)
+            return board
+        size = self.chunk_size
+        board = CompactBoard(size, size)
+        board.mines = self._generate_mines(key)
+        board.adjacent = self._count_adjacent(key, board.mines)
+        if key in self._stored:
+            with open(self._path(key), 'rb') as file:
+                data = file.read()
+            plane_size = (size * size + 7) // 8
+            board.revealed = unpack_bits(data[:plane_size], size * size)
+            board.flagged = unpack_bits(data[plane_size:], size * size)
+        self._chunks[key] = board
+        while len(self._chunks) > self.max_chunks:
+            self._evict()
+        return board
+
+    def _evict(self) -> None:
+        '''
+        Drop the least recently used chunk, keeping its revealed and flagged cells on disk.
+        '''
+        key, board = self._chunks.popitem(last=False)
+        if 1 in board.revealed or 1 in board.flagged:
+            with open(self._path(key), 'wb') as file:
+                file.write(pack_bits(board.revealed) + pack_bits(board.flagged))
+            self._stored.add(key)
+        elif key in self._stored:
+            os.remove(self._path(key))
+            self._stored.discard(key)
+
+    @property
+    def loaded_chunks(self) -> int:
+        return len(self._chunks)
+
+    @property
+    def stored_chunks(self) -> int:
+        return len(self._stored)
+
+    def is_mine(self, row : int, col : int) -> bool:
+        '''
+        Whether a cell holds a mine, without creating its chunk.
+        '''
+        key, index = self.chunk_of(row, col)
+        return bool(self._mines(key)[index])
+
+    def is_touched(self, key : tuple[int, int]) -> bool:
+        return key in self._chunks or key in self._stored
+
+    def cell(self, row : int, col : int) -> tuple[bool, bool, int]:
+        '''
+        The state of a cell for display: (revealed, flagged, adjacent mines).
+        The cells of untouched chunks are hidden, their chunk is not created.
+        '''
+        key, index = self.chunk_of(row, col)
+        if not self.is_touched(key):
+            return False, False, 0
+        board = self.chunk(key)
+        return bool(board.revealed[index]), bool(board.flagged[index]), board.adjacent[index]
+
+    def _record(self, key : tuple[int, int], indices) -> None:
+        top, left = key[0] * self.chunk_size, key[1] * self.chunk_size
+        size = self.chunk_size
+        self._changed.extend((top + index // size, left + index % size) for index in indices)
+
+    def pop_changed_cells(self) -> list[tuple[int, int]]:
+        '''
+        Return the cells revealed, flagged or unflagged since the previous call and forget them.
+        '''
+        changed, self._changed = self._changed, []
+        return changed
+
+    def _reveal_cell(self, row : int, col : int) -> None:
+        '''
+        Reveal a cell, and its whole opening across the chunks if it has no adjacent mine.
+        '''
+        if self.is_game_over:
+            return
+        key, index = self.chunk_of(row, col)
+        board = self.chunk(key)
+        if board.revealed[index] or board.flagged[index]:
+            return
+        if board.mines[index]:
+            board.revealed[index] = 1
+            self._record(key, (index,))
+            self.is_game_over = True
+            return
+        self._fill({key: [index]})
+
+    def _fill(self, pending : dict) -> None:
+        '''
+        Flood fill across the chunks.
+
+        :param pending: Seeds of the fill, as flat indices by chunk coordinates.
+        '''
+        size = self.chunk_size
+        budget = self.fill_limit
+        while pending and budget > 0:
+            key, seeds = pending.popitem()
+            board = self.chunk(key)
+            changed = reveal_opening(board, seeds)
+            self._record(key, changed)
+            self.revealed_safe += len(changed)
+            budget -= len(changed)
+            adjacent = board.adjacent
+            top, left = key[0] * size, key[1] * size
+            for index in changed:
+                row, col = divmod(index, size)
+                if adjacent[index] or 0 < row < size - 1 and 0 < col < size - 1:
+                    continue
+                # A zero cell on the edge: its neighbors in the other chunks are safe and revealed too
+                for d_row, d_col in NEIGHBORS:
+                    if 0 <= row + d_row < size and 0 <= col + d_col < size:
+                        continue
+                    other, other_index = self.chunk_of(top + row + d_row, left + col + d_col)
+                    pending.setdefault(other, []).append(other_index)
+
+    def _chord_cell(self, row : int, col : int) -> None:
+        '''
+        Reveal every unflagged hidden neighbor of a revealed number whose flags are all placed,
+        across the chunk borders. A wrong flag makes the chord reveal the mines it uncovers and
+        ends the game, without revealing (nor scoring) the other neighbors.
+        '''
+        if self.is_game_over:
+            return
+        key, index = self.chunk_of(row, col)
+        board = self.chunk(key)
+        if not board.revealed[index] or board.mines[index] or not board.adjacent[index]:
+            return
+        neighbors = [(row + d_row, col + d_col) for d_row, d_col in NEIGHBORS]
+        states = [self.cell(*cell) for cell in neighbors]
+        if sum(flagged for _, flagged, _ in states) != board.adjacent[index]:
+            return
+        hidden = [cell for cell, (revealed, flagged, _) in zip(neighbors, states) if not revealed and not flagged]
+        mines = [cell for cell in hidden if self.is_mine(*cell)]
+        if mines:
+            # A wrong flag: the mines are shown and the game ends there, nothing else is revealed
+            for cell in mines:
+                key, index = self.chunk_of(*cell)
+                self.chunk(key).revealed[index] = 1
+                self._record(key, (index,))
+            self.is_game_over = True
+            return
+        pending = {}
+        for cell in hidden:
+            key, index = self.chunk_of(*cell)
+            pending.setdefault(key, []).append(index)
+        self._fill(pending)
+
+    def _flag_cell(self, row : int, col : int) -> None:
+        '''
+        Put or remove a flag on a hidden cell.
+        '''
+        if self.is_game_over:
+            return
+        key, index = self.chunk_of(row, col)
+        board = self.chunk(key)
+        if board.revealed[index]:
+            return
+        board.flagged[index] ^= 1
+        self.count_flags += 1 if board.flagged[index] else -1
+        self._record(key, (index,))
+
+    def _check_victory(self) -> None:
+        '''
+        An endless game is never won.
+        '''
+
+    def undo(self) -> bool:
+        return False
+
+    def redo(self) -> bool:
+        return False
+
+    def get_board_settings(self) -> tuple[None, None, None, str]:
+        '''
+        :return: Same tuple as GameBoard.get_board_settings; an endless board has no size nor mine count.
+        '''
+        return None, None, None, self.difficulty
+
+    def close(self) -> None:
+        '''
+        Forget the chunks and remove the temporary cache directory.
+        '''
+        self._chunks.clear()
+        self._stored.clear()
+        if self._cleanup is not None:
+            self._cleanup()
+
+    def __enter__(self) -> 'EndlessBoard':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
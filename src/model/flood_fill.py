@@ -0,0 +1,87 @@
+'''
+Scanline flood fill revealing a whole opening (connected zero cells and their numbered border).
+
+Instead of pushing the 8 neighbors of every zero cell, the fill reveals a horizontal run
+of zero cells at once, then scans the rows above and below the run a single time and
+pushes only one seed per new run of zero cells found there.
+'''
+from typing import Iterable
+
+from .compact_board import CompactBoard
+
+
+def reveal_opening(board : CompactBoard, seeds : Iterable[int]) -> list[int]:
+    '''
+    Reveal the seed cells and, for the seeds without adjacent mines, their whole opening.
+    Flagged and already revealed cells are left untouched and stop the fill.
+    Mines are never reached: every cell revealed by the fill borders a zero cell.
+
+    :param board: The board to update.
+    :param seeds: Flat indices of the cells to reveal.
+    :return: Flat indices of the newly revealed cells.
+    '''
+    rows, cols = board.rows, board.cols
+    revealed, flagged, adjacent = board.revealed, board.flagged, board.adjacent
+    changed = []
+    # Revealed zero cells whose run has not been expanded yet
+    stack = []
+
+    for index in seeds:
+        if revealed[index] or flagged[index]:
+            continue
+        revealed[index] = 1
+        changed.append(index)
+        if adjacent[index] == 0 and not board.mines[index]:
+            stack.append(index)
+
+    while stack:
+        index = stack.pop()
+        row, col = divmod(index, cols)
+        start = row * cols
+
+        # Extend the run of hidden zero cells to the left and to the right
+        left = col
+        while left > 0:
+            i = start + left - 1
+            if revealed[i] or flagged[i] or adjacent[i]:
+                break
+            revealed[i] = 1
+            changed.append(i)
+            left -= 1
+        right = col
+        while right < cols - 1:
+            i = start + right + 1
+            if revealed[i] or flagged[i] or adjacent[i]:
+                break
+            revealed[i] = 1
+            changed.append(i)
+            right += 1
+
+        # The run is bordered by numbers (or by cells already handled)
+        low = left - 1 if left > 0 else left
+        high = right + 1 if right < cols - 1 else right
+        for i in (start + low, start + high):
+            if not revealed[i] and not flagged[i]:
+                revealed[i] = 1
+                changed.append(i)
+                if adjacent[i] == 0:
+                    stack.append(i)
+
+        # Scan the rows above and below the run, one seed per run of zero cells
+        for other in (row - 1, row + 1):
+            if not 0 <= other < rows:
+                continue
+            in_run = False
+            for i in range(other * cols + low, other * cols + high + 1):
+                if revealed[i] or flagged[i]:
+                    in_run = False
+                elif adjacent[i]:
+                    revealed[i] = 1
+                    changed.append(i)
+                    in_run = False
+                elif not in_run:
+                    revealed[i] = 1
+                    changed.append(i)
+                    stack.append(i)
+                    in_run = True
+    return changed
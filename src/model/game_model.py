@@ -1,4 +1,9 @@
 import random
+from .compact_board import CompactBoard
+from .flood_fill import reveal_opening
+from .history import Move, MoveJournal
+from .neighbors import count_adjacent_mines
+from .openings import OpeningIndex
 
 class Cell:
     def __init__(self, is_mine = False) -> None:
@@ -11,45 +16,154 @@ class GameBoard:
     
     NEIGHBORS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
     
-    def __init__(self, difficulty : str = 'Easy') -> None:
+    # Presets: rows, cols, number of mines
+    DIFFICULTIES = {
+        'Easy': (8, 8, 10),
+        'Medium': (16, 16, 40),
+        'Hard': (20, 20, 75),
+    }
+
+    # Number of moves kept for undo/redo
+    HISTORY_SIZE = 1000
+    
+    def __init__(self, difficulty : str = 'Easy', rows : int = None, cols : int = None, num_mines : int = None,
+                 density : float = None, precompute_openings : bool = False, seed : int = None) -> None:
+        '''
+        :param seed: Seed of the mine placement, the same seed and size give the same board.
+                     Drawn from the global random module by default, and kept in `seed`.
+        '''
         self.difficulty = difficulty
-        self.rows, self.cols, self.num_mines = self.set_difficulty(self.difficulty) 
+        self._set_seed(random.getrandbits(63) if seed is None else seed)
+        if rows is None and cols is None and num_mines is None and density is None:
+            self.rows, self.cols, self.num_mines = self.set_difficulty(self.difficulty) 
+        else:
+            # Custom board: missing dimensions are taken from the difficulty preset
+            self.rows, self.cols, self.num_mines = self.board_spec(difficulty, rows, cols, num_mines, density)
+            if (self.rows, self.cols, self.num_mines) != self.DIFFICULTIES.get(difficulty):
+                self.difficulty = 'Custom'
         self.board = self._create_board()
         self._place_mines()
+        self._start_game(precompute_openings)
+
+    @classmethod
+    def from_mines(cls, rows : int, cols : int, mines, difficulty : str = 'Custom',
+                   precompute_openings : bool = False) -> 'GameBoard':
+        '''
+        Create a board with the mines at given positions instead of random ones.
+
+        :param rows: The number of rows.
+        :param cols: The number of columns.
+        :param mines: Flat indices of the mines.
+        :param difficulty: The difficulty label of the board.
+        :return: A new board, ready to be played.
+        '''
+        board = cls.__new__(cls)
+        board.difficulty = difficulty
+        # The mines are given: no seed reproduces them
+        board._set_seed(None)
+        board.rows, board.cols = rows, cols
+        board.board = board._create_board()
+        for index in mines:
+            board.board.mines[index] = 1
+        board.num_mines = sum(board.board.mines)
+        board.board_spec(difficulty, rows, cols, board.num_mines)
+        board._start_game(precompute_openings)
+        return board
+
+    def _set_seed(self, seed : int | None) -> None:
+        '''
+        Give the board its own random generator, independent from the global random module.
+        '''
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+    def _start_game(self, precompute_openings : bool) -> None:
+        '''
+        Compute the adjacent mines and reset the game state once the mines are placed.
+        '''
         self._set_adjacent_mines()
+        # Optional opening index: one labeling pass now, instant reveal of openings later
+        self.openings = OpeningIndex(self.board) if precompute_openings else None
         self.is_game_over = False
         self.is_game_won = False  
         self.count_mines = self.num_mines
         self.count_flags = 0
+        # Running count of safe cells still hidden, the game is won when it reaches 0
+        self.safe_remaining = self.rows * self.cols - self.num_mines
+        # Flat indices of the cells changed since the last pop_changed_cells()
+        self._changed = []
+        # Callbacks notified with the flat indices of every change (see add_listener)
+        self._listeners = []
+        # Reveals and flags, for undo/redo
+        self.history = MoveJournal(self.HISTORY_SIZE)
         
-    def set_difficulty(self, difficulty):
-        if difficulty == 'Easy':
-            return 8, 8, 10
-        elif difficulty == 'Medium':
-            return 16, 16, 40
-        elif difficulty == 'Hard':
-            return 20, 20, 75
+    def set_difficulty(self, difficulty : str) -> tuple[int, int, int]:
+        '''
+        Get the preset of a difficulty.
+
+        :param difficulty: 'Easy', 'Medium' or 'Hard'.
+        :return: The number of rows, columns and mines of the preset.
+        :raises ValueError: If the difficulty is unknown.
+        '''
+        if difficulty not in self.DIFFICULTIES:
+            raise ValueError(f"Unknown difficulty: {difficulty!r}")
+        return self.DIFFICULTIES[difficulty]
+
+    @classmethod
+    def board_spec(cls, difficulty : str = 'Easy', rows : int = None, cols : int = None, num_mines : int = None,
+                   density : float = None) -> tuple[int, int, int]:
+        '''
+        Validate a custom board size.
+        Missing values are taken from the difficulty preset; the number of mines can be given
+        directly or as a density (fraction of the cells holding a mine).
+
+        :return: The number of rows, columns and mines.
+        :raises ValueError: If the values are inconsistent.
+        '''
+        preset = cls.DIFFICULTIES.get(difficulty, cls.DIFFICULTIES['Easy'])
+        rows = preset[0] if rows is None else rows
+        cols = preset[1] if cols is None else cols
+        for name, value in (('rows', rows), ('cols', cols)):
+            if not isinstance(value, int) or value < 1:
+                raise ValueError(f"{name} must be a positive integer, got {value!r}")
+        size = rows * cols
+        if num_mines is not None and density is not None:
+            raise ValueError("Give either num_mines or density, not both")
+        if density is not None:
+            if not 0 <= density < 1:
+                raise ValueError(f"density must be in [0, 1), got {density!r}")
+            num_mines = round(size * density)
+        elif num_mines is None:
+            num_mines = preset[2]
+        if not isinstance(num_mines, int) or not 0 <= num_mines < size:
+            # At least one cell must be safe
+            raise ValueError(f"num_mines must be between 0 and {size - 1}, got {num_mines!r}")
+        return rows, cols, num_mines
         
-    def _create_board(self) -> list[list[Cell]]:
+    def _create_board(self) -> CompactBoard:
         '''
-        Create a grid with customizable size
+        Create a grid with customizable size, stored as flat byte planes
+        (see CompactBoard) rather than one Cell object per position.
         '''
-        board = [[Cell() for _ in range(self.rows)] for _ in range(self.cols)]  
+        board = CompactBoard(self.rows, self.cols)
         return board     
 
     def _place_mines(self) -> None:
         '''
         Randomly place a defined number of mines on the grid.
+        The positions are drawn without replacement with the sample of the board RNG, so the cost
+        only depends on the number of mines, whatever the density.
         '''
-        # It will store the coordinates of mines as tuples.
-        mine_positions = set() # uniqueness of the positions, faster than a list
-        
-        while len(mine_positions) < self.num_mines:
-            row = random.randint(0, self.rows - 1)
-            col = random.randint(0, self.cols - 1)
-            if (row, col) not in mine_positions: # don't place multiple mines in the same location.
-                mine_positions.add((row, col))
-                self.board[row][col].is_mine = True # the game board as a mine by setting its is_mine attribute to True.  
+        size = self.rows * self.cols
+        mines = self.board.mines
+        if self.num_mines <= size // 2:
+            for index in self.rng.sample(range(size), self.num_mines):
+                mines[index] = 1
+        else:
+            # Dense board: draw the safe cells instead
+            mines[:] = b'\x01' * size
+            for index in self.rng.sample(range(size), size - self.num_mines):
+                mines[index] = 0
 
     def _count_near_mines(self, row : int, col : int) -> int:
         '''
@@ -60,11 +174,12 @@ class GameBoard:
         :return: The number of mine near the cell
         '''
         count = 0
+        mines = self.board.mines
         
         for dx, dy in self.NEIGHBORS:
             nx, ny = row + dx, col + dy
             if 0 <= nx < self.rows and 0 <= ny < self.cols:
-                if self.board[nx][ny].is_mine:
+                if mines[nx * self.cols + ny]:
                     count += 1
         
         return count 
@@ -72,12 +187,10 @@ class GameBoard:
     def _set_adjacent_mines(self) -> None:
         '''
         Set the number of adjacent mines for each cell on the board.
+        The whole plane is computed at once (vectorized with NumPy when available),
+        _count_near_mines stays available for single cells.
         '''
-        for row in range(self.rows):
-            for col in range(self.cols):
-                # If the cell is not a mine, calculate the number of nearby mines
-                if not self.board[row][col].is_mine:
-                    self.board[row][col].adjacent_mines = self._count_near_mines(row, col)
+        self.board.adjacent = count_adjacent_mines(self.board.mines, self.rows, self.cols)
         
     def _check_index(self, row : int, col : int) -> bool:
         '''
@@ -102,17 +215,23 @@ class GameBoard:
         '''
         # Check if the index is in the range of the board
         if self._check_index(row, col):
+            board = self.board
+            index = row * self.cols + col
             # Can't reveal if flagged
-            if not self.board[row][col].is_flagged:
-                if not self.board[row][col].is_revealed:
+            if not board.flagged[index]:
+                if not board.revealed[index]:
                     # Reveal adjacent cells if there are no mines
-                    if self.board[row][col].adjacent_mines == 0 and not self.board[row][col].is_mine:    
+                    if board.adjacent[index] == 0 and not board.mines[index]:    
                         self._reveal_adjacent_cells(row, col)
                     else:
                         # Reveal the cell
-                        self.board[row][col].is_revealed = True
+                        self._journal(Move.REVEAL, (index,))
+                        board.revealed[index] = 1
+                        self._record_changes((index,))
+                        if not board.mines[index]:
+                            self.safe_remaining -= 1
                     # Check if there is a mine
-                    if self.board[row][col].is_mine:    
+                    if board.mines[index]:    
                         self.is_game_over = True    
         else:
             raise IndexError('Index out of range')
@@ -120,28 +239,57 @@ class GameBoard:
     def _reveal_adjacent_cells(self, row : int, col : int) -> None:
         '''
         Automatically reveal neighboring cells if a cell with no adjacent mines is revealed.
+        The whole opening is revealed at once from the precomputed opening index when there is one,
+        otherwise by the scanline fill of flood_fill.reveal_opening. Flagged cells are kept hidden.
         
         :param row: The row index of the cell to reveal.
         :param col: The column index of the cell to reveal.
         ''' 
-        try:  
-            stack = [(row, col)] 
-            while stack:
-                r, c = stack.pop()
-                if not self._check_index(r, c):
-                    continue
-
-                if self.board[r][c].is_revealed:
-                    continue
-
-                self.board[r][c].is_revealed = True
-                if self.board[r][c].adjacent_mines == 0:
-                    for dx, dy in self.NEIGHBORS:
-                        nx, ny = r + dx, c + dy
-                        stack.append((nx, ny)) 
-                        
-        except Exception as e:
-            print(f"Error while revealing adjacent cells: {e}")
+        index = row * self.cols + col
+        revealed = None
+        if self.openings is not None:
+            revealed = self.openings.reveal(self.board, index)
+        if revealed is None:
+            revealed = reveal_opening(self.board, (index,))
+        self._journal(Move.REVEAL, revealed)
+        # An opening only holds safe cells
+        self.safe_remaining -= len(revealed)
+        self._record_changes(revealed)
+
+    def _chord_cell(self, row : int, col : int) -> None:
+        '''
+        Reveal every unflagged hidden neighbor of a revealed number whose flags are all placed.
+        (MIDDLE CLICK or DOUBLE CLICK)
+
+        One bulk operation: a single flood fill seeded with all the neighbors, one change set
+        and one move in the history. A wrong flag makes the chord reveal a mine (game over).
+
+        :param row: The row index of the number.
+        :param col: The column index of the number.
+        '''
+        if not self._check_index(row, col):
+            raise IndexError('Index out of range')
+        board = self.board
+        index = row * self.cols + col
+        if not board.revealed[index] or board.mines[index] or not board.adjacent[index]:
+            return
+        neighbors = [r * self.cols + c
+                     for r in range(max(row - 1, 0), min(row + 2, self.rows))
+                     for c in range(max(col - 1, 0), min(col + 2, self.cols))
+                     if r != row or c != col]
+        flagged, revealed, mines = board.flagged, board.revealed, board.mines
+        if sum(flagged[n] for n in neighbors) != board.adjacent[index]:
+            return
+        seeds = [n for n in neighbors if not revealed[n] and not flagged[n]]
+        if not seeds:
+            return
+        changed = reveal_opening(board, seeds)
+        self._journal(Move.REVEAL, changed)
+        exploded = sum(mines[n] for n in seeds)
+        self.safe_remaining -= len(changed) - exploded
+        if exploded:
+            self.is_game_over = True
+        self._record_changes(changed)
 
     def _flag_cell(self, row : int, col : int) -> None:
         '''
@@ -151,39 +299,163 @@ class GameBoard:
         :param row: The row index of the cell to reveal.
         :param col: The column index of the cell to reveal.
         '''
+        cell = self.board[row][col]
         # If the cell at the given row and column has already been revealed
-        if self.board[row][col].is_revealed:
+        if cell.is_revealed:
             # return => early exit
             return
         
         # Player can't flag if he is out of flag.
-        if not self.board[row][col].is_flagged and self.count_flags == self.num_mines:
+        if not cell.is_flagged and self.count_flags == self.num_mines:
             return
+        self._journal(Move.FLAG, (row * self.cols + col,))
         # If the cell is not revealed, this line toggles the is_flagged attribute of the cell  
-        self.board[row][col].is_flagged = not self.board[row][col].is_flagged
+        cell.is_flagged = not cell.is_flagged
+        self._record_changes((row * self.cols + col,))
         # Mine counter can't go negative
-        if self.board[row][col].is_flagged and self.count_mines > 0:
+        if cell.is_flagged and self.count_mines > 0:
             self.count_mines -= 1
             self.count_flags += 1
-        elif not self.board[row][col].is_flagged:
+        elif not cell.is_flagged:
             self.count_mines += 1
             self.count_flags -= 1
         
     def _check_victory(self) -> None:
         '''
         Check for victory when all non-mined cells are revealed.
+        Constant time: relies on the safe_remaining counter kept up to date by every reveal.
         '''
-        for row in range(self.rows):
-            for col in range(self.cols):
-                cell = self.board[row][col]
-               
-                # if the current cell is not a mine and is not revealed
-                if not cell.is_mine and not cell.is_revealed:
-                    return False
+        if self.safe_remaining > 0:
+            return False
         # At this point, all non-mined cells are revealed and the game is won
-        # the loops complete without finding any non-mine unrevealed cells
         self.is_game_won = True
 
+    def _count_unrevealed_safe(self) -> int:
+        '''
+        Count the hidden non-mined cells by scanning the whole board.
+        Reference implementation for safe_remaining, too slow to be called on every click.
+
+        :return: The number of safe cells not revealed yet.
+        '''
+        mines = self.board.mines
+        revealed = self.board.revealed
+        count = 0
+        for index in range(self.board.size):
+            # if the current cell is not a mine and is not revealed
+            if not mines[index] and not revealed[index]:
+                count += 1
+        return count
+
+    def _journal(self, kind : str, cells) -> None:
+        '''
+        Record a move in the history, with the game state before it.
+        '''
+        if cells:
+            self.history.record(Move(kind, cells, self.is_game_over, self.is_game_won))
+
+    def _apply_move(self, move : Move, forward : bool) -> None:
+        '''
+        Play a move of the history again (forward) or take it back.
+        '''
+        board = self.board
+        if move.kind == Move.REVEAL:
+            revealed, mines = board.revealed, board.mines
+            value = 1 if forward else 0
+            safe = 0
+            for index in move.cells:
+                revealed[index] = value
+                if not mines[index]:
+                    safe += 1
+            self.safe_remaining += -safe if forward else safe
+        else:
+            flagged = board.flagged
+            for index in move.cells:
+                flagged[index] ^= 1
+                step = 1 if flagged[index] else -1
+                self.count_flags += step
+                self.count_mines -= step
+        self._record_changes(move.cells)
+
+    def undo(self) -> bool:
+        '''
+        Take back the last move. Costs the number of cells the move changed.
+
+        :return: False if there is no move to undo.
+        '''
+        move = self.history.pop_undo()
+        if move is None:
+            return False
+        self._apply_move(move, False)
+        self.is_game_over, self.is_game_won = move.was_over, move.was_won
+        return True
+
+    def redo(self) -> bool:
+        '''
+        Play again the last move undone.
+
+        :return: False if there is no move to redo.
+        '''
+        move = self.history.pop_redo()
+        if move is None:
+            return False
+        self._apply_move(move, True)
+        mines = self.board.mines
+        self.is_game_over = move.was_over or (move.kind == Move.REVEAL and any(mines[i] for i in move.cells))
+        self.is_game_won = move.was_won
+        return True
+
+    def set_history_size(self, size : int) -> None:
+        '''
+        Change the number of moves kept for undo/redo.
+        '''
+        self.history.resize(size)
+
+    def _record_changes(self, indices) -> None:
+        '''
+        Record cells changed by a move for pop_changed_cells() and notify the listeners.
+
+        :param indices: Flat indices of the changed cells.
+        '''
+        self._changed.extend(indices)
+        for listener in self._listeners:
+            listener(indices)
+
+    def _record_visible_cells(self) -> None:
+        '''
+        Record every revealed or flagged cell as changed, so that a restored game gets painted.
+        '''
+        revealed, flagged = self.board.revealed, self.board.flagged
+        self._record_changes([index for index in range(self.board.size) if revealed[index] or flagged[index]])
+
+    def add_listener(self, listener) -> None:
+        '''
+        Register a callback called with the flat indices of the cells changed by each move.
+        '''
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener) -> None:
+        '''
+        Unregister a callback registered with add_listener().
+        '''
+        self._listeners.remove(listener)
+
+    def pop_changed_cells(self) -> list[tuple[int, int]]:
+        '''
+        Return the cells revealed, flagged or unflagged since the previous call and forget them.
+        Lets the view repaint only what changed instead of the whole board.
+
+        :return: The (row, col) positions of the changed cells.
+        '''
+        cols = self.cols
+        return [divmod(index, cols) for index in self.pop_changed_indices()]
+
+    def pop_changed_indices(self) -> list[int]:
+        '''
+        Same as pop_changed_cells(), as flat indices (row * cols + col).
+        '''
+        changed, self._changed = self._changed, []
+        return changed
+
     def get_count_mines(self) -> int:
         '''
         Get the total number of mines on the board.
@@ -0,0 +1,217 @@
+'''
+Generation of boards that can be solved without guessing from a given start cell.
+
+The mines are placed at random around a safe start, then the board is solved with the
+certain rules of the Solver only. When the solver gets stuck, the mines hidden around one
+frontier number are moved to cells far from anything revealed: that number then proves its
+hidden neighbors safe and the solving resumes where it stopped. The moved mines were not
+determined by any previous deduction and land away from the revealed numbers, so every
+deduction made so far still holds on the modified board.
+'''
+import os
+import random
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from .game_model import GameBoard
+from .solver import Solver
+
+
+def _zone(rows : int, cols : int, row : int, col : int) -> set[int]:
+    '''
+    Flat indices of the 3x3 square centered on a cell.
+    '''
+    return {r * cols + c
+            for r in range(max(row - 1, 0), min(row + 2, rows))
+            for c in range(max(col - 1, 0), min(col + 2, cols))}
+
+
+class NoGuessGenerator:
+    '''
+    Generate no-guess boards of a given size.
+    '''
+
+    def __init__(self, rows : int, cols : int, num_mines : int, difficulty : str = 'Custom', seed : int = None,
+                 max_attempts : int = 20) -> None:
+        GameBoard.board_spec(difficulty, rows, cols, num_mines)
+        if num_mines > rows * cols - 9:
+            raise ValueError("Too many mines to keep a safe opening around the start cell")
+        self.rows, self.cols, self.num_mines = rows, cols, num_mines
+        self.difficulty = difficulty
+        self.rng = random.Random(seed)
+        self.max_attempts = max_attempts
+
+    def generate(self, start : tuple[int, int] = None) -> tuple[GameBoard, tuple[int, int]]:
+        '''
+        Generate a board solvable without guessing from the start cell.
+
+        :param start: The first cell revealed, the center of the board by default.
+        :return: A fresh board and the start cell (a zero cell the game should begin by revealing).
+        :raises RuntimeError: If no board could be built within max_attempts placements.
+        '''
+        if start is None:
+            start = (self.rows // 2, self.cols // 2)
+        for _ in range(self.max_attempts):
+            mines = self._solve(self._place(start), start)
+            if mines is not None:
+                board = GameBoard.from_mines(self.rows, self.cols, mines, self.difficulty)
+                return board, start
+        raise RuntimeError(f"No no-guess board found in {self.max_attempts} attempts")
+
+    def _place(self, start : tuple[int, int]) -> GameBoard:
+        excluded = _zone(self.rows, self.cols, *start)
+        drawn = self.rng.sample(range(self.rows * self.cols), self.num_mines + len(excluded))
+        mines = [index for index in drawn if index not in excluded][:self.num_mines]
+        return GameBoard.from_mines(self.rows, self.cols, mines, self.difficulty)
+
+    def _solve(self, board : GameBoard, start : tuple[int, int]) -> list[int] | None:
+        '''
+        Solve the board with certain moves only, relocating mines when stuck.
+
+        :return: The flat indices of the final mines, or None if the board has to be drawn again.
+        '''
+        solver = Solver(board)
+        board._reveal_cell(*start)
+        while not board.is_game_won:
+            hint = solver.next_hint(guess=False)
+            if hint is not None:
+                if hint.action == 'reveal':
+                    board._reveal_cell(hint.row, hint.col)
+                else:
+                    board._flag_cell(hint.row, hint.col)
+                board._check_victory()
+            elif not self._relocate(board, solver):
+                return None
+        mines = board.board.mines
+        return [index for index in range(board.board.size) if mines[index]]
+
+    def _relocate(self, board : GameBoard, solver : Solver) -> bool:
+        '''
+        Move away the mines hidden around one frontier number, which then proves its neighbors safe.
+
+        :return: False if there is no frontier or no room to move the mines to.
+        '''
+        frontier = sorted(solver._frontier)
+        self.rng.shuffle(frontier)
+        for number in frontier:
+            unknown, _ = solver._constraint(number)
+            moved = [index for index in unknown if board.board.mines[index]]
+            if not moved:
+                continue
+            targets = self._far_cells(board, solver, len(moved), unknown)
+            if targets is None:
+                return False
+            changed = []
+            for source, target in zip(moved, targets):
+                changed.extend(self._move_mine(board, source, target))
+            # Let the solver re-evaluate the numbers around the moved mines
+            board._record_changes(changed)
+            return True
+        return False
+
+    def _far_cells(self, board : GameBoard, solver : Solver, count : int, excluded) -> list[int] | None:
+        '''
+        Pick hidden safe cells that are not next to any revealed cell nor known to the solver.
+        '''
+        grid = board.board
+        revealed, mines = grid.revealed, grid.mines
+
+        def is_far(index : int) -> bool:
+            if mines[index] or grid.flagged[index] or index in excluded or not solver._is_unknown(index):
+                return False
+            return not any(revealed[n] for n in solver._neighbors(index))
+
+        found = set()
+        for _ in range(count * 32):
+            index = self.rng.randrange(grid.size)
+            if index not in found and is_far(index):
+                found.add(index)
+                if len(found) == count:
+                    return list(found)
+        candidates = [index for index in range(grid.size) if index not in found and is_far(index)]
+        if len(candidates) < count - len(found):
+            return None
+        return list(found) + self.rng.sample(candidates, count - len(found))
+
+    def _move_mine(self, board : GameBoard, source : int, target : int) -> list[int]:
+        '''
+        Move a mine and update the adjacent counts around both cells.
+
+        :return: The flat indices whose content changed.
+        '''
+        grid = board.board
+        cols = board.cols
+        grid.mines[source] = 0
+        grid.mines[target] = 1
+        changed = [source, target]
+        for index, delta in ((source, -1), (target, 1)):
+            row, col = divmod(index, cols)
+            for r in range(max(row - 1, 0), min(row + 2, board.rows)):
+                for c in range(max(col - 1, 0), min(col + 2, cols)):
+                    n = r * cols + c
+                    if n != index and not grid.mines[n]:
+                        grid.adjacent[n] += delta
+                        changed.append(n)
+        grid.adjacent[target] = 0
+        grid.adjacent[source] = board._count_near_mines(*divmod(source, cols))
+        return changed
+
+
+def _generate_payload(rows : int, cols : int, num_mines : int, difficulty : str, seed : int) -> tuple:
+    '''
+    Worker side of NoGuessPool: generate a board and return it in a compact picklable form.
+    '''
+    board, start = NoGuessGenerator(rows, cols, num_mines, difficulty, seed).generate()
+    return bytes(board.board.mines), start
+
+
+class NoGuessPool:
+    '''
+    Pre-generate no-guess boards in background processes so that starting a game never waits.
+
+    `depth` boards per board size are kept in flight; get() takes a finished one if there is any.
+    '''
+
+    def __init__(self, depth : int = 2, workers : int = None) -> None:
+        self.depth = depth
+        self._executor = ProcessPoolExecutor(max_workers=workers or max(1, (os.cpu_count() or 2) - 1))
+        self._pending = {}
+        self._seeds = random.Random()
+
+    def prepare(self, rows : int, cols : int, num_mines : int, difficulty : str = 'Custom') -> None:
+        '''
+        Start generating boards of a given size in the background.
+        '''
+        key = (rows, cols, num_mines, difficulty)
+        pending = self._pending.setdefault(key, [])
+        while len(pending) < self.depth:
+            pending.append(self._executor.submit(_generate_payload, *key, self._seeds.getrandbits(64)))
+
+    def get(self, rows : int, cols : int, num_mines : int, difficulty : str = 'Custom') -> tuple[GameBoard, tuple[int, int]] | None:
+        '''
+        Take a pre-generated board without blocking.
+
+        :return: The board and its start cell, or None if none is ready yet.
+        '''
+        key = (rows, cols, num_mines, difficulty)
+        pending = self._pending.get(key, [])
+        ready = next((future for future in pending if future.done()), None)
+        result = None
+        if ready is not None:
+            pending.remove(ready)
+            result = self._unpack(ready, key)
+        self.prepare(*key)
+        return result
+
+    def _unpack(self, future : Future, key : tuple) -> tuple[GameBoard, tuple[int, int]] | None:
+        if future.exception() is not None:
+            return None
+        mine_plane, start = future.result()
+        rows, cols, _, difficulty = key
+        mines = [index for index, mine in enumerate(mine_plane) if mine]
+        return GameBoard.from_mines(rows, cols, mines, difficulty), start
+
+    def shutdown(self) -> None:
+        '''
+        Drop the queued boards and stop the workers.
+        '''
+        self._executor.shutdown(wait=True, cancel_futures=True)
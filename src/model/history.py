@@ -0,0 +1,90 @@
+'''
+Move journal for undo/redo.
+
+A move is stored as the flat indices of the cells it changed (an array of 4-byte integers)
+plus the game state before it, never as a copy of the board. Undoing or redoing a move costs
+the number of cells it changed, and the journal keeps at most `size` moves: the oldest ones
+are forgotten.
+'''
+from array import array
+from collections import deque
+
+
+class Move:
+    '''
+    One reveal (single cell or whole opening) or one flag toggle.
+    '''
+    __slots__ = ('kind', 'cells', 'was_over', 'was_won')
+
+    REVEAL = 'reveal'
+    FLAG = 'flag'
+
+    def __init__(self, kind : str, cells, was_over : bool = False, was_won : bool = False) -> None:
+        self.kind = kind
+        self.cells = array('i', cells)
+        # Game state before the move
+        self.was_over = was_over
+        self.was_won = was_won
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+
+class MoveJournal:
+    '''
+    Bounded undo stack and the redo stack of the moves undone since the last new move.
+    '''
+
+    def __init__(self, size : int = 1000) -> None:
+        if size < 0:
+            raise ValueError(f"size must be positive, got {size!r}")
+        self._undo = deque(maxlen=size)
+        self._redo = []
+
+    @property
+    def size(self) -> int:
+        return self._undo.maxlen
+
+    def resize(self, size : int) -> None:
+        '''
+        Change the number of moves kept, dropping the oldest ones if needed.
+        '''
+        if size < 0:
+            raise ValueError(f"size must be positive, got {size!r}")
+        self._undo = deque(self._undo, maxlen=size)
+        # The redo moves furthest from the current state go first
+        del self._redo[:max(0, len(self._redo) - size)]
+
+    def record(self, move : Move) -> None:
+        '''
+        Add a new move; the moves undone before it can no longer be redone.
+        '''
+        self._undo.append(move)
+        self._redo.clear()
+
+    def pop_undo(self) -> Move | None:
+        if not self._undo:
+            return None
+        move = self._undo.pop()
+        self._redo.append(move)
+        return move
+
+    def pop_redo(self) -> Move | None:
+        if not self._redo:
+            return None
+        move = self._redo.pop()
+        self._undo.append(move)
+        return move
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+
+    def __len__(self) -> int:
+        return len(self._undo)
@@ -0,0 +1,121 @@
+'''
+Precomputed openings: connected regions of zero cells plus their numbered border.
+
+Openings only depend on the mines, so once the board is generated they can be labeled
+with one union-find pass. A click on a zero cell then reveals its whole opening in a
+single bulk operation instead of running a flood fill.
+'''
+from array import array
+
+from .compact_board import CompactBoard
+
+
+class OpeningIndex:
+    '''
+    Connected-component labeling of the zero cells of a board (8-connectivity).
+
+    - labels[i]: label of the opening of the zero cell i, -1 for the other cells
+    - zeros[label]: flat indices of the zero cells of the opening
+    - borders[label]: flat indices of the numbered cells around the opening
+    '''
+
+    def __init__(self, board : CompactBoard) -> None:
+        self.labels = array('i', [-1]) * board.size
+        self.zeros = []
+        self.borders = []
+        self._build(board)
+
+    def _build(self, board : CompactBoard) -> None:
+        rows, cols = board.rows, board.cols
+        mines, adjacent = board.mines, board.adjacent
+        parent = array('i', range(board.size))
+
+        def find(i : int) -> int:
+            root = i
+            while parent[root] != root:
+                root = parent[root]
+            # Path compression
+            while parent[i] != root:
+                parent[i], i = root, parent[i]
+            return root
+
+        def is_zero(i : int) -> bool:
+            return not adjacent[i] and not mines[i]
+
+        # Union each zero cell with its already visited zero neighbors
+        for row in range(rows):
+            start = row * cols
+            for col in range(cols):
+                i = start + col
+                if not is_zero(i):
+                    continue
+                candidates = []
+                if col > 0:
+                    candidates.append(i - 1)
+                if row > 0:
+                    up = i - cols
+                    candidates.append(up)
+                    if col > 0:
+                        candidates.append(up - 1)
+                    if col < cols - 1:
+                        candidates.append(up + 1)
+                for j in candidates:
+                    if is_zero(j):
+                        root_i, root_j = find(i), find(j)
+                        if root_i != root_j:
+                            parent[root_i] = root_j
+
+        # Give each root a compact label and group the zero cells
+        root_labels = {}
+        labels = self.labels
+        for i in range(board.size):
+            if is_zero(i):
+                root = find(i)
+                label = root_labels.get(root)
+                if label is None:
+                    label = root_labels[root] = len(self.zeros)
+                    self.zeros.append(array('i'))
+                    self.borders.append(array('i'))
+                labels[i] = label
+                self.zeros[label].append(i)
+
+        # Attach every numbered cell to the openings it touches
+        for i in range(board.size):
+            if mines[i] or not adjacent[i]:
+                continue
+            row, col = divmod(i, cols)
+            touched = set()
+            for r in range(max(row - 1, 0), min(row + 2, rows)):
+                for c in range(max(col - 1, 0), min(col + 2, cols)):
+                    label = labels[r * cols + c]
+                    if label >= 0:
+                        touched.add(label)
+            for label in touched:
+                self.borders[label].append(i)
+
+    def __len__(self) -> int:
+        return len(self.zeros)
+
+    def reveal(self, board : CompactBoard, index : int) -> list[int] | None:
+        '''
+        Reveal the whole opening of a zero cell in one operation.
+
+        :param board: The board the index was built from.
+        :param index: Flat index of a zero cell.
+        :return: Flat indices of the newly revealed cells, or None if a flag lies on a zero
+                 cell of the opening (it would split the opening, a flood fill is needed).
+        '''
+        label = self.labels[index]
+        if label < 0:
+            return None
+        revealed, flagged = board.revealed, board.flagged
+        zeros = self.zeros[label]
+        if any(flagged[i] for i in zeros):
+            return None
+        changed = []
+        for cells in (zeros, self.borders[label]):
+            for i in cells:
+                if not revealed[i] and not flagged[i]:
+                    revealed[i] = 1
+                    changed.append(i)
+        return changed
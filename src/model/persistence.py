@@ -0,0 +1,154 @@
+'''
+Binary save format of a game in progress.
+
+Layout (little-endian), version 1:
+
+- header: magic b'HMSV', version (uint16), rows, cols, num_mines, count_flags, count_mines,
+  safe_remaining (uint32 each), state (uint8: bit 0 game over, bit 1 game won),
+  length of the difficulty label (uint16)
+- the difficulty label, UTF-8
+- the mine, revealed and flagged planes, one bit per cell (cell i is bit i % 8 of byte i // 8)
+
+The adjacent counts are not stored, they are recomputed from the mines, and the counters of the
+header are checked against the planes. Saves are read through mmap and the planes are unpacked
+in bulk, never cell by cell. The move history is not saved.
+'''
+import mmap
+import os
+import struct
+
+from .game_model import GameBoard
+
+MAGIC = b'HMSV'
+VERSION = 1
+HEADER = struct.Struct('<4sH6IBH')
+
+GAME_OVER = 0b01
+GAME_WON = 0b10
+
+# Plane bytes (0/1) to ASCII digits and back, for the bulk bit packing
+_TO_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+_FROM_DIGITS = bytes.maketrans(b'01', b'\x00\x01')
+
+
+class SaveFormatError(ValueError):
+    '''
+    The data is not a valid save of a supported version.
+    '''
+
+
+def pack_bits(plane : bytes) -> bytes:
+    '''
+    Pack a plane of 0/1 bytes into bits, 8 cells per byte.
+    '''
+    if not plane:
+        return b''
+    # The last cell is the first digit: cell 0 becomes the lowest bit
+    return int(plane[::-1].translate(_TO_DIGITS), 2).to_bytes((len(plane) + 7) // 8, 'little')
+
+
+def unpack_bits(data, size : int) -> bytearray:
+    '''
+    Unpack the first `size` cells of a bit-packed plane into 0/1 bytes.
+    '''
+    if not size:
+        return bytearray()
+    digits = format(int.from_bytes(data, 'little'), f'0{size}b').encode()
+    if len(digits) > size:
+        raise SaveFormatError("Padding bits set in a plane")
+    return bytearray(digits[::-1].translate(_FROM_DIGITS))
+
+
+def dumps(board : GameBoard) -> bytes:
+    '''
+    Serialize the state of a game.
+    '''
+    difficulty = board.difficulty.encode()
+    state = (GAME_OVER if board.is_game_over else 0) | (GAME_WON if board.is_game_won else 0)
+    header = HEADER.pack(MAGIC, VERSION, board.rows, board.cols, board.num_mines, board.count_flags,
+                         board.count_mines, board.safe_remaining, state, len(difficulty))
+    grid = board.board
+    return b''.join((header, difficulty, pack_bits(grid.mines), pack_bits(grid.revealed), pack_bits(grid.flagged)))
+
+
+def loads(data) -> GameBoard:
+    '''
+    Restore a game serialized by dumps().
+
+    :param data: Any buffer (bytes, memoryview, mmap).
+    :raises SaveFormatError: If the data is not a valid save.
+    '''
+    # Only copies outlive the view: a buffer (an mmap) can be closed even after an error
+    with memoryview(data) as view:
+        if len(view) < HEADER.size:
+            raise SaveFormatError("Truncated header")
+        (magic, version, rows, cols, num_mines, count_flags, count_mines, safe_remaining, state,
+         label_size) = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise SaveFormatError("Not a Haunted Manor save")
+        if version != VERSION:
+            raise SaveFormatError(f"Unsupported save version {version}")
+        size = rows * cols
+        plane_size = (size + 7) // 8
+        offset = HEADER.size + label_size
+        if len(view) != offset + 3 * plane_size:
+            raise SaveFormatError("Truncated or oversized save")
+        label = bytes(view[HEADER.size:offset])
+        packed = [bytes(view[offset + i * plane_size:offset + (i + 1) * plane_size]) for i in range(3)]
+    try:
+        difficulty = label.decode()
+        GameBoard.board_spec(difficulty, rows, cols, num_mines)
+    except ValueError as error:
+        # UnicodeDecodeError included
+        raise SaveFormatError(str(error)) from error
+
+    mines, revealed, flagged = (unpack_bits(plane, size) for plane in packed)
+    if mines.count(1) != num_mines:
+        raise SaveFormatError("The mine plane does not match the number of mines")
+    # The counters of the header must agree with the planes
+    flags = flagged.count(1)
+    revealed_mines = (int.from_bytes(packed[0], 'little') & int.from_bytes(packed[1], 'little')).bit_count()
+    if (count_flags, count_mines) != (flags, num_mines - flags):
+        raise SaveFormatError("The flag counters do not match the flagged plane")
+    if safe_remaining != size - num_mines - (revealed.count(1) - revealed_mines):
+        raise SaveFormatError("The safe cell counter does not match the revealed plane")
+
+    board = GameBoard.__new__(GameBoard)
+    board.difficulty = difficulty
+    board._set_seed(None)
+    board.rows, board.cols, board.num_mines = rows, cols, num_mines
+    board.board = board._create_board()
+    board.board.mines = mines
+    board._start_game(False)
+    board.board.revealed, board.board.flagged = revealed, flagged
+    board.count_flags, board.count_mines, board.safe_remaining = count_flags, count_mines, safe_remaining
+    board.is_game_over = bool(state & GAME_OVER)
+    board.is_game_won = bool(state & GAME_WON)
+    return board
+
+
+def save_game(board : GameBoard, path : str) -> None:
+    '''
+    Write a save file. The previous save is only replaced once the new one is complete.
+    '''
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(dumps(board))
+    os.replace(temporary, path)
+
+
+def load_game(path : str) -> GameBoard:
+    '''
+    Read a save file through mmap.
+
+    :raises OSError: If the file can't be read.
+    :raises SaveFormatError: If the file is not a valid save.
+    '''
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            raise SaveFormatError("Empty save")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return loads(mapped)
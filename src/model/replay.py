@@ -0,0 +1,239 @@
+'''
+Replays: the seed and size of a game plus its timestamped clicks.
+
+A board is fully determined by its seed and size (see GameBoard seed), so a replay never stores
+the mines. Replays are written back to back in a binary file, little-endian, version 1:
+
+- header: magic b'HMRP', version (uint16), rows, cols, num_mines (uint32 each), seed (uint64),
+  outcome (uint8), number of clicks (uint32), length of the difficulty label (uint16)
+- the difficulty label, UTF-8
+- the clicks: time since the start of the game in ms (uint32), action (uint8), flat index of the cell (uint32)
+
+Action codes are only ever appended to ACTIONS, so that older files keep their meaning.
+'''
+import os
+import struct
+import time
+
+from .game_model import GameBoard
+
+MAGIC = b'HMRP'
+VERSION = 1
+HEADER = struct.Struct('<4sH3IQBIH')
+CLICK = struct.Struct('<IBI')
+
+# Action codes, by position
+ACTIONS = ('left', 'right', 'undo', 'redo', 'chord')
+ACTION_CODES = {action : code for code, action in enumerate(ACTIONS)}
+
+# Outcome codes, by position
+OUTCOMES = ('unfinished', 'won', 'lost')
+
+
+class ReplayFormatError(ValueError):
+    '''
+    The data is not a valid replay file of a supported version.
+    '''
+
+
+class Replay:
+    '''
+    One recorded game.
+    - clicks: (milliseconds since the start, action, row, col); undo/redo clicks have no cell (0, 0)
+    - outcome: 'unfinished', 'won' or 'lost'
+    '''
+    __slots__ = ('seed', 'rows', 'cols', 'num_mines', 'difficulty', 'clicks', 'outcome')
+
+    def __init__(self, seed : int, rows : int, cols : int, num_mines : int, difficulty : str = 'Custom',
+                 clicks : list = None, outcome : str = 'unfinished') -> None:
+        self.seed = seed
+        self.rows, self.cols, self.num_mines = rows, cols, num_mines
+        self.difficulty = difficulty
+        self.clicks = [] if clicks is None else clicks
+        self.outcome = outcome
+
+    @classmethod
+    def of(cls, board : GameBoard) -> 'Replay':
+        '''
+        Start the replay of a board created with a seed.
+        :raises ValueError: If the board has no seed (mines given explicitly or restored from a save).
+        '''
+        if board.seed is None:
+            raise ValueError("Only the boards created from a seed can be replayed")
+        return cls(board.seed, board.rows, board.cols, board.num_mines, board.difficulty)
+
+    def board(self) -> GameBoard:
+        '''
+        Build the board of the game, before any click.
+        '''
+        return GameBoard(self.difficulty, rows=self.rows, cols=self.cols, num_mines=self.num_mines, seed=self.seed)
+
+    def __eq__(self, other : object) -> bool:
+        return isinstance(other, Replay) and all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return (f"Replay(seed={self.seed}, size={self.rows}x{self.cols}, mines={self.num_mines}, "
+                f"clicks={len(self.clicks)}, outcome={self.outcome!r})")
+
+
+def outcome_of(board : GameBoard) -> str:
+    if board.is_game_over:
+        return 'lost'
+    return 'won' if board.is_game_won else 'unfinished'
+
+
+def play_click(board : GameBoard, action : str, row : int, col : int) -> None:
+    '''
+    Apply one recorded click to a board, as the controller does.
+    '''
+    if action == 'left':
+        board._reveal_cell(row, col)
+    elif action == 'right':
+        board._flag_cell(row, col)
+    elif action == 'chord':
+        board._chord_cell(row, col)
+    elif action == 'undo':
+        board.undo()
+    elif action == 'redo':
+        board.redo()
+    else:
+        raise ValueError(f"Unknown action {action!r}")
+    board._check_victory()
+
+
+class ReplayRecorder:
+    '''
+    Record the clicks of a game as they are played.
+    '''
+
+    def __init__(self, board : GameBoard) -> None:
+        self.replay = Replay.of(board)
+        self._start = time.perf_counter()
+
+    def record(self, action : str, row : int = 0, col : int = 0) -> None:
+        milliseconds = int((time.perf_counter() - self._start) * 1000)
+        self.replay.clicks.append((milliseconds, action, row, col))
+
+    def finish(self, board : GameBoard) -> Replay:
+        '''
+        Set the outcome of the game from the board state.
+        :return: The recorded replay.
+        '''
+        self.replay.outcome = outcome_of(board)
+        return self.replay
+
+
+class ReplayResult:
+    '''
+    Outcome of a replay played again, compared with the recorded one.
+    '''
+    __slots__ = ('outcome', 'expected', 'seconds')
+
+    def __init__(self, outcome : str, expected : str, seconds : float) -> None:
+        self.outcome = outcome
+        self.expected = expected
+        self.seconds = seconds
+
+    @property
+    def matches(self) -> bool:
+        return self.outcome == self.expected
+
+
+def replay_game(replay : Replay) -> ReplayResult:
+    '''
+    Play the clicks of a replay again on a rebuilt board, without any display.
+    '''
+    start = time.perf_counter()
+    board = replay.board()
+    for _, action, row, col in replay.clicks:
+        play_click(board, action, row, col)
+    return ReplayResult(outcome_of(board), replay.outcome, time.perf_counter() - start)
+
+
+def dumps(replays) -> bytes:
+    '''
+    Serialize replays, back to back.
+    '''
+    parts = []
+    for replay in replays:
+        label = replay.difficulty.encode()
+        parts.append(HEADER.pack(MAGIC, VERSION, replay.rows, replay.cols, replay.num_mines, replay.seed,
+                                 OUTCOMES.index(replay.outcome), len(replay.clicks), len(label)))
+        parts.append(label)
+        cols = replay.cols
+        parts.extend(CLICK.pack(milliseconds, ACTION_CODES[action], row * cols + col)
+                     for milliseconds, action, row, col in replay.clicks)
+    return b''.join(parts)
+
+
+def iter_loads(data):
+    '''
+    Read the replays of a buffer one by one.
+    :raises ReplayFormatError: If the data is not a valid replay file.
+    '''
+    data = memoryview(data)
+    offset = 0
+    while offset < len(data):
+        if len(data) - offset < HEADER.size:
+            raise ReplayFormatError("Truncated replay header")
+        magic, version, rows, cols, num_mines, seed, outcome, count, label_size = HEADER.unpack_from(data, offset)
+        if magic != MAGIC:
+            raise ReplayFormatError("Not a Haunted Manor replay")
+        if version != VERSION:
+            raise ReplayFormatError(f"Unsupported replay version {version}")
+        offset += HEADER.size
+        end = offset + label_size + count * CLICK.size
+        if end > len(data) or outcome >= len(OUTCOMES):
+            raise ReplayFormatError("Truncated or corrupt replay")
+        difficulty = bytes(data[offset:offset + label_size]).decode()
+        offset += label_size
+        clicks = []
+        try:
+            for milliseconds, code, index in CLICK.iter_unpack(data[offset:end]):
+                row, col = divmod(index, cols)
+                clicks.append((milliseconds, ACTIONS[code], row, col))
+        except (IndexError, ZeroDivisionError) as error:
+            raise ReplayFormatError("Corrupt replay click") from error
+        offset = end
+        yield Replay(seed, rows, cols, num_mines, difficulty, clicks, OUTCOMES[outcome])
+
+
+def loads(data) -> list[Replay]:
+    return list(iter_loads(data))
+
+
+def save_replays(replays, path : str, append : bool = False, keep : int = None) -> None:
+    '''
+    Write replays to a file, or add them at its end.
+
+    :param keep: The number of most recent replays the file keeps, the older ones are dropped
+                 (None: no limit). A file that can't be read is then replaced.
+    '''
+    if keep is None:
+        with open(path, 'ab' if append else 'wb') as file:
+            file.write(dumps(replays))
+        return
+    replays = list(replays)
+    if append:
+        try:
+            replays = load_replays(path) + replays
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            # ReplayFormatError or a label that is not UTF-8: the file starts over
+            pass
+    replays = replays[max(len(replays) - keep, 0):]
+    # The previous file is only replaced once the new one is complete
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(dumps(replays))
+    os.replace(temporary, path)
+
+
+def load_replays(path : str) -> list[Replay]:
+    '''
+    :raises OSError: If the file can't be read.
+    :raises ReplayFormatError: If the file is not a valid replay file.
+    '''
+    with open(path, 'rb') as file:
+        return loads(file.read())
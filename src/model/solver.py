@@ -0,0 +1,236 @@
+'''
+Constraint-propagation solver working from what the player can see: revealed numbers and flags.
+
+Each revealed number is a constraint "the hidden neighbors hold number - flags mines".
+Two rules are applied:
+
+- single cell: no mine left around a number means all its hidden neighbors are safe,
+  as many mines left as hidden neighbors means they are all mines
+- subset: if the hidden neighbors of A are a subset of those of B, the cells only around B
+  hold the difference of their remaining mines
+
+The solver is incremental: it listens to the board changes and only re-evaluates the numbers
+around the cells changed by the last moves. When nothing is certain, it estimates the mine
+probability of the frontier cells and of the other hidden cells and picks the safest guess.
+'''
+import random
+from typing import NamedTuple
+
+from .game_model import GameBoard
+
+
+class Hint(NamedTuple):
+    row : int
+    col : int
+    # 'reveal' or 'flag'
+    action : str
+    # Estimated probability that the cell holds a mine: 0.0 and 1.0 are certain
+    probability : float
+
+    @property
+    def is_certain(self) -> bool:
+        return self.probability in (0.0, 1.0)
+
+
+class Solver:
+    '''
+    Incremental solver attached to a GameBoard.
+    '''
+
+    def __init__(self, board : GameBoard, seed : int = 0) -> None:
+        self.board = board
+        self.rng = random.Random(seed)
+        # Hidden cells proven safe, and unflagged cells proven to be mines
+        self.safe = set()
+        self.mines = set()
+        # Revealed numbers whose constraint must be re-evaluated
+        self._dirty = set()
+        # Revealed numbers that still have unknown neighbors
+        self._frontier = set()
+        revealed, adjacent = board.board.revealed, board.board.adjacent
+        self._dirty.update(i for i in range(board.board.size) if revealed[i] and adjacent[i])
+        board.add_listener(self._on_change)
+
+    def close(self) -> None:
+        '''
+        Detach the solver from its board.
+        '''
+        self.board.remove_listener(self._on_change)
+
+    def _neighbors(self, index : int) -> list[int]:
+        rows, cols = self.board.rows, self.board.cols
+        row, col = divmod(index, cols)
+        if 0 < row < rows - 1 and 0 < col < cols - 1:
+            # Inner cell, no bound to check
+            up, down = index - cols, index + cols
+            return [up - 1, up, up + 1, index - 1, index + 1, down - 1, down, down + 1]
+        return [r * cols + c
+                for r in range(max(row - 1, 0), min(row + 2, rows))
+                for c in range(max(col - 1, 0), min(col + 2, cols))
+                if r != row or c != col]
+
+    def _mark_around(self, index : int) -> None:
+        '''
+        Mark dirty the revealed numbers around a cell whose status changed.
+        '''
+        revealed, adjacent = self.board.board.revealed, self.board.board.adjacent
+        for n in self._neighbors(index):
+            if revealed[n] and adjacent[n]:
+                self._dirty.add(n)
+
+    def _on_change(self, indices) -> None:
+        revealed, adjacent = self.board.board.revealed, self.board.board.adjacent
+        for index in indices:
+            # Forget the deductions about the cell, they are re-derived if still useful
+            self.safe.discard(index)
+            self.mines.discard(index)
+            if revealed[index] and adjacent[index]:
+                self._dirty.add(index)
+            elif not revealed[index]:
+                # Hidden again by an undo: its number is no longer known
+                self._frontier.discard(index)
+                self._dirty.discard(index)
+            self._mark_around(index)
+
+    def _constraint(self, index : int) -> tuple[frozenset, int]:
+        '''
+        :return: The unknown neighbors of a revealed number and the number of mines among them.
+        '''
+        board = self.board.board
+        revealed, flagged = board.revealed, board.flagged
+        unknown = []
+        mines = 0
+        for n in self._neighbors(index):
+            if flagged[n] or n in self.mines:
+                mines += 1
+            elif not revealed[n] and n not in self.safe:
+                unknown.append(n)
+        return frozenset(unknown), board.adjacent[index] - mines
+
+    def _deduce(self, cells, is_mine : bool) -> None:
+        target = self.mines if is_mine else self.safe
+        for cell in cells:
+            if cell not in target:
+                target.add(cell)
+                self._mark_around(cell)
+
+    def _update(self) -> None:
+        '''
+        Propagate the constraints of the dirty numbers until nothing new is deduced.
+        '''
+        while self._dirty:
+            dirty, self._dirty = self._dirty, set()
+            constraints = {}
+            for index in dirty:
+                unknown, remaining = self._constraint(index)
+                if not unknown:
+                    self._frontier.discard(index)
+                    continue
+                self._frontier.add(index)
+                if remaining == 0:
+                    self._deduce(unknown, False)
+                elif remaining == len(unknown):
+                    self._deduce(unknown, True)
+                else:
+                    constraints[index] = (unknown, remaining)
+            self._apply_subsets(constraints)
+
+    def _apply_subsets(self, constraints : dict) -> None:
+        '''
+        Subset rule between each undecided dirty number and the numbers sharing unknown cells with it.
+        '''
+        revealed, adjacent = self.board.board.revealed, self.board.board.adjacent
+        for index, (unknown_a, remaining_a) in constraints.items():
+            others = set()
+            for cell in unknown_a:
+                others.update(n for n in self._neighbors(cell) if n != index and revealed[n] and adjacent[n])
+            for other in others:
+                unknown_b, remaining_b = self._constraint(other)
+                for small, large, r_small, r_large in ((unknown_a, unknown_b, remaining_a, remaining_b),
+                                                       (unknown_b, unknown_a, remaining_b, remaining_a)):
+                    if small and small < large:
+                        rest = large - small
+                        if r_large - r_small == 0:
+                            self._deduce(rest, False)
+                        elif r_large - r_small == len(rest):
+                            self._deduce(rest, True)
+
+    def _is_unknown(self, index : int) -> bool:
+        board = self.board.board
+        return not (board.revealed[index] or board.flagged[index] or index in self.safe or index in self.mines)
+
+    def _guess(self) -> Hint | None:
+        '''
+        Pick the hidden cell with the lowest estimated mine probability.
+        A frontier cell is estimated with its most pessimistic constraint, the other cells with
+        the density of the mines left on the unknown cells.
+        '''
+        board = self.board
+        probabilities = {}
+        for index in self._frontier:
+            unknown, remaining = self._constraint(index)
+            if not unknown:
+                continue
+            probability = remaining / len(unknown)
+            for cell in unknown:
+                if probabilities.get(cell, -1.0) < probability:
+                    probabilities[cell] = probability
+
+        unknown_count = board.safe_remaining + board.num_mines - board.count_flags - len(self.safe) - len(self.mines)
+        if unknown_count <= 0:
+            return None
+        mines_left = board.num_mines - board.count_flags - len(self.mines)
+        density = min(max(mines_left / unknown_count, 0.0), 1.0)
+
+        best = min(probabilities.items(), key=lambda item: (item[1], item[0]), default=None)
+        if best is not None and best[1] <= density:
+            return Hint(*divmod(best[0], board.cols), 'reveal', best[1])
+
+        # A cell away from the frontier
+        size = board.board.size
+        for _ in range(64):
+            index = self.rng.randrange(size)
+            if self._is_unknown(index) and index not in probabilities:
+                return Hint(*divmod(index, board.cols), 'reveal', density)
+        for index in range(size):
+            if self._is_unknown(index) and index not in probabilities:
+                return Hint(*divmod(index, board.cols), 'reveal', density)
+        if best is not None:
+            return Hint(*divmod(best[0], board.cols), 'reveal', best[1])
+        return None
+
+    def next_hint(self, guess : bool = True) -> Hint | None:
+        '''
+        Get the next move, certain ones first.
+
+        :param guess: Allow a probabilistic guess when no move is certain.
+        :return: The hint, or None if the game is over or nothing can be suggested.
+        '''
+        board = self.board
+        if board.is_game_over or board.is_game_won:
+            return None
+        self._update()
+        if self.safe:
+            index = min(self.safe)
+            return Hint(*divmod(index, board.cols), 'reveal', 0.0)
+        if self.mines and board.count_flags < board.num_mines:
+            index = min(self.mines)
+            return Hint(*divmod(index, board.cols), 'flag', 1.0)
+        return self._guess() if guess else None
+
+    def solve_step(self, guess : bool = True) -> Hint | None:
+        '''
+        Play the next hint on the board.
+
+        :param guess: Allow a probabilistic guess when no move is certain.
+        :return: The hint played, or None if there was nothing to play.
+        '''
+        hint = self.next_hint(guess)
+        if hint is None:
+            return None
+        if hint.action == 'reveal':
+            self.board._reveal_cell(hint.row, hint.col)
+        else:
+            self.board._flag_cell(hint.row, hint.col)
+        self.board._check_victory()
+        return hint
@@ -0,0 +1,4 @@
+from .protocol import ProtocolError
+from .server import GameServer
+from .sessions import Session, SessionManager
+from .sharding import ShardedGameServer, ShardPool
\ No newline at end of file
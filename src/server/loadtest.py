@@ -0,0 +1,230 @@
+'''
+Local load test of the game server: many clients playing thousands of sessions at once.
+
+Each connection plays its sessions in turn, one request in flight at a time, and measures the
+time from sending a request to reading its reply. With --coop N, groups of N connections play
+the same sessions and receive each other's moves as events. Without --port, the server runs in
+this process, on the same event loop.
+
+Usage:
+    python -m src.server.loadtest --connections 100 --sessions 20 --duration 10 [--coop 2] [--port 8765]
+'''
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+
+from .protocol import HIDDEN, encode
+from .server import LINE_LIMIT, GameServer
+
+
+class LocalBoard:
+    '''
+    What a client knows of a session: which cells can still be clicked.
+    '''
+    __slots__ = ('hidden', 'cols', 'state')
+
+    def __init__(self, message : dict) -> None:
+        self.hidden = bytearray(b'\x01') * (message['rows'] * message['cols'])
+        self.cols = message['cols']
+        self.state = 'playing'
+        self.update(message)
+
+    def update(self, message : dict) -> None:
+        hidden = self.hidden
+        for index, code in message.get('cells', ()):
+            hidden[index] = code == HIDDEN
+        self.state = message.get('state', self.state)
+
+    def pick(self, rng : random.Random) -> tuple[int, int] | None:
+        '''
+        A random hidden cell, or None when every cell is revealed or flagged.
+        '''
+        hidden = self.hidden
+        for _ in range(8):
+            index = rng.randrange(len(hidden))
+            if hidden[index]:
+                return divmod(index, self.cols)
+        index = hidden.find(1, rng.randrange(len(hidden)))
+        if index < 0:
+            index = hidden.find(1)
+        return None if index < 0 else divmod(index, self.cols)
+
+
+class LoadClient:
+    '''
+    One connection: requests are matched with their replies by id, events update the boards.
+    '''
+
+    def __init__(self, reader : asyncio.StreamReader, writer : asyncio.StreamWriter) -> None:
+        self.reader, self.writer = reader, writer
+        self.boards = {}
+        self.events = 0
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._task = asyncio.create_task(self._read())
+
+    @classmethod
+    async def connect(cls, host : str, port : int) -> 'LoadClient':
+        return cls(*await asyncio.open_connection(host, port, limit=LINE_LIMIT))
+
+    async def request(self, op : str, **fields) -> dict:
+        request_id = next(self._ids)
+        reply = self._pending[request_id] = asyncio.get_running_loop().create_future()
+        self.writer.write(encode({'id': request_id, 'op': op, **fields}))
+        return await reply
+
+    async def _read(self) -> None:
+        while line := await self.reader.readline():
+            message = json.loads(line)
+            event = message.get('event')
+            if event is None:
+                self._pending.pop(message['id']).set_result(message)
+                continue
+            self.events += 1
+            if event == 'restart':
+                self.boards[message['session']] = LocalBoard(message)
+            elif message['session'] in self.boards:
+                self.boards[message['session']].update(message)
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self.writer.wait_closed()
+        await self._task
+
+
+class LoadReport:
+    '''
+    Results of a load test; latencies in seconds, one per request.
+    '''
+
+    def __init__(self, sessions : int, seconds : float, latencies : list[float], moves : int,
+                 errors : int, events : int) -> None:
+        self.sessions = sessions
+        self.seconds = seconds
+        self.latencies = sorted(latencies)
+        self.moves = moves
+        self.errors = errors
+        self.events = events
+
+    @property
+    def moves_per_second(self) -> float:
+        return self.moves / self.seconds if self.seconds else 0.0
+
+    def percentile(self, fraction : float) -> float:
+        if not self.latencies:
+            return 0.0
+        return self.latencies[min(int(fraction * len(self.latencies)), len(self.latencies) - 1)]
+
+    def __str__(self) -> str:
+        quantiles = ', '.join(f"p{label} {self.percentile(fraction) * 1000:.2f}"
+                              for label, fraction in (('50', 0.5), ('90', 0.9), ('99', 0.99), ('99.9', 0.999)))
+        return (f"{self.sessions} sessions, {self.moves} moves in {self.seconds:.2f}s "
+                f"({self.moves_per_second:,.0f} moves/s), {self.errors} errors, {self.events} events\n"
+                f"latency ms: {quantiles}, max {self.percentile(1.0) * 1000:.2f}")
+
+
+async def _play(client : LoadClient, session_ids : list[str], deadline : float, rng : random.Random,
+                latencies : list[float], counts : dict) -> None:
+    clock = time.perf_counter
+    for session_id in itertools.cycle(session_ids):
+        start = clock()
+        if start >= deadline:
+            return
+        board = client.boards[session_id]
+        cell = board.pick(rng) if board.state == 'playing' else None
+        if cell is None:
+            reply = await client.request('restart', session=session_id)
+            if reply['ok']:
+                client.boards[session_id] = LocalBoard(reply)
+        else:
+            reply = await client.request('move', session=session_id, action='left', row=cell[0], col=cell[1])
+            if reply['ok']:
+                board.update(reply)
+                counts['moves'] += 1
+        latencies.append(clock() - start)
+        if not reply['ok']:
+            # A co-op partner ended or restarted the game first
+            counts['errors'] += 1
+
+
+async def run_load(host : str = None, port : int = None, connections : int = 100, sessions : int = 20,
+                   coop : int = 1, duration : float = 5.0, spec : dict = None, seed : int = 0) -> LoadReport:
+    '''
+    Run a load test.
+
+    :param host: The server host; without a port, a server is started in this process.
+    :param connections: The number of client connections.
+    :param sessions: The number of sessions played by each connection.
+    :param coop: The number of connections playing each session.
+    :param duration: The time spent playing, in seconds, after the sessions are created.
+    :param spec: The board parameters of the sessions, Hard boards by default.
+    '''
+    server = None
+    if port is None:
+        server = GameServer()
+        host, port = '127.0.0.1', await server.start()
+    spec = {'difficulty': 'Hard'} if spec is None else spec
+    rng = random.Random(seed)
+    clients = [await LoadClient.connect(host or '127.0.0.1', port) for _ in range(connections)]
+    try:
+        # The first client of each group creates the sessions, the others join them
+        groups = []
+        for first in range(0, connections, coop):
+            group = clients[first:first + coop]
+            session_ids = []
+            for _ in range(sessions):
+                reply = await group[0].request('create', seed=rng.getrandbits(63), **spec)
+                if not reply['ok']:
+                    raise RuntimeError(reply['error'])
+                session_ids.append(reply['session'])
+                group[0].boards[reply['session']] = LocalBoard(reply)
+                for member in group[1:]:
+                    member.boards[reply['session']] = LocalBoard(await member.request('join', session=reply['session']))
+            groups.append((group, session_ids))
+
+        latencies, counts = [], {'moves': 0, 'errors': 0}
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(_play(client, session_ids, deadline, random.Random(rng.getrandbits(64)),
+                                     latencies, counts)
+                               for group, session_ids in groups for client in group))
+        seconds = time.perf_counter() - start
+    finally:
+        for client in clients:
+            await client.close()
+        if server is not None:
+            await server.close()
+    total_sessions = len(groups) * sessions
+    return LoadReport(total_sessions, seconds, latencies, counts['moves'], counts['errors'],
+                      sum(client.events for client in clients))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help='port of a running server (default: start one in this process)')
+    parser.add_argument('--connections', type=int, default=100)
+    parser.add_argument('--sessions', type=int, default=20, help='sessions per connection group')
+    parser.add_argument('--coop', type=int, default=1, help='connections playing each session')
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--difficulty', default='Hard')
+    parser.add_argument('--rows', type=int)
+    parser.add_argument('--cols', type=int)
+    parser.add_argument('--mines', type=int, dest='num_mines')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    spec = {'difficulty': args.difficulty}
+    for key in ('rows', 'cols', 'num_mines'):
+        if getattr(args, key) is not None:
+            spec[key] = getattr(args, key)
+    report = asyncio.run(run_load(args.host, args.port, args.connections, args.sessions, args.coop,
+                                  args.duration, spec, args.seed))
+    print(report)
+
+
+if __name__ == '__main__':
+    main()
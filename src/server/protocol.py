@@ -0,0 +1,94 @@
+'''
+Line-JSON protocol of the game server.
+
+Every message is one JSON object on one line (UTF-8, terminated by '\n').
+Requests carry an "id" that is echoed in their reply:
+
+    {"id": 1, "op": "create", "difficulty": "Hard"}
+        -> {"id": 1, "ok": true, "session": "3f2a...", "rows": 20, "cols": 20, "num_mines": 75, "difficulty": "Hard"}
+    {"id": 2, "op": "join", "session": "3f2a..."}
+        -> same as create, plus "cells" (every revealed or flagged cell), "state" and "mines_left"
+    {"id": 3, "op": "move", "session": "3f2a...", "action": "left", "row": 3, "col": 4}
+        -> {"id": 3, "ok": true, "cells": [[index, code], ...], "state": "playing", "mines_left": 75}
+    {"id": 4, "op": "restart", "session": "3f2a..."}
+        -> same as create, with a new board of the same size
+    {"id": 5, "op": "leave", "session": "3f2a..."}
+        -> {"id": 5, "ok": true}
+
+Actions are the click types of the game: left, right, chord, undo, redo. Only the cells changed
+by a move are sent, as [flat index, code] pairs (index = row * cols + col). The other clients of
+a co-op session receive the same changes as an event, without id:
+
+    {"event": "update", "session": "3f2a...", "cells": [...], "state": "playing", "mines_left": 74}
+    {"event": "restart", "session": "3f2a...", "rows": 20, "cols": 20, "num_mines": 75, "difficulty": "Hard"}
+
+Errors are replied as {"id": 1, "ok": false, "error": "message"}.
+
+The seed of a board stays on the server, since the whole mine layout can be rebuilt from it: a
+create request may choose it, but it is never sent back.
+'''
+import json
+
+from ..model.game_model import GameBoard
+
+# Cell codes, 0 to 8 are revealed numbers
+HIDDEN = -1
+FLAGGED = -2
+MINE = 9
+
+
+class ProtocolError(Exception):
+    '''
+    A request that can't be served; its message is sent back to the client.
+    '''
+
+
+def encode(message : dict) -> bytes:
+    return json.dumps(message, separators=(',', ':')).encode() + b'\n'
+
+
+def decode(line : bytes) -> dict:
+    '''
+    :raises ProtocolError: If the line is not a JSON object.
+    '''
+    try:
+        message = json.loads(line)
+    except ValueError as error:
+        raise ProtocolError(f"Invalid JSON: {error}") from error
+    if not isinstance(message, dict):
+        raise ProtocolError("A message must be a JSON object")
+    return message
+
+
+def error_reply(request_id, message : str) -> dict:
+    return {'id': request_id, 'ok': False, 'error': message}
+
+
+def cell_code(board : GameBoard, index : int) -> int:
+    grid = board.board
+    if grid.flagged[index]:
+        return FLAGGED
+    if not grid.revealed[index]:
+        return HIDDEN
+    return MINE if grid.mines[index] else grid.adjacent[index]
+
+
+def changed_cells(board : GameBoard) -> list[list[int]]:
+    '''
+    The cells changed since the last call, as [index, code] pairs.
+    '''
+    return [[index, cell_code(board, index)] for index in dict.fromkeys(board.pop_changed_indices())]
+
+
+def visible_cells(board : GameBoard) -> list[list[int]]:
+    '''
+    Every revealed or flagged cell, as [index, code] pairs.
+    '''
+    revealed, flagged = board.board.revealed, board.board.flagged
+    return [[index, cell_code(board, index)] for index in range(board.board.size) if revealed[index] or flagged[index]]
+
+
+def game_state(board : GameBoard) -> str:
+    if board.is_game_over:
+        return 'lost'
+    return 'won' if board.is_game_won else 'playing'
@@ -0,0 +1,123 @@
+'''
+Headless asyncio server hosting the game sessions over a local socket.
+
+Usage:
+    python -m src.server [--host 127.0.0.1] [--port 8765] [--workers 4]
+'''
+import argparse
+import asyncio
+import itertools
+
+from .protocol import ProtocolError, decode, encode, error_reply
+from .sessions import SessionManager
+
+# Longest request line accepted, in bytes
+LINE_LIMIT = 1 << 16
+
+
+class GameServer:
+    '''
+    Serve the line-JSON protocol (see protocol) for one SessionManager.
+    Every connection is one client; a client may play any number of sessions.
+    '''
+
+    def __init__(self, manager : SessionManager = None, host : str = '127.0.0.1', port : int = 0) -> None:
+        self.manager = SessionManager() if manager is None else manager
+        self.host, self.port = host, port
+        self._server = None
+        self._writers = {}
+        self._handlers = set()
+        self._client_ids = itertools.count(1)
+
+    async def start(self) -> int:
+        '''
+        Start listening.
+        :return: The port, chosen by the system when the port is 0.
+        '''
+        self._server = await asyncio.start_server(self._serve_client, self.host, self.port, limit=LINE_LIMIT)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        '''
+        Stop listening and disconnect every client.
+        '''
+        self._server.close()
+        for writer in list(self._writers.values()):
+            writer.close()
+        # Let the handlers see the end of their stream and drop their client
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def dispatch(self, request : dict, client) -> list[tuple[object, bytes]]:
+        '''
+        Serve one request.
+        :return: The encoded messages to send, as (client, line).
+        '''
+        return [(target, encode(message)) for target, message in self.manager.handle(request, client)]
+
+    async def disconnect(self, client) -> None:
+        self.manager.drop_client(client)
+
+    def send(self, lines) -> None:
+        '''
+        Queue encoded messages for their clients; the clients already disconnected are skipped.
+        '''
+        writers = self._writers
+        for client, line in lines:
+            writer = writers.get(client)
+            if writer is not None:
+                writer.write(line)
+
+    async def _serve_client(self, reader : asyncio.StreamReader, writer : asyncio.StreamWriter) -> None:
+        client = next(self._client_ids)
+        self._writers[client] = writer
+        self._handlers.add(asyncio.current_task())
+        try:
+            while line := await reader.readline():
+                try:
+                    request = decode(line)
+                except ProtocolError as error:
+                    self.send([(client, encode(error_reply(None, str(error))))])
+                else:
+                    self.send(await self.dispatch(request, client))
+                # Only the sender waits for its buffer: a slow co-op partner doesn't stall the others
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            # Disconnected or line over LINE_LIMIT
+            pass
+        finally:
+            self._handlers.discard(asyncio.current_task())
+            del self._writers[client]
+            writer.close()
+            await self.disconnect(client)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=0,
+                        help='worker processes hosting the sessions (default: 0, all in this process)')
+    args = parser.parse_args()
+
+    async def run() -> None:
+        if args.workers:
+            from .sharding import ShardedGameServer
+            server = ShardedGameServer(args.workers, args.host, args.port)
+        else:
+            server = GameServer(host=args.host, port=args.port)
+        port = await server.start()
+        print(f"Serving on {args.host}:{port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,198 @@
+'''
+Game sessions hosted by the server, independent of the transport.
+
+A session is one GameBoard shared by every client that created or joined it (co-op).
+SessionManager.handle() serves one request and returns the messages to send, so that the
+same logic runs behind the socket server, in a worker process or directly in tests.
+'''
+import secrets
+
+from ..model.game_model import GameBoard
+from ..model.replay import ACTIONS, play_click
+from .protocol import ProtocolError, changed_cells, error_reply, game_state, visible_cells
+
+# Board parameters accepted by the create request
+SPEC_KEYS = ('difficulty', 'rows', 'cols', 'num_mines', 'density', 'seed')
+
+
+class Session:
+    '''
+    One board and the clients playing it.
+    '''
+    __slots__ = ('id', 'board', 'spec', 'members')
+
+    def __init__(self, session_id : str, board : GameBoard, spec : dict) -> None:
+        self.id = session_id
+        self.board = board
+        # Parameters of the board, without the seed, for restarts
+        self.spec = spec
+        self.members = set()
+
+    def describe(self) -> dict:
+        board = self.board
+        # Never the seed: the mines could be rebuilt from it
+        return {'session': self.id, 'rows': board.rows, 'cols': board.cols, 'num_mines': board.num_mines,
+                'difficulty': board.difficulty}
+
+    def status(self) -> dict:
+        return {'state': game_state(self.board), 'mines_left': self.board.count_mines}
+
+
+class SessionManager:
+    '''
+    Every session of one process, and the sessions of every client.
+    Clients are any hashable token chosen by the transport (a connection number for the server).
+    '''
+    # Largest board a client may create, in cells
+    MAX_CELLS = 1 << 22
+
+    def __init__(self) -> None:
+        self.sessions = {}
+        self.clients = {}
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def get(self, session_id) -> Session:
+        '''
+        :raises ProtocolError: If there is no such session.
+        '''
+        try:
+            return self.sessions[session_id]
+        except (KeyError, TypeError):
+            raise ProtocolError(f"Unknown session {session_id!r}") from None
+
+    def create(self, spec : dict, session_id : str = None) -> Session:
+        '''
+        :raises ProtocolError: If the board parameters are invalid or the session id is taken.
+        '''
+        unknown = set(spec) - set(SPEC_KEYS)
+        if unknown:
+            raise ProtocolError(f"Unknown board parameters {sorted(unknown)}")
+        if session_id is None:
+            session_id = secrets.token_hex(8)
+        elif not isinstance(session_id, str):
+            raise ProtocolError(f"A session id must be a string, got {session_id!r}")
+        elif session_id in self.sessions:
+            raise ProtocolError(f"Session {session_id!r} already exists")
+        try:
+            rows, cols, _ = GameBoard.board_spec(spec.get('difficulty', 'Easy'), spec.get('rows'), spec.get('cols'),
+                                                 spec.get('num_mines'), spec.get('density'))
+            if rows * cols > self.MAX_CELLS:
+                raise ValueError(f"Boards are limited to {self.MAX_CELLS} cells")
+            board = GameBoard(**spec)
+        except (TypeError, ValueError) as error:
+            raise ProtocolError(str(error)) from error
+        board.pop_changed_indices()
+        spec = {key: value for key, value in spec.items() if key != 'seed'}
+        session = self.sessions[session_id] = Session(session_id, board, spec)
+        return session
+
+    def add(self, session : Session) -> None:
+        '''
+        Host an existing session, e.g. one migrated from another process.
+        '''
+        self.sessions[session.id] = session
+        for client in session.members:
+            self.clients.setdefault(client, set()).add(session.id)
+
+    def remove(self, session_id : str) -> Session:
+        session = self.sessions.pop(session_id)
+        for client in session.members:
+            self.clients[client].discard(session_id)
+        return session
+
+    def join(self, session : Session, client) -> None:
+        session.members.add(client)
+        self.clients.setdefault(client, set()).add(session.id)
+
+    def leave(self, session : Session, client) -> None:
+        '''
+        Remove a client from a session; a session without clients is closed.
+        '''
+        session.members.discard(client)
+        self.clients.get(client, set()).discard(session.id)
+        if not session.members:
+            self.sessions.pop(session.id, None)
+
+    def drop_client(self, client) -> None:
+        '''
+        Forget a disconnected client.
+        '''
+        for session_id in self.clients.pop(client, ()):
+            session = self.sessions.get(session_id)
+            if session is not None:
+                self.leave(session, client)
+
+    def handle(self, request : dict, client) -> list[tuple[object, dict]]:
+        '''
+        Serve one request.
+        :return: The messages to send, as (client, message): the reply first, then the events.
+        '''
+        request_id = request.get('id')
+        op = request.get('op')
+        # Any JSON value may come in, and lists or objects can't be looked up
+        handler = self.HANDLERS.get(op) if isinstance(op, str) else None
+        if handler is None:
+            return [(client, error_reply(request_id, f"Unknown op {request.get('op')!r}"))]
+        try:
+            reply, events = handler(self, request, client)
+        except ProtocolError as error:
+            return [(client, error_reply(request_id, str(error)))]
+        reply['id'] = request_id
+        reply['ok'] = True
+        return [(client, reply)] + events
+
+    def _create(self, request : dict, client) -> tuple[dict, list]:
+        spec = {key: request[key] for key in SPEC_KEYS if key in request}
+        session = self.create(spec, request.get('session'))
+        self.join(session, client)
+        return session.describe(), []
+
+    def _join(self, request : dict, client) -> tuple[dict, list]:
+        session = self.get(request.get('session'))
+        self.join(session, client)
+        reply = session.describe()
+        reply['cells'] = visible_cells(session.board)
+        reply.update(session.status())
+        return reply, []
+
+    def _member_session(self, request : dict, client) -> Session:
+        session = self.get(request.get('session'))
+        if client not in session.members:
+            raise ProtocolError(f"Join session {session.id!r} first")
+        return session
+
+    def _move(self, request : dict, client) -> tuple[dict, list]:
+        session = self._member_session(request, client)
+        action = request.get('action')
+        if action not in ACTIONS:
+            raise ProtocolError(f"Unknown action {action!r}")
+        board = session.board
+        row, col = request.get('row', 0), request.get('col', 0)
+        if not (isinstance(row, int) and isinstance(col, int) and 0 <= row < board.rows and 0 <= col < board.cols):
+            raise ProtocolError(f"Cell ({row!r}, {col!r}) is out of the board")
+        # Only undo/redo once the game is over, as in the window
+        if (board.is_game_over or board.is_game_won) and action not in ('undo', 'redo'):
+            raise ProtocolError("The game is over")
+        play_click(board, action, row, col)
+        reply = {'cells': changed_cells(board)}
+        reply.update(session.status())
+        return reply, self._broadcast(session, client, {'event': 'update', **reply})
+
+    def _restart(self, request : dict, client) -> tuple[dict, list]:
+        session = self._member_session(request, client)
+        session.board = GameBoard(**session.spec)
+        session.board.pop_changed_indices()
+        reply = session.describe()
+        return reply, self._broadcast(session, client, {'event': 'restart', **reply})
+
+    def _leave(self, request : dict, client) -> tuple[dict, list]:
+        self.leave(self.get(request.get('session')), client)
+        return {}, []
+
+    def _broadcast(self, session : Session, sender, event : dict) -> list:
+        event['session'] = session.id
+        return [(member, event) for member in session.members if member != sender]
+
+    HANDLERS = {'create': _create, 'join': _join, 'move': _move, 'restart': _restart, 'leave': _leave}
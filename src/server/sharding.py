@@ -0,0 +1,319 @@
+'''
+Sessions sharded across worker processes.
+
+Each worker process hosts a SessionManager for its share of the sessions; the front process
+(ShardedGameServer) only parses the requests and routes them by session id, so the flood fills
+and the encoding of the replies run in parallel on every core. A session belongs to the worker
+crc32(session id) % workers unless it was migrated (see ShardPool.migrate).
+
+The front talks to each worker over a socket pair, in length-prefixed pickled batches: all the
+requests routed to a worker during one turn of the event loop go in a single frame, and the
+worker replies with the encoded lines of every message, ready to be written to the clients.
+
+Sessions migrate as compact saves (model.persistence) along with the seed of the board: the
+board planes, counters and seed move, the undo history does not.
+'''
+import asyncio
+import itertools
+import multiprocessing
+import os
+import pickle
+import secrets
+import socket
+import struct
+import zlib
+
+from ..model import persistence
+from .protocol import encode, error_reply
+from .server import GameServer
+from .sessions import Session, SessionManager
+
+FRAME = struct.Struct('<I')
+
+
+def _recv_exactly(sock : socket.socket, size : int) -> bytes | None:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return bytes(data)
+
+
+def _export(manager : SessionManager, session_id : str) -> tuple[tuple, list]:
+    '''
+    :return: The state of the session, and its members left without any session in this worker.
+    '''
+    session = manager.get(session_id)
+    manager.remove(session_id)
+    board = session.board
+    # The save format has no seed: it travels beside it, with the state of the board's generator
+    state = session.id, persistence.dumps(board), board.seed, board.rng.getstate(), session.spec, session.members
+    return state, [client for client in session.members if not manager.clients.get(client)]
+
+
+def _import(manager : SessionManager, state : tuple) -> None:
+    session_id, data, seed, rng_state, spec, members = state
+    board = persistence.loads(data)
+    board._set_seed(seed)
+    board.rng.setstate(rng_state)
+    session = Session(session_id, board, spec)
+    session.members = members
+    manager.add(session)
+
+
+def _closed(manager : SessionManager, session_ids) -> list[str]:
+    return [session_id for session_id in session_ids if session_id not in manager.sessions]
+
+
+def _handle(manager : SessionManager, payload : tuple) -> tuple[list[tuple[object, bytes]], list[str]]:
+    '''
+    :return: The encoded messages, and the session closed by the request if it closed one.
+    '''
+    request, client = payload
+    session_id = request.get('session')
+    hosted = [session_id] if isinstance(session_id, str) and session_id in manager.sessions else []
+    try:
+        lines = [(target, encode(message)) for target, message in manager.handle(request, client)]
+    except Exception as error:
+        # A bug must not take the other sessions of the worker down
+        lines = [(client, encode(error_reply(request.get('id'), f"Internal error: {error!r}")))]
+    return lines, _closed(manager, hosted)
+
+
+def _drop(manager : SessionManager, client) -> list[str]:
+    '''
+    :return: The sessions closed because the client was their last member.
+    '''
+    hosted = list(manager.clients.get(client, ()))
+    manager.drop_client(client)
+    return _closed(manager, hosted)
+
+
+WORKER_OPS = {
+    'handle': _handle,
+    'drop': _drop,
+    'export': _export,
+    'import': _import,
+    'count': lambda manager, _: len(manager),
+}
+
+
+def worker_main(sock : socket.socket) -> None:
+    '''
+    Serve the batches of the front process until it closes the socket.
+    '''
+    manager = SessionManager()
+    try:
+        while True:
+            header = _recv_exactly(sock, FRAME.size)
+            frame = header and _recv_exactly(sock, FRAME.unpack(header)[0])
+            if frame is None:
+                break
+            batch = pickle.loads(frame)
+            results = []
+            for ticket, op, payload in batch:
+                try:
+                    results.append((ticket, True, WORKER_OPS[op](manager, payload)))
+                except Exception as error:
+                    results.append((ticket, False, error))
+            data = pickle.dumps(results, pickle.HIGHEST_PROTOCOL)
+            sock.sendall(FRAME.pack(len(data)) + data)
+    except ConnectionError:
+        # The front process is gone
+        pass
+    finally:
+        sock.close()
+
+
+class Shard:
+    '''
+    The front end of one worker process.
+    '''
+
+    def __init__(self, process : multiprocessing.Process, reader : asyncio.StreamReader,
+                 writer : asyncio.StreamWriter) -> None:
+        self.process = process
+        self.reader, self.writer = reader, writer
+        self._tickets = itertools.count()
+        self._pending = {}
+        self._batch = []
+        # Set once the worker is gone: the later calls fail at once
+        self._lost = False
+        self._task = asyncio.create_task(self._read())
+
+    def call(self, op : str, payload) -> asyncio.Future:
+        '''
+        Queue an operation for the worker; the batch is sent at the end of the loop turn.
+        '''
+        if self._lost:
+            result = asyncio.get_running_loop().create_future()
+            result.set_exception(ConnectionError("Shard worker exited"))
+            return result
+        ticket = next(self._tickets)
+        result = self._pending[ticket] = asyncio.get_running_loop().create_future()
+        if not self._batch:
+            asyncio.get_running_loop().call_soon(self._flush)
+        self._batch.append((ticket, op, payload))
+        return result
+
+    def _flush(self) -> None:
+        data = pickle.dumps(self._batch, pickle.HIGHEST_PROTOCOL)
+        self._batch = []
+        self.writer.write(FRAME.pack(len(data)) + data)
+
+    async def _read(self) -> None:
+        try:
+            while True:
+                size, = FRAME.unpack(await self.reader.readexactly(FRAME.size))
+                for ticket, ok, value in pickle.loads(await self.reader.readexactly(size)):
+                    result = self._pending.pop(ticket)
+                    if ok:
+                        result.set_result(value)
+                    else:
+                        result.set_exception(value)
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            # The worker is gone (exited or reset): fail what it still owed
+            self._lost = True
+            for result in self._pending.values():
+                result.set_exception(ConnectionError("Shard worker exited"))
+            self._pending.clear()
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self._task
+        await asyncio.get_running_loop().run_in_executor(None, self.process.join)
+
+
+class ShardPool:
+    '''
+    Worker processes hosting the sessions, and the routing of the requests between them.
+    '''
+
+    def __init__(self, workers : int = None) -> None:
+        self.workers = workers or os.cpu_count()
+        self.shards = []
+        # Sessions moved away from their default shard
+        self.owners = {}
+        self._moving = {}
+        self._client_shards = {}
+
+    async def start(self) -> None:
+        context = multiprocessing.get_context('spawn')
+        for _ in range(self.workers):
+            front, back = socket.socketpair()
+            process = context.Process(target=worker_main, args=(back,), daemon=True)
+            process.start()
+            back.close()
+            self.shards.append(Shard(process, *await asyncio.open_connection(sock=front)))
+
+    def _home(self, session_id : str) -> int:
+        return zlib.crc32(session_id.encode()) % len(self.shards)
+
+    def shard_of(self, session_id : str) -> int:
+        owner = self.owners.get(session_id)
+        if owner is None:
+            owner = self._home(session_id)
+        return owner
+
+    async def handle(self, request : dict, client) -> list[tuple[object, bytes]]:
+        '''
+        Serve one request in the worker that owns its session.
+        '''
+        if request.get('op') == 'create' and request.get('session') is None:
+            # Choose the id here, it decides the worker
+            request['session'] = secrets.token_hex(8)
+        # Any JSON value may come in; the worker answers for invalid ones
+        session_id = str(request.get('session'))
+        while session_id in self._moving:
+            await self._moving[session_id]
+        index = self.shard_of(session_id)
+        self._client_shards.setdefault(client, set()).add(index)
+        lines, closed = await self.shards[index].call('handle', (request, client))
+        self._forget(closed)
+        return lines
+
+    async def drop_client(self, client) -> None:
+        for closed in await asyncio.gather(*(self.shards[index].call('drop', client)
+                                             for index in self._client_shards.pop(client, ()))):
+            self._forget(closed)
+
+    def _forget(self, closed : list[str]) -> None:
+        '''
+        Forget where the closed sessions lived: a new session may reuse their id.
+        '''
+        for session_id in closed:
+            self.owners.pop(session_id, None)
+
+    async def migrate(self, session_id : str, target : int) -> None:
+        '''
+        Move a session to another worker. Its requests wait until it is moved.
+        :raises ProtocolError: If there is no such session.
+        '''
+        if not 0 <= target < len(self.shards):
+            raise ValueError(f"No shard {target}, there are {len(self.shards)}")
+        while session_id in self._moving:
+            await self._moving[session_id]
+        source = self.shard_of(session_id)
+        if source == target:
+            return
+        moved = self._moving[session_id] = asyncio.get_running_loop().create_future()
+        try:
+            state, gone = await self.shards[source].call('export', session_id)
+            await self.shards[target].call('import', state)
+            if target == self._home(session_id):
+                # Back on its own shard
+                self.owners.pop(session_id, None)
+            else:
+                self.owners[session_id] = target
+            for client in state[-1]:
+                self._client_shards.setdefault(client, set()).add(target)
+            # The clients with nothing left on the source are not dropped there any more
+            for client in gone:
+                self._client_shards.get(client, set()).discard(source)
+        finally:
+            del self._moving[session_id]
+            moved.set_result(None)
+
+    async def counts(self) -> list[int]:
+        '''
+        The number of sessions of each worker.
+        '''
+        return list(await asyncio.gather(*(shard.call('count', None) for shard in self.shards)))
+
+    async def close(self) -> None:
+        await asyncio.gather(*(shard.close() for shard in self.shards))
+        self.shards = []
+
+
+class ShardedGameServer(GameServer):
+    '''
+    GameServer whose sessions live in a pool of worker processes; this process only routes.
+    '''
+
+    def __init__(self, workers : int = None, host : str = '127.0.0.1', port : int = 0) -> None:
+        super().__init__(host=host, port=port)
+        # Sessions are hosted by the workers
+        self.manager = None
+        self.pool = ShardPool(workers)
+
+    async def start(self) -> int:
+        await self.pool.start()
+        return await super().start()
+
+    async def dispatch(self, request : dict, client) -> list[tuple[object, bytes]]:
+        try:
+            return await self.pool.handle(request, client)
+        except ConnectionError as error:
+            return [(client, encode(error_reply(request.get('id'), str(error))))]
+
+    async def disconnect(self, client) -> None:
+        try:
+            await self.pool.drop_client(client)
+        except ConnectionError:
+            pass
+
+    async def close(self) -> None:
+        await super().close()
+        await self.pool.close()
@@ -0,0 +1,2 @@
+from .engine import GameResult, SimulationStats, play_game, simulate
+from .strategies import STRATEGIES, RandomStrategy, SolverStrategy, Strategy
@@ -0,0 +1,43 @@
+'''
+Headless batch simulation.
+
+Usage: python -m src.simulation --games 100000 --difficulty Hard --strategy random
+'''
+import argparse
+import time
+
+from .engine import simulate
+from .strategies import STRATEGIES
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--difficulty', default='Easy')
+    parser.add_argument('--rows', type=int)
+    parser.add_argument('--cols', type=int)
+    parser.add_argument('--mines', type=int, dest='num_mines')
+    parser.add_argument('--density', type=float)
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), default='random')
+    parser.add_argument('--workers', type=int, help='number of processes (default: all cores, 0: no pool)')
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-clicks', type=int)
+    args = parser.parse_args()
+
+    spec = {'difficulty': args.difficulty}
+    for key in ('rows', 'cols', 'num_mines', 'density'):
+        if getattr(args, key) is not None:
+            spec[key] = getattr(args, key)
+
+    start = time.perf_counter()
+    for stats in simulate(spec, STRATEGIES[args.strategy](), args.games, args.workers, args.chunk_size,
+                          args.seed, args.max_clicks):
+        elapsed = time.perf_counter() - start
+        print(f"{stats.games:>10} games  win rate {stats.win_rate:7.2%}  "
+              f"clicks/game {stats.clicks_per_game:8.2f}  ms/game {stats.seconds_per_game * 1000:8.3f}  "
+              f"({stats.games / elapsed:,.0f} games/s)", flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator
+
+from ..model.game_model import GameBoard
+from ..model.replay import play_click
+from .strategies import Strategy
+
+
+class GameResult:
+    '''
+    Outcome of one simulated game.
+    '''
+    __slots__ = ('won', 'clicks', 'seconds')
+
+    def __init__(self, won : bool, clicks : int, seconds : float) -> None:
+        self.won = won
+        self.clicks = clicks
+        self.seconds = seconds
+
+
+class SimulationStats:
+    '''
+    Aggregated statistics of a batch of games, mergeable across workers.
+    '''
+
+    def __init__(self) -> None:
+        self.games = 0
+        self.wins = 0
+        self.clicks = 0
+        self.seconds = 0.0
+
+    def add(self, result : GameResult) -> None:
+        self.games += 1
+        self.wins += result.won
+        self.clicks += result.clicks
+        self.seconds += result.seconds
+
+    def merge(self, other : 'SimulationStats') -> None:
+        self.games += other.games
+        self.wins += other.wins
+        self.clicks += other.clicks
+        self.seconds += other.seconds
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games if self.games else 0.0
+
+    @property
+    def clicks_per_game(self) -> float:
+        return self.clicks / self.games if self.games else 0.0
+
+    @property
+    def seconds_per_game(self) -> float:
+        return self.seconds / self.games if self.games else 0.0
+
+    def __repr__(self) -> str:
+        return (f"SimulationStats(games={self.games}, win_rate={self.win_rate:.4f}, "
+                f"clicks_per_game={self.clicks_per_game:.2f}, ms_per_game={self.seconds_per_game * 1000:.3f})")
+
+
+def play_game(spec : dict, strategy : Strategy, seed : int, max_clicks : int = None, recorder = None) -> GameResult:
+    '''
+    Play one game without any display.
+
+    :param spec: Keyword arguments of GameBoard (difficulty, rows, cols, num_mines, density).
+    :param strategy: The strategy choosing the moves.
+    :param seed: Seed of the game, the same seed plays the same game.
+    :param max_clicks: Stop (as a loss) after this number of clicks, no limit by default.
+    :param recorder: Called with the board once created, returns a ReplayRecorder of the game (optional).
+    :return: The outcome of the game.
+    '''
+    start = time.perf_counter()
+    board = GameBoard(**spec, seed=seed)
+    # Continue the board stream: a generator seeded with `seed` would replay the mine draws
+    rng = random.Random(board.rng.getrandbits(64))
+    if recorder is not None:
+        recorder = recorder(board)
+    clicks = 0
+    while not board.is_game_over and not board.is_game_won:
+        if max_clicks is not None and clicks >= max_clicks:
+            break
+        click_type, row, col = strategy.next_move(board, rng)
+        if recorder is not None:
+            recorder.record(click_type, row, col)
+        play_click(board, click_type, row, col)
+        clicks += 1
+    if recorder is not None:
+        recorder.finish(board)
+    return GameResult(board.is_game_won and not board.is_game_over, clicks, time.perf_counter() - start)
+
+
+def _play_chunk(spec : dict, strategy : Strategy, seeds : range, max_clicks : int) -> SimulationStats:
+    stats = SimulationStats()
+    for seed in seeds:
+        stats.add(play_game(spec, strategy, seed, max_clicks))
+    return stats
+
+
+def simulate(spec : dict, strategy : Strategy, games : int, workers : int = None, chunk_size : int = 500,
+             seed : int = 0, max_clicks : int = None) -> Iterator[SimulationStats]:
+    '''
+    Play a batch of games over a pool of processes and stream the aggregated statistics.
+
+    Games are played in chunks of `chunk_size` seeds (seed, seed + 1, ...); a snapshot of the
+    statistics of all the finished games is yielded each time a chunk completes.
+
+    :param spec: Keyword arguments of GameBoard.
+    :param strategy: The strategy playing every game.
+    :param games: The number of games.
+    :param workers: The number of processes, all the cores by default. 0 plays in this process.
+    :param chunk_size: The number of games sent to a worker at once.
+    :param seed: The seed of the first game.
+    :param max_clicks: Click limit of each game.
+    :return: An iterator of cumulative statistics, the last one covers every game.
+    '''
+    total = SimulationStats()
+    chunks = [range(start, min(start + chunk_size, seed + games)) for start in range(seed, seed + games, chunk_size)]
+    if workers == 0:
+        for seeds in chunks:
+            total.merge(_play_chunk(spec, strategy, seeds, max_clicks))
+            yield _snapshot(total)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        pending = {pool.submit(_play_chunk, spec, strategy, seeds, max_clicks) for seeds in chunks}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                total.merge(future.result())
+            yield _snapshot(total)
+
+
+def _snapshot(stats : SimulationStats) -> SimulationStats:
+    copy = SimulationStats()
+    copy.merge(stats)
+    return copy
@@ -0,0 +1,132 @@
+'''
+Batch replay: re-run recorded games headless to check their outcome and time them.
+
+Usage:
+    python -m src.simulation.replay record games.hmrp --games 1000 --difficulty Hard --strategy solver
+    python -m src.simulation.replay verify games.hmrp [--workers 4]
+'''
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ..model.replay import Replay, ReplayRecorder, load_replays, replay_game, save_replays
+from .engine import play_game
+from .strategies import STRATEGIES, Strategy
+
+
+class ReplayReport:
+    '''
+    Results of a batch of replays.
+    - mismatches: positions of the replays whose outcome differs from the recorded one
+    - seconds: time spent replaying, summed over the games
+    '''
+
+    def __init__(self) -> None:
+        self.games = 0
+        self.clicks = 0
+        self.seconds = 0.0
+        self.mismatches = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches
+
+    def __repr__(self) -> str:
+        return (f"ReplayReport(games={self.games}, mismatches={len(self.mismatches)}, clicks={self.clicks}, "
+                f"ms_per_game={self.seconds / max(self.games, 1) * 1000:.3f})")
+
+
+def record_game(spec : dict, strategy : Strategy, seed : int, max_clicks : int = None) -> Replay:
+    '''
+    Play a simulated game and record it.
+    '''
+    recorders = []
+
+    def recorder(board) -> ReplayRecorder:
+        recorders.append(ReplayRecorder(board))
+        return recorders[-1]
+
+    play_game(spec, strategy, seed, max_clicks, recorder)
+    return recorders[0].replay
+
+
+def _replay_chunk(replays : list[Replay]) -> list[tuple[bool, int, float]]:
+    results = []
+    for replay in replays:
+        result = replay_game(replay)
+        results.append((result.matches, len(replay.clicks), result.seconds))
+    return results
+
+
+def verify(replays : list[Replay], workers : int = None, chunk_size : int = 200) -> ReplayReport:
+    '''
+    Replay every game and compare the outcomes with the recorded ones.
+
+    :param workers: The number of processes, all the cores by default. 0 replays in this process.
+    :param chunk_size: The number of replays sent to a worker at once.
+    '''
+    chunks = [replays[start:start + chunk_size] for start in range(0, len(replays), chunk_size)]
+    if workers == 0:
+        results = map(_replay_chunk, chunks)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+        results = pool.map(_replay_chunk, chunks)
+    report = ReplayReport()
+    try:
+        for chunk in results:
+            for matches, clicks, seconds in chunk:
+                if not matches:
+                    report.mismatches.append(report.games)
+                report.games += 1
+                report.clicks += clicks
+                report.seconds += seconds
+    finally:
+        if workers != 0:
+            pool.shutdown()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    record = commands.add_parser('record', help='record simulated games')
+    record.add_argument('path')
+    record.add_argument('--games', type=int, default=1000)
+    record.add_argument('--difficulty', default='Easy')
+    record.add_argument('--rows', type=int)
+    record.add_argument('--cols', type=int)
+    record.add_argument('--mines', type=int, dest='num_mines')
+    record.add_argument('--strategy', choices=sorted(STRATEGIES), default='solver')
+    record.add_argument('--seed', type=int, default=0)
+    check = commands.add_parser('verify', help='replay recorded games and check their outcome')
+    check.add_argument('path')
+    check.add_argument('--workers', type=int, help='number of processes (default: all cores, 0: no pool)')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        spec = {'difficulty': args.difficulty}
+        for key in ('rows', 'cols', 'num_mines'):
+            if getattr(args, key) is not None:
+                spec[key] = getattr(args, key)
+        strategy = STRATEGIES[args.strategy]()
+        replays = [record_game(spec, strategy, seed) for seed in range(args.seed, args.seed + args.games)]
+        save_replays(replays, args.path)
+        print(f"{len(replays)} games recorded in {args.path}")
+        return
+
+    replays = load_replays(args.path)
+    start = time.perf_counter()
+    report = verify(replays, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"{report.games} games replayed in {elapsed:.3f}s ({report.games / max(elapsed, 1e-9):,.0f} games/s, "
+          f"{report.seconds / max(report.games, 1) * 1000:.3f} ms/game)")
+    if report.ok:
+        print("All outcomes match")
+    else:
+        print(f"{len(report.mismatches)} outcomes differ, first replays: {report.mismatches[:10]}")
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
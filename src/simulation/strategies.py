@@ -0,0 +1,73 @@
+import abc
+import random
+from ..model.game_model import GameBoard
+from ..model.solver import Solver
+
+
+class Strategy(abc.ABC):
+    '''
+    Base class of the strategies played by the simulation engine.
+    A strategy must be picklable: it is sent to the worker processes.
+    '''
+    name = 'base'
+
+    @abc.abstractmethod
+    def next_move(self, board : GameBoard, rng : random.Random) -> tuple[str, int, int]:
+        '''
+        Choose the next move.
+
+        :param board: The board being played. Strategies must not look at the mine plane.
+        :param rng: Random generator of the game.
+        :return: The click type ('left', 'right' or 'chord'), the row and the column.
+        '''
+
+
+class RandomStrategy(Strategy):
+    '''
+    Reveal a random hidden cell at each move.
+    '''
+    name = 'random'
+
+    # Random draws before falling back to a scan of the board
+    MAX_DRAWS = 32
+
+    def next_move(self, board : GameBoard, rng : random.Random) -> tuple[str, int, int]:
+        revealed, flagged = board.board.revealed, board.board.flagged
+        size = board.board.size
+        # Drawing is cheap while many cells are hidden
+        for _ in range(self.MAX_DRAWS):
+            index = rng.randrange(size)
+            if not revealed[index] and not flagged[index]:
+                return ('left',) + divmod(index, board.cols)
+        hidden = [index for index in range(size) if not revealed[index] and not flagged[index]]
+        return ('left',) + divmod(rng.choice(hidden), board.cols)
+
+
+class SolverStrategy(Strategy):
+    '''
+    Play the hints of the constraint-propagation solver, guessing only when nothing is certain.
+    '''
+    name = 'solver'
+
+    def __init__(self) -> None:
+        self._solver = None
+
+    def next_move(self, board : GameBoard, rng : random.Random) -> tuple[str, int, int]:
+        if self._solver is None or self._solver.board is not board:
+            if self._solver is not None:
+                self._solver.close()
+            self._solver = Solver(board, seed=rng.getrandbits(32))
+        hint = self._solver.next_hint()
+        if hint is None:
+            return RandomStrategy().next_move(board, rng)
+        return ('left' if hint.action == 'reveal' else 'right', hint.row, hint.col)
+
+    def __getstate__(self) -> dict:
+        # The solver of the current game stays in this process
+        return {'_solver': None}
+
+
+STRATEGIES = {
+    RandomStrategy.name: RandomStrategy,
+    SolverStrategy.name: SolverStrategy,
+}
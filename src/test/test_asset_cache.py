@@ -0,0 +1,42 @@
+import pytest
+from PyQt6.QtGui import QPixmap
+from ..view.asset_cache import AssetCache
+import settings as st
+
+@pytest.fixture
+def decode_calls(qapp, monkeypatch):
+    # Count the file decodes, starting from an empty cache
+    calls = []
+    def decode(path):
+        calls.append(path)
+        return QPixmap(4, 4)
+    monkeypatch.setattr(AssetCache, '_pixmaps', {})
+    monkeypatch.setattr(AssetCache, '_decode', staticmethod(decode))
+    return calls
+
+def test_every_image_decoded_once(decode_calls):
+    cache = AssetCache(32)
+    sprites = st.FLOOR_IMAGES + st.SIGIL_IMAGES + st.SPIRIT_IMAGES
+    assert sorted(decode_calls) == sorted(set(sprites))
+    # The dialog images are decoded later, once
+    cache.preload_dialogs()
+    cache.preload_dialogs()
+    assert sorted(decode_calls) == sorted(set(sprites + st.GAME_STATUS))
+
+def test_icons_do_not_read_files(decode_calls):
+    cache = AssetCache(32)
+    cache.preload_dialogs()
+    decode_calls.clear()
+    for _ in range(100):
+        cache.random_icon('floors')
+        cache.random_icon('spirits')
+        cache.random_icon('sigils')
+    cache.pixmap(st.GAME_STATUS[0])
+    # A new view and a new icon size reuse the decoded images
+    AssetCache(16).set_icon_size(48)
+    assert decode_calls == []
+
+def test_icons_are_scaled(decode_calls):
+    cache = AssetCache(20)
+    icon = cache.icon(st.FLOOR_IMAGES[0])
+    assert icon.availableSizes()[0].width() <= 20
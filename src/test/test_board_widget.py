@@ -0,0 +1,122 @@
+import pytest
+from PyQt6.QtCore import Qt, QPoint
+from PyQt6.QtGui import QFont
+from ..view.asset_cache import AssetCache
+from ..view.board_widget import BoardView, BoardWidget, CellRef, EndlessBoardWidget, EndlessCellRef
+
+@pytest.fixture
+def board_widget(qtbot):
+    widget = BoardWidget(rows=10, cols=20, cell_size=10, assets=AssetCache(10), font=QFont())
+    qtbot.addWidget(widget)
+    return widget
+
+def test_widget_size(board_widget):
+    # 20 cells of 10 px separated by 2 px
+    assert board_widget.width() == 20 * 12 - 2
+    assert board_widget.height() == 10 * 12 - 2
+
+def test_hit_testing(board_widget):
+    assert board_widget.cell_at(0, 0) == (0, 0)
+    assert board_widget.cell_at(25, 13) == (1, 2)
+    assert board_widget.cell_at(11, 0) is None  # gap between two cells
+    assert board_widget.cell_at(-1, 5) is None
+    assert board_widget.cell_at(5, 500) is None
+
+def test_click_signal(board_widget, qtbot):
+    with qtbot.waitSignal(board_widget.click_signal) as blocker:
+        qtbot.mouseClick(board_widget, Qt.MouseButton.LeftButton, pos=QPoint(3 * 12 + 5, 2 * 12 + 5))
+    click_type, cell = blocker.args
+    assert click_type == 'left'
+    assert (cell.row, cell.col) == (2, 3)
+
+    with qtbot.waitSignal(board_widget.click_signal) as blocker:
+        qtbot.mouseClick(board_widget, Qt.MouseButton.RightButton, pos=QPoint(5, 5))
+    assert blocker.args == ['right', CellRef(board_widget, 0, 0)]
+
+def test_reveal_and_flag(board_widget):
+    cells = board_widget.cells()
+    assert len(cells) == 10 and len(cells[0]) == 20
+    cell = cells[4][5]
+    assert not cell.revealed
+    board_widget.reveal_cell('number', cell, 3)
+    assert cell.revealed
+    assert board_widget.number(4, 5) == 3
+
+    flagged = cells[0][1]
+    assert board_widget.flag_cell(True, flagged)
+    assert flagged.flagged
+    # A flagged cell can't be revealed
+    board_widget.reveal_cell('safe', flagged)
+    assert not flagged.revealed
+    assert not board_widget.flag_cell(False, flagged)
+    assert not flagged.flagged
+
+def test_tiles_are_cached(board_widget, monkeypatch):
+    rendered = []
+    paint_cells = board_widget.paint_cells
+    monkeypatch.setattr(board_widget, 'paint_cells', lambda painter, rows, cols: (rendered.append((rows, cols)), paint_cells(painter, rows, cols)))
+    board_widget.grab()
+    first = len(rendered)
+    assert first > 0
+    board_widget.grab()
+    assert len(rendered) == first
+    # A change only renders the tile of the cell again
+    board_widget.reveal_cell('safe', board_widget.cells()[0][0])
+    board_widget.grab()
+    assert len(rendered) == first + 1
+
+def test_zoom(qtbot):
+    widget = BoardWidget(rows=200, cols=200, cell_size=10, assets=AssetCache(10), font=QFont())
+    view = BoardView(widget)
+    qtbot.addWidget(view)
+    view.resize(300, 300)
+    view.zoom(1)
+    assert widget.cell_size == 11
+    assert widget.width() == 200 * widget.pitch - widget.spacing
+    for _ in range(100):
+        view.zoom(-1)
+    assert widget.cell_size == BoardView.MIN_CELL_SIZE
+    assert widget.cell_at(0, 0) == (0, 0)
+
+def test_chord_clicks(board_widget, qtbot):
+    with qtbot.waitSignal(board_widget.click_signal) as blocker:
+        qtbot.mouseClick(board_widget, Qt.MouseButton.MiddleButton, pos=QPoint(5, 5))
+    assert blocker.args == ['chord', CellRef(board_widget, 0, 0)]
+    with qtbot.waitSignal(board_widget.click_signal) as blocker:
+        qtbot.mouseDClick(board_widget, Qt.MouseButton.LeftButton, pos=QPoint(12 + 5, 5))
+    assert blocker.args == ['chord', CellRef(board_widget, 0, 1)]
+
+@pytest.fixture
+def endless_widget(qtbot):
+    widget = EndlessBoardWidget(cell_size=10, assets=AssetCache(10), font=QFont())
+    qtbot.addWidget(widget)
+    widget.resize(120, 120)
+    return widget
+
+def test_endless_widget_starts_centered_and_pans(endless_widget, qtbot):
+    # The middle of the cell (0, 0) is at the center of the widget
+    assert endless_widget.cell_at(60, 60) == (0, 0)
+    assert endless_widget.cell_at(60 - 12, 60 - 24) == (-2, -1)
+    endless_widget.pan(12 * 100, -12 * 50)
+    assert endless_widget.cell_at(60, 60) == (-50, 100)
+    # A drag pans, it is not a click
+    with qtbot.assertNotEmitted(endless_widget.click_signal):
+        qtbot.mousePress(endless_widget, Qt.MouseButton.LeftButton, pos=QPoint(60, 60))
+        qtbot.mouseMove(endless_widget, QPoint(60 + 36, 60))
+        qtbot.mouseRelease(endless_widget, Qt.MouseButton.LeftButton, pos=QPoint(60 + 36, 60))
+    assert endless_widget.cell_at(60, 60) == (-50, 97)
+    with qtbot.waitSignal(endless_widget.click_signal) as blocker:
+        qtbot.mouseClick(endless_widget, Qt.MouseButton.LeftButton, pos=QPoint(60, 60))
+    assert blocker.args == ['left', EndlessCellRef(endless_widget, -50, 97)]
+
+def test_endless_widget_keeps_only_the_shown_chunks(endless_widget):
+    cells = endless_widget.cells()
+    far = cells[-1000][5000]
+    endless_widget.reveal_cell('number', far, 2)
+    assert far.revealed and endless_widget.number(-1000, 5000) == 2
+    assert endless_widget.flag_cell(True, cells[3][-3])
+    assert cells[3][-3].flagged and not cells[3][-2].revealed
+    assert len(endless_widget._chunks) == 2
+    endless_widget.zoom(1)
+    assert endless_widget.cell_at(60, 60) == (0, 0)
+    endless_widget.grab()
@@ -0,0 +1,138 @@
+import os
+import pytest
+from ..model.endless import NEIGHBORS, EndlessBoard
+
+@pytest.fixture
+def board():
+    board = EndlessBoard(seed=11, density=0.12, chunk_size=8)
+    yield board
+    board.close()
+
+def reference_opening(board, row, col):
+    '''
+    Cells revealed by clicking a zero cell, by a plain search over global coordinates.
+    '''
+    def adjacent(r, c):
+        return sum(board.is_mine(r + dr, c + dc) for dr, dc in NEIGHBORS)
+
+    seen = {(row, col)}
+    stack = [(row, col)]
+    while stack:
+        r, c = stack.pop()
+        if adjacent(r, c):
+            continue
+        for dr, dc in NEIGHBORS:
+            cell = (r + dr, c + dc)
+            if cell not in seen:
+                seen.add(cell)
+                stack.append(cell)
+    return seen
+
+def test_chunks_are_deterministic_from_seed_and_coordinates():
+    first, second, other = EndlessBoard(seed=3), EndlessBoard(seed=3), EndlessBoard(seed=4)
+    # Generated in a different order, the chunks are the same
+    second.chunk((0, 0))
+    assert first.chunk((5, -7)).mines == second.chunk((5, -7)).mines
+    assert first.chunk((5, -7)).mines != other.chunk((5, -7)).mines
+    assert first.chunk((5, -7)).mines.count(1) == round(0.16 * 32 * 32)
+    for board in (first, second, other):
+        board.close()
+
+def test_adjacent_counts_cross_chunk_borders(board):
+    for key in ((0, 0), (-1, 2), (3, -3)):
+        chunk = board.chunk(key)
+        for index in range(64):
+            row, col = key[0] * 8 + index // 8, key[1] * 8 + index % 8
+            if chunk.mines[index]:
+                continue
+            assert chunk.adjacent[index] == sum(board.is_mine(row + dr, col + dc) for dr, dc in NEIGHBORS)
+
+def test_start_is_safe_and_openings_fill_across_chunks(board):
+    assert not any(board.is_mine(r, c) for r in (-1, 0, 1) for c in (-1, 0, 1))
+    board._reveal_cell(0, 0)
+    assert not board.is_game_over
+    expected = reference_opening(board, 0, 0)
+    changed = board.pop_changed_cells()
+    assert set(changed) == expected and len(changed) == len(expected) == board.revealed_safe
+    assert len({board.chunk_of(*cell)[0] for cell in expected}) > 1
+    assert all(board.cell(*cell)[0] for cell in expected)
+
+def test_untouched_chunks_are_not_created(board):
+    board._flag_cell(100, 100)
+    assert board.loaded_chunks == 1
+    # Reading far away cells does not create their chunk
+    assert board.cell(-500, 40) == (False, False, 0)
+    assert board.is_mine(-500, 40) in (True, False)
+    assert board.loaded_chunks == 1
+
+def test_cold_chunks_are_evicted_to_disk_and_restored(tmp_path):
+    board = EndlessBoard(seed=5, chunk_size=8, max_chunks=2, cache_dir=str(tmp_path))
+    cells = [(0, 40 * i) for i in range(6)]
+    for row, col in cells:
+        board._flag_cell(row, col)
+    assert board.loaded_chunks == 2 and board.stored_chunks == 4
+    assert len(os.listdir(tmp_path)) == 4
+    assert all(board.cell(row, col)[1] for row, col in cells)
+    # A chunk without marks left is dropped from the disk
+    board._flag_cell(*cells[0])
+    for row, col in cells[1:]:
+        board.cell(row, col)
+    key = board.chunk_of(*cells[0])[0]
+    assert key not in board._chunks and not os.path.exists(board._path(key))
+    assert board.count_flags == 5 and board.stored_chunks == 5
+    board.close()
+
+def test_revealing_a_mine_ends_the_game(board):
+    mine = next((0, col) for col in range(2, 100) if board.is_mine(0, col))
+    board._reveal_cell(*mine)
+    assert board.is_game_over
+    assert board.pop_changed_cells() == [mine]
+    board._flag_cell(5, 5)
+    assert board.pop_changed_cells() == []
+
+def test_fill_stops_at_the_limit():
+    board = EndlessBoard(seed=1, density=0.01, chunk_size=16, fill_limit=2000)
+    board._reveal_cell(0, 0)
+    assert 2000 <= board.revealed_safe < 2000 + 16 * 16 * 4
+    board.close()
+
+def test_chord_reveals_neighbors_across_chunks(board):
+    # A number on the corner of a chunk, with its mines flagged
+    row, col = next((r, c) for r in range(-80, 80, 8) for c in range(-80, 80, 8)
+                    if not board.is_mine(r, c) and 0 < sum(board.is_mine(r + dr, c + dc) for dr, dc in NEIGHBORS) < 3)
+    board._reveal_cell(row, col)
+    for d_row, d_col in NEIGHBORS:
+        if board.is_mine(row + d_row, col + d_col):
+            board._flag_cell(row + d_row, col + d_col)
+    board.pop_changed_cells()
+    board._chord_cell(row, col)
+    assert not board.is_game_over
+    assert all(board.cell(row + d_row, col + d_col)[0] != board.is_mine(row + d_row, col + d_col)
+               for d_row, d_col in NEIGHBORS)
+    assert len({board.chunk_of(row + d_row, col + d_col)[0] for d_row, d_col in NEIGHBORS}) == 4
+
+def test_chord_on_a_wrong_flag_ends_the_game_without_scoring(board):
+    row, col = next((r, c) for r in range(-80, 80) for c in range(-80, 80)
+                    if not board.is_mine(r, c) and sum(board.is_mine(r + dr, c + dc) for dr, dc in NEIGHBORS) == 1
+                    and all(board.cell(r + dr, c + dc) == (False, False, 0) for dr, dc in NEIGHBORS))
+    board._reveal_cell(row, col)
+    # The flag goes on a safe neighbor instead of the mine
+    wrong = next((row + dr, col + dc) for dr, dc in NEIGHBORS if not board.is_mine(row + dr, col + dc))
+    board._flag_cell(*wrong)
+    score = board.revealed_safe
+    board.pop_changed_cells()
+    board._chord_cell(row, col)
+    assert board.is_game_over and board.revealed_safe == score
+    changed = board.pop_changed_cells()
+    assert len(changed) == 1 and board.is_mine(*changed[0])
+
+def test_temporary_cache_is_removed_with_the_board():
+    with EndlessBoard(seed=2) as board:
+        cache_dir = board.cache_dir
+        assert os.path.isdir(cache_dir)
+    assert not os.path.exists(cache_dir)
+    # Without close(), when the board is collected
+    board = EndlessBoard(seed=2)
+    cache_dir = board.cache_dir
+    del board
+    assert not os.path.exists(cache_dir)
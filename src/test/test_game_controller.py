@@ -140,150 +140,152 @@
     
 #     mock_view.show_game_over_message.assert_not_called()
 
+import os
 import pytest
 from unittest.mock import Mock, patch
+import settings as st
 from ..controller.game_controller import GameController
 from ..model.game_model import GameBoard
-from ..view.game_view import GameView, CustomButton
+from ..view.game_view import CustomButton
 
 @pytest.fixture
 def mock_model():
     mock = Mock(spec=GameBoard)
     mock.rows = 3
     mock.cols = 3
-    mock.board = [[Mock() for _ in range(3)] for _ in range(3)]
     mock.is_game_won = False
     mock.is_game_over = False
     mock.get_count_mines.return_value = 5
+    mock.pop_changed_cells.return_value = []
     return mock
 
 @pytest.fixture
-def mock_view():
-    mock = Mock(spec=GameView)
-    mock_buttons = [[Mock(spec=CustomButton) for _ in range(3)] for _ in range(3)]
-    mock.get_buttons.return_value = mock_buttons
-    return mock
+def game_controller(qtbot, monkeypatch, tmp_path):
+    # Nothing is read from or written to the player's files
+    monkeypatch.setattr(st, 'SAVE_PATH', str(tmp_path / 'save.bin'))
+    monkeypatch.setattr(st, 'REPLAY_PATH', str(tmp_path / 'replays.bin'))
+    # The intro and the resume dialogs would block the tests
+    monkeypatch.setattr(GameController, 'show_intro', lambda self: None)
+    controller = GameController()
+    qtbot.addWidget(controller.view)
+    # And so would the end-of-game dialogs
+    controller.view.show_message = Mock()
+    controller.view.play_sound = Mock()
+    return controller
 
 @pytest.fixture
-def game_controller(mock_model, mock_view):
-    return GameController(mock_model, mock_view)
+def mocked_controller(game_controller, mock_model):
+    game_controller.model = mock_model
+    game_controller.recorder = None
+    return game_controller
 
-def test_init(game_controller, mock_model, mock_view):
-    assert game_controller.model == mock_model
-    assert game_controller.view == mock_view
+def mock_button(row, col):
+    button = Mock(spec=CustomButton)
+    button.row = row
+    button.col = col
+    return button
 
-def test_connect_buttons(game_controller, mock_view):
-    mock_buttons = mock_view.get_buttons()
-    
-    # Clear any previous calls to connect
-    for row in mock_buttons:
-        for btn in row:
-            btn.click_signal.connect.reset_mock()
-    
-    game_controller.connect_buttons()
+def test_init(game_controller):
+    model = game_controller.model
+    assert isinstance(model, GameBoard) and model.difficulty == 'Easy'
+    buttons = game_controller.view.get_buttons()
+    assert len(buttons) == model.rows and len(buttons[0]) == model.cols
+    assert game_controller.board_pool is None
 
-    # Ensure that each button's connect method is called only once with the correct handler
-    for row in mock_buttons:
-        for btn in row:
-            btn.click_signal.connect.assert_called_once_with(game_controller.handle_button_click)
+def test_options_are_keyword_only(qtbot):
+    with pytest.raises(TypeError):
+        GameController(Mock(), Mock())
 
-def test_handle_button_click_left(game_controller, mock_model):
-    mock_button = Mock(spec=CustomButton)
-    mock_button.row = 1
-    mock_button.col = 2
-    
-    game_controller.handle_button_click("left", mock_button)
+def test_handle_button_click_left(mocked_controller, mock_model):
+    mocked_controller.handle_button_click("left", mock_button(1, 2))
     
     mock_model._reveal_cell.assert_called_once_with(1, 2)
     mock_model._flag_cell.assert_not_called()
 
-def test_handle_button_click_right(game_controller, mock_model):
-    mock_button = Mock(spec=CustomButton)
-    mock_button.row = 1
-    mock_button.col = 2
-    
-    game_controller.handle_button_click("right", mock_button)
+def test_handle_button_click_right(mocked_controller, mock_model):
+    mocked_controller.handle_button_click("right", mock_button(1, 2))
     
     mock_model._flag_cell.assert_called_once_with(1, 2)
     mock_model._reveal_cell.assert_not_called()
 
-@patch.object(GameController, 'update_view')
-def test_handle_button_click_updates_view(mock_update_view, game_controller):
-    mock_button = Mock(spec=CustomButton)
-    mock_button.row = 1
-    mock_button.col = 2
+def test_handle_button_click_chord(mocked_controller, mock_model):
+    mocked_controller.handle_button_click("chord", mock_button(1, 2))
     
-    game_controller.handle_button_click("left", mock_button)
-    mock_update_view.assert_called_once()
+    mock_model._chord_cell.assert_called_once_with(1, 2)
 
-def test_update_view(game_controller, mock_model, mock_view):
-    mock_buttons = mock_view.get_buttons()
-    
-    # Setup cell attributes in mock_model
-    for row in mock_model.board:
-        for cell in row:
-            cell.is_flagged = False
-            cell.is_revealed = False
-            cell.is_mine = False
-            cell.adjacent_mines = 0
-    
-    game_controller.update_view()
+def test_handle_button_click_after_game_over(mocked_controller, mock_model):
+    mock_model.is_game_over = True
+    mocked_controller.handle_button_click("left", mock_button(1, 2))
     
-    # Check that flag_cell and reveal_cell are called appropriately
-    for row in range(mock_model.rows):
-        for col in range(mock_model.cols):
-            cell = mock_model.board[row][col]
-            button = mock_buttons[row][col]
-            
-            if cell.is_flagged:
-                mock_view.flag_cell.assert_any_call(True, button)
-            else:
-                mock_view.flag_cell.assert_any_call(False, button)
-            
-            if cell.is_revealed:
-                if cell.is_mine:
-                    mock_view.reveal_cell.assert_any_call('mine', button)
-                elif cell.adjacent_mines == 0:
-                    mock_view.reveal_cell.assert_any_call('safe', button)
-                else:
-                    mock_view.reveal_cell.assert_any_call('number', button, cell.adjacent_mines)
-            else:
-                button.setText.assert_called_with("")
+    mock_model._reveal_cell.assert_not_called()
+
+@patch.object(GameController, 'update_view')
+def test_handle_button_click_updates_view(mock_update_view, mocked_controller):
+    mocked_controller.handle_button_click("left", mock_button(1, 2))
+    mock_update_view.assert_called_once()
+
+def test_update_view_repaints_the_changed_cells(mocked_controller, mock_model):
+    mock_model.pop_changed_cells.return_value = [(0, 1), (2, 2)]
+    buttons = mocked_controller.view.get_buttons()
+    with patch.object(GameController, 'update_cell') as update_cell:
+        mocked_controller.update_view()
+    assert update_cell.call_args_list == [((0, 1, buttons[0][1]),), ((2, 2, buttons[2][2]),)]
 
 @patch.object(GameController, 'game_over_or_win_check')
 @patch.object(GameController, 'update_mine_counter')
-def test_update_view_calls_checks(mock_update_counter, mock_game_over_check, game_controller):
-    game_controller.update_view()
+def test_update_view_calls_checks(mock_update_counter, mock_game_over_check, mocked_controller):
+    mocked_controller.update_view()
     mock_game_over_check.assert_called_once()
     mock_update_counter.assert_called_once()
 
-def test_update_mine_counter(game_controller, mock_model, mock_view):
+def test_update_mine_counter(mocked_controller, mock_model):
+    mocked_controller.view.update_view_mine_counter = Mock()
     mock_model.get_count_mines.return_value = 5
     
-    game_controller.update_mine_counter()
+    mocked_controller.update_mine_counter()
     
-    mock_view.update_view_mine_counter.assert_called_once_with(5)
+    mocked_controller.view.update_view_mine_counter.assert_called_once_with(5)
 
-def test_game_over_or_win_check_win(game_controller, mock_model, mock_view):
+def test_game_over_or_win_check_win(mocked_controller, mock_model):
     mock_model.is_game_won = True
     mock_model.is_game_over = False
     
-    game_controller.game_over_or_win_check()
+    mocked_controller.game_over_or_win_check()
     
-    mock_view.show_game_over_message.assert_called_once_with(won=True)
+    mocked_controller.view.show_message.assert_called_once_with('victory')
 
-def test_game_over_or_win_check_lose(game_controller, mock_model, mock_view):
+def test_game_over_or_win_check_lose(mocked_controller, mock_model):
     mock_model.is_game_won = False
     mock_model.is_game_over = True
     
-    game_controller.game_over_or_win_check()
+    mocked_controller.game_over_or_win_check()
     
-    mock_view.show_game_over_message.assert_called_once_with(won=False)
+    mocked_controller.view.show_message.assert_called_once_with('game_over')
 
-def test_game_over_or_win_check_ongoing(game_controller, mock_model, mock_view):
+def test_game_over_or_win_check_ongoing(mocked_controller, mock_model):
     mock_model.is_game_won = False
     mock_model.is_game_over = False
     
-    game_controller.game_over_or_win_check()
+    mocked_controller.game_over_or_win_check()
     
-    mock_view.show_game_over_message.assert_not_called()
+    mocked_controller.view.show_message.assert_not_called()
+
+def test_endless_game(game_controller):
+    game_controller.view.difficulty_selector.setCurrentText('Endless')
+    game_controller.new_game()
+    model, view = game_controller.model, game_controller.view
+    assert game_controller.endless and view.endless
+    # The start opening is shown and scored
+    buttons = view.get_buttons()
+    assert buttons[0][0].revealed and model.revealed_safe > 0
+    assert view.mine_counter.text() == f"Score: {model.revealed_safe}"
+    row, col = next((r, c) for r in range(-40, -10) for c in range(-40, -10) if not model.is_mine(r, c))
+    game_controller.handle_button_click("left", buttons[row][col])
+    assert buttons[row][col].revealed and not model.is_game_over
+    cache_dir = model.cache_dir
+    # Back to a classic game: the chunk cache is dropped
+    game_controller.view.difficulty_selector.setCurrentText('Easy')
+    game_controller.new_game()
+    assert not game_controller.endless and not view.endless
+    assert len(view.get_buttons()) == 8
+    assert not os.path.exists(cache_dir)
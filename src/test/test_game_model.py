@@ -1,5 +1,7 @@
+import random
 import pytest
 from ..model.game_model import GameBoard, Cell
+from ..model.neighbors import count_adjacent_mines
 
 @pytest.fixture
 def sample_board():
@@ -35,3 +37,227 @@ def test_check_victory(sample_board):
     
     assert sample_board.is_game_won
 
+def test_compact_board_planes():
+    board = GameBoard('Medium')
+    assert board.board.size == 16 * 16
+    assert len(board.board.mines) == board.board.size
+    assert sum(board.board.mines) == 40
+
+def test_cell_view_writes_through():
+    board = GameBoard('Easy')
+    cell = board.board[2][3]
+    cell.is_flagged = True
+    assert board.board.flagged[2 * board.cols + 3] == 1
+    assert board.board[2][3].is_flagged
+    with pytest.raises(IndexError):
+        board.board[8]
+
+def test_adjacent_mines_match_per_cell_count():
+    board = GameBoard('Hard')
+    for row in range(board.rows):
+        for col in range(board.cols):
+            if not board.board[row][col].is_mine:
+                assert board.board[row][col].adjacent_mines == board._count_near_mines(row, col)
+            else:
+                assert board.board[row][col].adjacent_mines == 0
+
+def test_adjacent_mines_numpy_matches_python():
+    pytest.importorskip('numpy')
+    board = GameBoard('Hard')
+    python_counts = count_adjacent_mines(board.board.mines, board.rows, board.cols, use_numpy=False)
+    numpy_counts = count_adjacent_mines(board.board.mines, board.rows, board.cols, use_numpy=True)
+    assert python_counts == numpy_counts
+
+def test_pop_changed_cells():
+    board = GameBoard('Easy')
+    assert board.pop_changed_cells() == []
+    board._flag_cell(0, 0)
+    assert board.pop_changed_cells() == [(0, 0)]
+    board._flag_cell(0, 0)
+    safe = next((r, c) for r in range(board.rows) for c in range(board.cols) if not board.board[r][c].is_mine and (r, c) != (0, 0))
+    board._reveal_cell(*safe)
+    changed = board.pop_changed_cells()
+    assert changed[0] == (0, 0)
+    assert set(changed[1:]) == {(r, c) for r in range(board.rows) for c in range(board.cols) if board.board[r][c].is_revealed}
+    assert board.pop_changed_cells() == []
+
+def reference_fill(board, row, col):
+    # Plain 8-neighbor stack fill, skipping flagged cells
+    opened = set()
+    stack = [(row, col)]
+    while stack:
+        r, c = stack.pop()
+        if not (0 <= r < board.rows and 0 <= c < board.cols) or (r, c) in opened:
+            continue
+        cell = board.board[r][c]
+        if cell.is_revealed or cell.is_flagged:
+            continue
+        opened.add((r, c))
+        if cell.adjacent_mines == 0:
+            stack.extend((r + dx, c + dy) for dx, dy in GameBoard.NEIGHBORS)
+    return opened
+
+@pytest.mark.parametrize('seed', range(20))
+def test_scanline_fill_matches_reference(seed):
+    random.seed(seed)
+    board = GameBoard('Hard')
+    board._flag_cell(random.randrange(board.rows), random.randrange(board.cols))
+    zeros = [(r, c) for r in range(board.rows) for c in range(board.cols)
+             if board.board[r][c].adjacent_mines == 0 and not board.board[r][c].is_mine and not board.board[r][c].is_flagged]
+    row, col = random.choice(zeros)
+    expected = reference_fill(board, row, col)
+    board.pop_changed_cells()
+    board._reveal_adjacent_cells(row, col)
+    changed = board.pop_changed_cells()
+    assert len(changed) == len(expected)
+    assert set(changed) == expected
+    assert board.safe_remaining == board._count_unrevealed_safe()
+
+@pytest.mark.parametrize('seed', range(10))
+def test_precomputed_openings_match_flood_fill(seed):
+    random.seed(seed)
+    indexed = GameBoard('Hard', precompute_openings=True)
+    random.seed(seed)
+    plain = GameBoard('Hard')
+    assert indexed.board.mines == plain.board.mines
+    for row in range(plain.rows):
+        for col in range(plain.cols):
+            if not plain.board[row][col].is_mine and not plain.board[row][col].is_revealed:
+                plain._reveal_cell(row, col)
+                indexed._reveal_cell(row, col)
+                assert sorted(indexed.pop_changed_cells()) == sorted(plain.pop_changed_cells())
+    assert indexed.safe_remaining == 0
+
+def test_precomputed_opening_with_flag_falls_back():
+    random.seed(3)
+    board = GameBoard('Hard', precompute_openings=True)
+    label = max(range(len(board.openings)), key=lambda label: len(board.openings.zeros[label]))
+    zeros = board.openings.zeros[label]
+    flagged_row, flagged_col = divmod(zeros[0], board.cols)
+    board._flag_cell(flagged_row, flagged_col)
+    assert board.openings.reveal(board.board, zeros[-1]) is None
+    row, col = divmod(zeros[-1], board.cols)
+    board._reveal_cell(row, col)
+    assert not board.board[flagged_row][flagged_col].is_revealed
+    assert board.safe_remaining == board._count_unrevealed_safe()
+
+def test_custom_board_spec():
+    board = GameBoard(rows=30, cols=50, density=0.2)
+    assert board.get_board_settings() == (30, 50, 300, 'Custom')
+    assert len(board.board) == 30
+    assert len(board.board[0]) == 50
+    assert GameBoard('Medium', num_mines=40).get_difficulty() == 'Medium'
+
+@pytest.mark.parametrize('kwargs', [
+    {'rows': 0, 'cols': 5},
+    {'rows': 5, 'cols': 5, 'num_mines': 25},
+    {'rows': 5, 'cols': 5, 'num_mines': -1},
+    {'rows': 5, 'cols': 5, 'density': 1.0},
+    {'rows': 5, 'cols': 5, 'num_mines': 3, 'density': 0.1},
+])
+def test_invalid_board_spec(kwargs):
+    with pytest.raises(ValueError):
+        GameBoard(**kwargs)
+
+def test_unknown_difficulty():
+    with pytest.raises(ValueError):
+        GameBoard('Nightmare')
+
+def test_dense_mine_placement():
+    board = GameBoard(rows=40, cols=40, num_mines=1599)
+    assert sum(board.board.mines) == 1599
+    assert board.safe_remaining == 1
+
+def board_state(board):
+    return (bytes(board.board.revealed), bytes(board.board.flagged), board.safe_remaining,
+            board.count_flags, board.count_mines, board.is_game_over)
+
+def test_undo_redo_opening():
+    # Mines in the last column: revealing (0, 0) opens most of the board
+    board = GameBoard.from_mines(6, 6, [5, 17, 29])
+    before = board_state(board)
+    board._flag_cell(5, 0)
+    board._reveal_cell(0, 0)
+    after = board_state(board)
+    assert len(board.history) == 2
+    board.pop_changed_cells()
+
+    assert board.undo()
+    assert sorted(board.pop_changed_cells()) == sorted(divmod(i, 6) for i in range(36) if after[0][i])
+    assert board.undo()
+    assert board_state(board) == before
+    assert not board.undo()
+
+    assert board.redo() and board.redo()
+    assert board_state(board) == after
+    assert not board.redo()
+
+def test_undo_game_over_and_new_move_clears_redo():
+    board = GameBoard.from_mines(3, 3, [0])
+    board._reveal_cell(0, 0)
+    assert board.is_game_over
+    board.undo()
+    assert not board.is_game_over and not board.board.revealed[0]
+    board.redo()
+    assert board.is_game_over
+    board.undo()
+    board._reveal_cell(2, 2)
+    assert not board.history.can_redo()
+
+def test_history_size_is_bounded():
+    board = GameBoard.from_mines(4, 4, [0])
+    board.set_history_size(3)
+    for _ in range(4):
+        board._flag_cell(3, 3)
+    assert len(board.history) == 3
+    while board.undo():
+        pass
+    # The oldest toggle is forgotten: the flag it placed stays
+    assert board.board.flagged[15] and board.count_flags == 1
+
+def test_resizing_the_history_keeps_the_redo_moves():
+    board = GameBoard.from_mines(4, 4, [0])
+    for _ in range(5):
+        board._flag_cell(3, 3)
+    while board.undo():
+        pass
+    board.set_history_size(8)
+    assert len(board.history._redo) == 5
+    board.set_history_size(2)
+    assert len(board.history._redo) == 2
+    # The moves closest to the current state stay: the first two toggles
+    assert board.redo() and board.board.flagged[15]
+    assert board.redo() and not board.board.flagged[15]
+    assert not board.redo()
+
+def chord_board():
+    # Mine at (0, 0): (1, 1) is a 1 whose only hidden neighbors after the flag are safe,
+    # and (2, 2) onwards is an opening
+    board = GameBoard.from_mines(5, 5, [0])
+    board._reveal_cell(1, 1)
+    return board
+
+def test_chord_reveals_neighbors_in_one_change_set():
+    board = chord_board()
+    board._chord_cell(1, 1)  # flag missing: nothing happens
+    assert not board.board.revealed[2]
+    board._flag_cell(0, 0)
+    board.pop_changed_cells()
+    calls = []
+    board.add_listener(calls.append)
+    moves = len(board.history)
+    board._chord_cell(1, 1)
+    # One listener call and one journal entry for the whole chord, including the opening it reached
+    assert len(calls) == 1 and len(board.history) == moves + 1
+    assert board.safe_remaining == 0 and not board.is_game_over
+    assert len(board.pop_changed_cells()) == 23
+    board.undo()
+    assert board.safe_remaining == 23 and board.board.revealed[6]
+
+def test_chord_with_a_wrong_flag_loses():
+    board = chord_board()
+    board._flag_cell(0, 1)
+    board._chord_cell(1, 1)
+    assert board.is_game_over and board.board.revealed[0]
+    board.undo()
+    assert not board.is_game_over and board.safe_remaining == 23
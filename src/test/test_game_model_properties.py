@@ -0,0 +1,42 @@
+import random
+import pytest
+from ..model.game_model import GameBoard
+
+hypothesis = pytest.importorskip('hypothesis')
+from hypothesis import given, settings, strategies as st
+
+# A move is (click type, row, col) on the 8x8 'Easy' board
+moves = st.lists(st.tuples(st.sampled_from(['left', 'right']), st.integers(0, 7), st.integers(0, 7)), max_size=40)
+
+def play(board, click_type, row, col):
+    if click_type == 'left':
+        board._reveal_cell(row, col)
+    else:
+        board._flag_cell(row, col)
+
+@settings(max_examples=200, deadline=None)
+@given(seed=st.integers(0, 2**32 - 1), moves=moves)
+def test_safe_remaining_matches_full_scan(seed, moves):
+    random.seed(seed)
+    board = GameBoard('Easy')
+    for click_type, row, col in moves:
+        if board.is_game_over:
+            break
+        play(board, click_type, row, col)
+        assert board.safe_remaining == board._count_unrevealed_safe()
+
+@settings(max_examples=100, deadline=None)
+@given(seed=st.integers(0, 2**32 - 1))
+def test_victory_when_all_safe_cells_revealed(seed):
+    random.seed(seed)
+    board = GameBoard('Easy')
+    for row in range(board.rows):
+        for col in range(board.cols):
+            if not board.board[row][col].is_mine and not board.board[row][col].is_revealed:
+                # A safe cell is still hidden
+                board._check_victory()
+                assert not board.is_game_won
+                board._reveal_cell(row, col)
+    board._check_victory()
+    assert board.is_game_won
+    assert board.safe_remaining == 0
@@ -6,7 +6,7 @@ from ..view.game_view import GameView, CustomButton
 @pytest.fixture
 def game_view(qtbot):
     # Set up the GameView with a grid of 5x5 and 10 mines
-    view = GameView(rows=5, cols=5, count_mines=10)
+    view = GameView((5, 5, 10, 'Custom'))
     qtbot.addWidget(view)
     return view
 
@@ -26,6 +26,10 @@ def test_custom_button_signal(qtbot):
         qtbot.mouseClick(button, Qt.MouseButton.RightButton)
     assert blocker.args == ['right', button]  # Check right-click signal
 
+    with qtbot.waitSignal(button.click_signal) as blocker:
+        qtbot.mouseClick(button, Qt.MouseButton.MiddleButton)
+    assert blocker.args == ['chord', button]  # Middle click chords
+
 def test_reveal_cell(game_view):
     button = game_view.buttons[0][0]
     assert not button.revealed  # Ensure button is not revealed initially
@@ -49,6 +53,23 @@ def test_mine_counter_update(game_view):
     updated_text = game_view.mine_counter.text()
     assert initial_text != updated_text  # Ensure the mine counter text is updated
 
+def test_reset_same_size_keeps_buttons(game_view):
+    button = game_view.buttons[2][3]
+    game_view.reveal_cell('number', button, 2)
+    game_view.flag_cell(True, game_view.buttons[0][0])
+    # Same board size: the buttons are only cleared
+    assert not game_view.reset((5, 5, 7, 'Custom'))
+    assert game_view.buttons[2][3] is button
+    assert not button.revealed and button.text() == ""
+    assert not game_view.buttons[0][0].flagged
+    assert game_view.mine_counter.text() == "Mines: 7"
+
+def test_reset_new_size_rebuilds_buttons(game_view):
+    assert game_view.reset((8, 8, 10, 'Easy'))
+    assert len(game_view.buttons) == 8 and len(game_view.buttons[0]) == 8
+    assert game_view.difficulty_selector.currentText() == 'Easy'
+    assert game_view.assets.icon_size == game_view.button_size == 600 // 8
+
 
 
 
@@ -58,3 +79,12 @@ def test_game_over_message_display(game_view, qtbot):
     dialog.show()  # Make sure the dialog is shown
     with qtbot.waitExposed(dialog):  # Pass the instance of QDialog, not the class
         assert dialog.isVisible()  # Check if the dialog is visible
+
+def test_assets_loaded_after_first_frame(qtbot, monkeypatch):
+    monkeypatch.setenv('MINESWEEPER_AUDIO', 'null')
+    view = GameView((5, 5, 10, 'Custom'))
+    qtbot.addWidget(view)
+    # Nothing but the board before the event loop runs
+    assert not view.fonts_loaded and view.sounds is None
+    qtbot.waitUntil(lambda: view.sounds is not None)
+    assert view.fonts_loaded
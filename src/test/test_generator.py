@@ -0,0 +1,44 @@
+import pytest
+from ..model.generator import NoGuessGenerator, NoGuessPool
+from ..model.solver import Solver
+
+def solve_without_guess(board, start):
+    solver = Solver(board)
+    board._reveal_cell(*start)
+    while solver.solve_step(guess=False):
+        pass
+    return board.is_game_won
+
+@pytest.mark.parametrize('rows, cols, num_mines', [(8, 8, 10), (16, 16, 40), (16, 30, 99)])
+def test_generated_boards_need_no_guess(rows, cols, num_mines):
+    generator = NoGuessGenerator(rows, cols, num_mines, seed=7)
+    for _ in range(5):
+        board, start = generator.generate()
+        assert sum(board.board.mines) == num_mines
+        assert board.board[start[0]][start[1]].adjacent_mines == 0
+        assert not board.board[start[0]][start[1]].is_mine
+        assert solve_without_guess(board, start)
+
+def test_generator_is_seeded():
+    first, _ = NoGuessGenerator(16, 16, 40, seed=3).generate()
+    second, _ = NoGuessGenerator(16, 16, 40, seed=3).generate()
+    assert first.board.mines == second.board.mines
+
+def test_generator_rejects_crowded_boards():
+    with pytest.raises(ValueError):
+        NoGuessGenerator(3, 3, 1)
+
+def test_pool_never_blocks():
+    pool = NoGuessPool(depth=1, workers=1)
+    try:
+        pool.prepare(8, 8, 10, 'Easy')
+        generated = None
+        while generated is None:
+            generated = pool.get(8, 8, 10, 'Easy')
+            if generated is None:
+                pool._pending[(8, 8, 10, 'Easy')][0].result()
+        board, start = generated
+        assert board.get_board_settings() == (8, 8, 10, 'Easy')
+        assert solve_without_guess(board, start)
+    finally:
+        pool.shutdown()
@@ -0,0 +1,74 @@
+import json
+import time
+from ..controller.game_controller import GameController
+from ..controller.instrumentation import ClickProfiler, LogHistogram, NullProfiler, create_profiler
+
+def test_histogram_buckets_are_powers_of_two():
+    histogram = LogHistogram()
+    for value in (0, 1, 2, 3, 900, 1000, 1023, 1024):
+        histogram.record(value)
+    assert histogram.buckets[0] == 1 and histogram.buckets[1] == 1 and histogram.buckets[2] == 2
+    assert histogram.buckets[10] == 3 and histogram.buckets[11] == 1
+    assert histogram.count == 8 and histogram.max == 1024
+    # Percentiles are bucket bounds, never above the largest value
+    assert histogram.percentile(0.5) == 3
+    assert histogram.percentile(0.8) == 1023
+    assert histogram.percentile(1.0) == 1024
+
+def test_click_time_leaves_dialogs_out_and_keeps_the_slowest_click():
+    profiler = ClickProfiler()
+    with profiler.click():
+        profiler.record('model', 1_000)
+        profiler.record('dialog', 10 ** 12)
+    with profiler.click():
+        profiler.record('model', 5_000_000)
+        profiler.count('cells', 40)
+    click = profiler.histograms['click']
+    assert click.count == 2 and click.max < 10 ** 12
+    elapsed, phases = profiler.slowest
+    assert phases == {'model': 5_000_000, 'cells': 40} and elapsed >= 0
+    assert 'slowest click' in profiler.report()
+
+def test_nested_phases_are_not_counted_twice():
+    profiler = ClickProfiler()
+    with profiler.click():
+        with profiler.phase('repaint'):
+            with profiler.phase('sound'):
+                time.sleep(0.02)
+    repaint, sound = profiler.histograms['repaint'], profiler.histograms['sound']
+    assert sound.total >= 20_000_000 and repaint.total < 10_000_000
+    # The phases add up to the click
+    elapsed, phases = profiler.slowest
+    assert phases['repaint'] + phases['sound'] <= elapsed
+    assert 'other' in profiler.report()
+
+def test_disabled_profiler_does_nothing():
+    profiler = create_profiler('')
+    assert isinstance(profiler, NullProfiler)
+    with profiler.click(), profiler.phase('model'):
+        profiler.count('cells', 3)
+    profiler.dump()
+    assert isinstance(create_profiler('1'), ClickProfiler) and create_profiler('1').path is None
+    assert create_profiler('/tmp/profile.json').path == '/tmp/profile.json'
+
+def test_controller_times_each_phase_of_a_click(qtbot, tmp_path, capsys):
+    path = tmp_path / 'profile.json'
+    controller = GameController(profile=str(path))
+    qtbot.addWidget(controller.view)
+    board = controller.model.board
+    # A numbered cell: revealed alone, the game goes on
+    index = next(i for i in range(board.size) if not board.mines[i] and board.adjacent[i])
+    other = next(i for i in range(board.size) if i != index and not board.revealed[i])
+    buttons = controller.view.get_buttons()
+    controller.handle_button_click('left', buttons[index // controller.model.cols][index % controller.model.cols])
+    controller.handle_button_click('right', buttons[other // controller.model.cols][other % controller.model.cols])
+    histograms = controller.profiler.histograms
+    assert histograms['click'].count == 2
+    assert histograms['model'].count == 2 and histograms['repaint'].count >= 2
+    assert histograms['victory'].count >= 2
+    # The flag plays the sigil sound
+    assert histograms['sound'].count >= 1
+    assert histograms['cells'].max == 1
+    controller.profiler.dump()
+    assert 'slowest click' in capsys.readouterr().err
+    assert json.loads(path.read_text())['histograms']['click']['count'] == 2
@@ -0,0 +1,79 @@
+import random
+import pytest
+from ..model.game_model import GameBoard
+from ..model.persistence import (HEADER, SaveFormatError, dumps, load_game, loads, pack_bits, save_game,
+                                 unpack_bits)
+
+def played_board(seed=0):
+    random.seed(seed)
+    board = GameBoard(rows=13, cols=29, num_mines=60)
+    for _ in range(20):
+        board._reveal_cell(random.randrange(13), random.randrange(29))
+        board.is_game_over = False
+    for _ in range(10):
+        board._flag_cell(random.randrange(13), random.randrange(29))
+    return board
+
+def assert_same_game(a, b):
+    for plane in ('mines', 'revealed', 'flagged', 'adjacent'):
+        assert getattr(a.board, plane) == getattr(b.board, plane)
+    assert a.get_board_settings() == b.get_board_settings()
+    assert (a.count_flags, a.count_mines, a.safe_remaining) == (b.count_flags, b.count_mines, b.safe_remaining)
+    assert (a.is_game_over, a.is_game_won) == (b.is_game_over, b.is_game_won)
+
+@pytest.mark.parametrize('size', [0, 1, 7, 8, 9, 100])
+def test_bit_packing(size):
+    plane = bytearray(random.getrandbits(1) for _ in range(size))
+    packed = pack_bits(plane)
+    assert len(packed) == (size + 7) // 8
+    assert all((packed[i // 8] >> (i % 8)) & 1 == plane[i] for i in range(size))
+    assert unpack_bits(packed, size) == plane
+
+def test_roundtrip_in_memory():
+    board = played_board()
+    data = dumps(board)
+    # Three bit planes after the header and the label
+    assert len(data) == HEADER.size + len('Custom') + 3 * ((13 * 29 + 7) // 8)
+    assert_same_game(board, loads(data))
+
+def test_roundtrip_file_and_resume(tmp_path):
+    board = GameBoard.from_mines(4, 4, [15], difficulty='Custom')
+    board._flag_cell(3, 3)
+    board._reveal_cell(3, 2)
+    path = str(tmp_path / 'saves' / 'save.hmsv')
+    save_game(board, path)
+    restored = load_game(path)
+    assert_same_game(board, restored)
+    # The restored game goes on
+    restored._reveal_cell(0, 0)
+    restored._check_victory()
+    assert restored.is_game_won
+
+CORRUPTIONS = [
+    lambda data: data[:10],
+    lambda data: b'XXXX' + data[4:],
+    lambda data: data[:4] + b'\x09\x00' + data[6:],
+    lambda data: data + b'\x00',
+    # Mine plane with one more mine than the header
+    lambda data: data[:HEADER.size + 6] + bytes([data[HEADER.size + 6] ^ 0b1]) + data[HEADER.size + 7:],
+    # Difficulty label that is not UTF-8
+    lambda data: data[:HEADER.size] + b'\xff' + data[HEADER.size + 1:],
+    # Flag counters (count_flags, count_mines) that do not match the flagged plane
+    lambda data: data[:18] + (1).to_bytes(4, 'little') + (0).to_bytes(4, 'little') + data[26:],
+    # One more safe cell left than the revealed plane says
+    lambda data: data[:26] + (int.from_bytes(data[26:30], 'little') + 1).to_bytes(4, 'little') + data[30:],
+]
+
+@pytest.mark.parametrize('corrupt', CORRUPTIONS)
+def test_invalid_saves(corrupt):
+    board = GameBoard.from_mines(3, 3, [4])
+    with pytest.raises(SaveFormatError):
+        loads(corrupt(dumps(board)))
+
+@pytest.mark.parametrize('corrupt', CORRUPTIONS)
+def test_invalid_save_files(corrupt, tmp_path):
+    # Through mmap: the mapping must close even though the data is rejected
+    path = tmp_path / 'save.hmsv'
+    path.write_bytes(corrupt(dumps(GameBoard.from_mines(3, 3, [4]))))
+    with pytest.raises(SaveFormatError):
+        load_game(str(path))
@@ -0,0 +1,74 @@
+import random
+import pytest
+from ..model.game_model import GameBoard
+from ..model.replay import (Replay, ReplayFormatError, ReplayRecorder, dumps, load_replays, loads, play_click,
+                            replay_game, save_replays)
+from ..simulation import RandomStrategy, SolverStrategy
+from ..simulation.replay import record_game, verify
+import settings as st
+
+def test_seeded_boards_are_reproducible():
+    first = GameBoard('Hard', seed=1234)
+    random.seed(99)
+    second = GameBoard('Hard', seed=1234)
+    assert first.board.mines == second.board.mines
+    assert GameBoard('Hard', seed=1235).board.mines != first.board.mines
+    # Without a seed, one is drawn and kept
+    board = GameBoard('Hard')
+    assert GameBoard('Hard', seed=board.seed).board.mines == board.board.mines
+
+def test_sprites_do_not_use_the_game_rng():
+    random.seed(5)
+    expected = random.getrandbits(32)
+    random.seed(5)
+    st.get_random_image('floors')
+    assert random.getrandbits(32) == expected
+
+def test_recorded_game_replays_to_same_outcome():
+    board = GameBoard(rows=9, cols=9, num_mines=10, seed=7)
+    recorder = ReplayRecorder(board)
+    rng = random.Random(0)
+    while not board.is_game_over and not board.is_game_won:
+        action = rng.choice(['left', 'left', 'right', 'undo', 'redo'])
+        row, col = (rng.randrange(9), rng.randrange(9)) if action in ('left', 'right') else (0, 0)
+        recorder.record(action, row, col)
+        play_click(board, action, row, col)
+    replay = recorder.finish(board)
+    assert replay.outcome in ('won', 'lost')
+    result = replay_game(loads(dumps([replay]))[0])
+    assert result.matches and result.outcome == replay.outcome
+
+def test_replay_file_roundtrip(tmp_path):
+    replays = [record_game({'difficulty': 'Medium'}, RandomStrategy(), seed) for seed in range(5)]
+    replays.append(Replay(3, 4, 5, 2, 'Custom', [(12, 'left', 3, 4), (40, 'right', 0, 1)], 'unfinished'))
+    path = str(tmp_path / 'games.hmrp')
+    save_replays(replays[:3], path)
+    save_replays(replays[3:], path, append=True)
+    assert load_replays(path) == replays
+
+def test_replay_file_keeps_the_last_games(tmp_path):
+    replays = [Replay(seed, 4, 5, 2, 'Custom', [(12, 'left', 3, 4)], 'unfinished') for seed in range(7)]
+    path = str(tmp_path / 'games.hmrp')
+    for replay in replays:
+        save_replays([replay], path, append=True, keep=3)
+    assert load_replays(path) == replays[-3:]
+    # An unreadable file is replaced instead of growing behind the bad bytes
+    with open(path, 'ab') as file:
+        file.write(b'junk')
+    save_replays(replays[:1], path, append=True, keep=3)
+    assert load_replays(path) == replays[:1]
+
+@pytest.mark.parametrize('corrupt', [lambda data: data[:-1], lambda data: b'HMRX' + data[4:]])
+def test_invalid_replay_file(corrupt):
+    data = dumps([record_game({'difficulty': 'Easy'}, RandomStrategy(), 1)])
+    with pytest.raises(ReplayFormatError):
+        loads(corrupt(data))
+
+def test_verify_batch():
+    replays = [record_game({'difficulty': 'Easy'}, SolverStrategy(), seed) for seed in range(40)]
+    report = verify(replays, workers=0, chunk_size=16)
+    assert report.ok and report.games == 40
+    assert report.clicks == sum(len(replay.clicks) for replay in replays)
+    # A replay whose recorded outcome is wrong is reported
+    replays[3].outcome = 'unfinished'
+    assert verify(replays, workers=2, chunk_size=16).mismatches == [3]
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import pytest
+from ..model.game_model import GameBoard
+from ..server import GameServer, SessionManager
+from ..server.loadtest import run_load
+from ..server.protocol import FLAGGED, HIDDEN, cell_code, encode
+
+def create(manager, client, **fields):
+    (target, reply), = manager.handle({'id': 1, 'op': 'create', **fields}, client)
+    assert target == client and reply['ok'], reply
+    return reply
+
+def test_move_replies_with_changed_cells_only():
+    manager = SessionManager()
+    session_id = create(manager, 'a', rows=9, cols=9, num_mines=10, seed=3)['session']
+    board = manager.get(session_id).board
+    expected = GameBoard(rows=9, cols=9, num_mines=10, seed=3)
+    (_, reply), = manager.handle({'id': 2, 'op': 'move', 'session': session_id, 'action': 'right', 'row': 0, 'col': 0}, 'a')
+    assert reply == {'id': 2, 'ok': True, 'cells': [[0, FLAGGED]], 'state': 'playing', 'mines_left': 9}
+    safe = next(i for i in range(81) if not expected.board.mines[i] and expected.board.adjacent[i] == 0 and i)
+    (_, reply), = manager.handle({'id': 3, 'op': 'move', 'session': session_id, 'action': 'left',
+                                  'row': safe // 9, 'col': safe % 9}, 'a')
+    cells = dict(reply['cells'])
+    assert cells == {i: board.board.adjacent[i] for i in range(81) if board.board.revealed[i]}
+    assert all(cell_code(board, i) == HIDDEN for i in range(1, 81) if i not in cells)
+
+def test_coop_members_receive_moves_as_events():
+    manager = SessionManager()
+    session_id = create(manager, 'a', difficulty='Hard', seed=5)['session']
+    (_, joined), = manager.handle({'id': 1, 'op': 'join', 'session': session_id}, 'b')
+    assert joined['ok'] and joined['cells'] == [] and joined['state'] == 'playing'
+    messages = manager.handle({'id': 2, 'op': 'move', 'session': session_id, 'action': 'right', 'row': 1, 'col': 1}, 'b')
+    assert [client for client, _ in messages] == ['b', 'a']
+    event = messages[1][1]
+    assert event['event'] == 'update' and event['session'] == session_id and event['cells'] == [[21, FLAGGED]]
+    # A late joiner gets the whole visible board
+    (_, late), = manager.handle({'id': 3, 'op': 'join', 'session': session_id}, 'c')
+    assert late['cells'] == [[21, FLAGGED]]
+    messages = manager.handle({'id': 4, 'op': 'restart', 'session': session_id}, 'c')
+    assert sorted(client for client, _ in messages) == ['a', 'b', 'c']
+    assert manager.get(session_id).board.board.flagged.count(1) == 0
+
+def test_the_seed_is_never_sent():
+    manager = SessionManager()
+    created = create(manager, 'a', rows=9, cols=9, num_mines=10)
+    session_id = created['session']
+    messages = [('a', created)]
+    messages += manager.handle({'id': 2, 'op': 'join', 'session': session_id}, 'b')
+    messages += manager.handle({'id': 3, 'op': 'move', 'session': session_id, 'action': 'left', 'row': 4, 'col': 4}, 'a')
+    messages += manager.handle({'id': 4, 'op': 'restart', 'session': session_id}, 'b')
+    assert len(messages) == 6
+    for _, message in messages:
+        assert 'seed' not in message
+
+def test_sessions_close_with_their_last_member():
+    manager = SessionManager()
+    session_id = create(manager, 'a')['session']
+    manager.handle({'id': 1, 'op': 'join', 'session': session_id}, 'b')
+    manager.drop_client('a')
+    assert len(manager) == 1
+    manager.handle({'id': 2, 'op': 'leave', 'session': session_id}, 'b')
+    assert len(manager) == 0
+
+@pytest.mark.parametrize('request_, error', [
+    ({'op': 'dance'}, 'Unknown op'),
+    ({'op': ['create']}, 'Unknown op'),
+    ({'op': {'name': 'create'}}, 'Unknown op'),
+    ({'op': 'create', 'session': ['game']}, 'must be a string'),
+    ({'op': 'create', 'rows': -1}, 'rows'),
+    ({'op': 'create', 'rows': 5000, 'cols': 5000}, 'limited'),
+    ({'op': 'join', 'session': 'nope'}, 'Unknown session'),
+    ({'op': 'move', 'session': 'game', 'action': 'kick'}, 'Unknown action'),
+    ({'op': 'move', 'session': 'game', 'action': 'left', 'row': 99, 'col': 0}, 'out of the board'),
+])
+def test_invalid_requests_get_an_error_reply(request_, error):
+    manager = SessionManager()
+    create(manager, 'a', session='game')
+    (_, reply), = manager.handle({'id': 7, **request_}, 'a')
+    assert reply['id'] == 7 and not reply['ok'] and error in reply['error']
+
+def test_moves_need_a_member_and_a_running_game():
+    manager = SessionManager()
+    board = create(manager, 'a', rows=3, cols=3, num_mines=8, seed=1)
+    (_, reply), = manager.handle({'id': 1, 'op': 'move', 'session': board['session'], 'action': 'left'}, 'b')
+    assert 'Join' in reply['error']
+    mine = manager.get(board['session']).board.board.mines.index(1)
+    (_, reply), = manager.handle({'id': 2, 'op': 'move', 'session': board['session'], 'action': 'left',
+                                  'row': mine // 3, 'col': mine % 3}, 'a')
+    assert reply['state'] == 'lost'
+    (_, reply), = manager.handle({'id': 3, 'op': 'move', 'session': board['session'], 'action': 'right'}, 'a')
+    assert reply['error'] == 'The game is over'
+    (_, reply), = manager.handle({'id': 4, 'op': 'move', 'session': board['session'], 'action': 'undo'}, 'a')
+    assert reply['state'] == 'playing' and reply['cells'] == [[mine, HIDDEN]]
+
+def test_server_round_trip_over_a_socket():
+    async def scenario():
+        server = GameServer()
+        port = await server.start()
+        (reader_a, writer_a), (reader_b, writer_b) = [await asyncio.open_connection('127.0.0.1', port) for _ in range(2)]
+
+        async def ask(reader, writer, message):
+            writer.write(encode(message))
+            return json.loads(await reader.readline())
+
+        created = await ask(reader_a, writer_a, {'id': 1, 'op': 'create', 'difficulty': 'Medium', 'seed': 2})
+        await ask(reader_b, writer_b, {'id': 1, 'op': 'join', 'session': created['session']})
+        moved = await ask(reader_a, writer_a, {'id': 2, 'op': 'move', 'session': created['session'],
+                                               'action': 'right', 'row': 0, 'col': 1})
+        event = json.loads(await reader_b.readline())
+        writer_a.write(b'not json\n')
+        invalid = json.loads(await reader_a.readline())
+        # A malformed request does not end the connection
+        unknown = await ask(reader_a, writer_a, {'id': 3, 'op': ['x']})
+        again = await ask(reader_a, writer_a, {'id': 4, 'op': 'create'})
+        for writer in (writer_a, writer_b):
+            writer.close()
+        await server.close()
+        return moved, event, invalid, unknown, again, len(server.manager)
+
+    moved, event, invalid, unknown, again, sessions = asyncio.run(scenario())
+    assert moved['ok'] and moved['cells'] == [[1, FLAGGED]]
+    assert event['event'] == 'update' and event['cells'] == moved['cells']
+    assert not invalid['ok'] and invalid['id'] is None
+    assert not unknown['ok'] and 'Unknown op' in unknown['error']
+    assert again['ok'] and again['id'] == 4
+    assert sessions == 0
+
+def test_load_test_runs_against_an_in_process_server():
+    report = asyncio.run(run_load(connections=4, sessions=5, coop=2, duration=0.3))
+    assert report.sessions == 10
+    assert report.moves > 0 and report.events > 0
+    assert len(report.latencies) >= report.moves
+    assert 0 < report.percentile(0.5) <= report.percentile(0.99)
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import socket
+import zlib
+import pytest
+from ..server import SessionManager, ShardedGameServer
+from ..server.loadtest import run_load
+from ..server.protocol import HIDDEN, encode
+from ..server.sharding import WORKER_OPS, Shard
+
+async def ask(reader, writer, message):
+    writer.write(encode(message))
+    return json.loads(await reader.readline())
+
+def test_sessions_are_spread_over_the_workers_and_migrate():
+    async def scenario():
+        server = ShardedGameServer(2)
+        port = await server.start()
+        (reader_a, writer_a), (reader_b, writer_b) = [await asyncio.open_connection('127.0.0.1', port) for _ in range(2)]
+        created = [await ask(reader_a, writer_a, {'id': i, 'op': 'create', 'rows': 30, 'cols': 30, 'num_mines': 20,
+                                                  'seed': i}) for i in range(20)]
+        counts = await server.pool.counts()
+        session = created[0]['session']
+        await ask(reader_b, writer_b, {'id': 1, 'op': 'join', 'session': session})
+        first = await ask(reader_a, writer_a, {'id': 2, 'op': 'move', 'session': session, 'action': 'right',
+                                               'row': 0, 'col': 0})
+        event = json.loads(await reader_b.readline())
+
+        source = server.pool.shard_of(session)
+        await server.pool.migrate(session, 1 - source)
+        moved_counts = await server.pool.counts()
+        joined = await ask(reader_a, writer_a, {'id': 3, 'op': 'join', 'session': session})
+        # The flag survived the move and co-op events still flow
+        second = await ask(reader_b, writer_b, {'id': 4, 'op': 'move', 'session': session, 'action': 'right',
+                                                'row': 0, 'col': 0})
+        event_after = json.loads(await reader_a.readline())
+        unknown = await ask(reader_a, writer_a, {'id': 5, 'op': 'join', 'session': ['not', 'an', 'id']})
+        for writer in (writer_a, writer_b):
+            writer.close()
+        await server.close()
+        return counts, moved_counts, source, first, event, joined, second, event_after, unknown
+
+    counts, moved_counts, source, first, event, joined, second, event_after, unknown = asyncio.run(scenario())
+    assert sum(counts) == 20 and min(counts) > 0
+    assert moved_counts[source] == counts[source] - 1 and moved_counts[1 - source] == counts[1 - source] + 1
+    assert event['cells'] == first['cells']
+    assert joined['ok'] and joined['cells'] == first['cells']
+    assert second['cells'] == [[0, HIDDEN]] and event_after['cells'] == second['cells']
+    assert not unknown['ok'] and 'Unknown session' in unknown['error']
+
+def test_closed_migrated_sessions_are_routed_home_again():
+    async def scenario():
+        server = ShardedGameServer(2)
+        port = await server.start()
+        pool = server.pool
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        spec = {'op': 'create', 'rows': 9, 'cols': 9, 'num_mines': 10}
+        try:
+            for name in ('left', 'dropped'):
+                await ask(reader, writer, {'id': 1, 'session': name, **spec})
+                await pool.migrate(name, 1 - home_of(name))
+            moved = dict(pool.owners)
+            # Nothing is left of the client on the shards the sessions moved from
+            moved_shards = [set(shards) for shards in pool._client_shards.values()]
+            left = await ask(reader, writer, {'id': 2, 'op': 'leave', 'session': 'left'})
+            after_leave = dict(pool.owners)
+            writer.close()
+            await writer.wait_closed()
+            # The front learns of the disconnection on its own time
+            for _ in range(100):
+                if not pool.owners:
+                    break
+                await asyncio.sleep(0.01)
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            again = await ask(reader, writer, {'id': 3, 'session': 'left', **spec})
+            counts = await pool.counts()
+            return (moved, moved_shards, left, after_leave, again, counts,
+                    [set(shards) for shards in pool._client_shards.values()])
+        finally:
+            writer.close()
+            await server.close()
+
+    moved, moved_shards, left, after_leave, again, counts, client_shards = asyncio.run(scenario())
+    assert moved == {'left': 1 - home_of('left'), 'dropped': 1 - home_of('dropped')}
+    assert moved_shards == [set(moved.values())]
+    assert left['ok'] and after_leave == {'dropped': 1 - home_of('dropped')}
+    # The new session with the same id lives on its own shard
+    assert again['ok'] and counts[home_of('left')] == 1 and sum(counts) == 1
+    assert client_shards == [{home_of('left')}]
+
+def home_of(session_id):
+    return zlib.crc32(session_id.encode()) % 2
+
+def test_export_reports_the_members_left_without_a_session():
+    manager = SessionManager()
+    spec = {'op': 'create', 'rows': 9, 'cols': 9, 'num_mines': 10}
+    for session_id in ('a', 'b'):
+        manager.handle({'id': 1, 'session': session_id, **spec}, 'first')
+    manager.handle({'id': 2, 'op': 'join', 'session': 'a'}, 'second')
+    _, gone = WORKER_OPS['export'](manager, 'a')
+    assert gone == ['second']
+    lines, closed = WORKER_OPS['handle'](manager, ({'id': 3, 'op': 'leave', 'session': 'b'}, 'first'))
+    assert closed == ['b'] and lines
+
+def test_load_test_runs_against_a_sharded_server():
+    async def scenario():
+        server = ShardedGameServer(2)
+        port = await server.start()
+        try:
+            return await run_load(port=port, connections=4, sessions=5, coop=2, duration=0.3)
+        finally:
+            await server.close()
+
+    report = asyncio.run(scenario())
+    assert report.moves > 0 and report.events > 0
+
+def test_migrated_sessions_keep_their_seed():
+    source, target = SessionManager(), SessionManager()
+    (_, created), = source.handle({'id': 1, 'op': 'create', 'rows': 9, 'cols': 9, 'num_mines': 10, 'seed': 7}, 'a')
+    board = source.get(created['session']).board
+    WORKER_OPS['import'](target, WORKER_OPS['export'](source, created['session'])[0])
+    moved = target.get(created['session']).board
+    assert moved.seed == 7 and moved.rng.getstate() == board.rng.getstate()
+    assert moved.board.mines == board.board.mines and len(source) == 0
+
+def test_calls_fail_when_the_worker_connection_is_reset():
+    class ResetReader:
+        async def readexactly(self, size):
+            await asyncio.sleep(0)
+            raise ConnectionResetError("reset by peer")
+
+    async def scenario():
+        front, back = socket.socketpair()
+        _, writer = await asyncio.open_connection(sock=front)
+        shard = Shard(None, ResetReader(), writer)
+        try:
+            with pytest.raises(ConnectionError):
+                await asyncio.wait_for(shard.call('count', None), 1)
+            # The worker is known to be gone: no wait at all
+            with pytest.raises(ConnectionError):
+                await asyncio.wait_for(shard.call('count', None), 1)
+        finally:
+            writer.close()
+            back.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,43 @@
+import pytest
+from ..simulation import RandomStrategy, SimulationStats, play_game, simulate
+from ..simulation.strategies import Strategy
+
+@pytest.fixture
+def spec():
+    return {'rows': 6, 'cols': 6, 'num_mines': 3}
+
+def test_play_game_is_deterministic(spec):
+    first = play_game(spec, RandomStrategy(), seed=42)
+    second = play_game(spec, RandomStrategy(), seed=42)
+    assert (first.won, first.clicks) == (second.won, second.clicks)
+    assert first.clicks >= 1
+
+def test_max_clicks(spec):
+    result = play_game({'rows': 30, 'cols': 30, 'num_mines': 1}, RandomStrategy(), seed=1, max_clicks=1)
+    assert result.clicks <= 1
+
+def test_simulate_streams_cumulative_stats(spec):
+    snapshots = list(simulate(spec, RandomStrategy(), games=50, workers=0, chunk_size=20))
+    assert [stats.games for stats in snapshots] == [20, 40, 50]
+    assert 0 <= snapshots[-1].win_rate <= 1
+
+def test_simulate_process_pool_matches_in_process(spec):
+    local = list(simulate(spec, RandomStrategy(), games=40, workers=0, chunk_size=10))[-1]
+    pooled = list(simulate(spec, RandomStrategy(), games=40, workers=2, chunk_size=10))[-1]
+    assert (pooled.games, pooled.wins, pooled.clicks) == (local.games, local.wins, local.clicks)
+
+def test_stats_merge():
+    stats = SimulationStats()
+    assert stats.win_rate == 0.0
+    other = SimulationStats()
+    other.games, other.wins, other.clicks = 4, 1, 10
+    stats.merge(other)
+    assert stats.win_rate == 0.25
+    assert stats.clicks_per_game == 2.5
+
+def test_strategies_must_choose_moves():
+    class Idle(Strategy):
+        name = 'idle'
+
+    with pytest.raises(TypeError):
+        Idle()
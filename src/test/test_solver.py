@@ -0,0 +1,72 @@
+import random
+import pytest
+from ..model.game_model import GameBoard
+from ..model.solver import Solver
+
+def make_board(rows, cols, mines, revealed=()):
+    # Board with the given mines, and the given cells already revealed
+    board = GameBoard(rows=rows, cols=cols, num_mines=0)
+    for row, col in mines:
+        board.board.mines[row * cols + col] = 1
+    board.num_mines = board.count_mines = len(mines)
+    board._set_adjacent_mines()
+    for row, col in revealed:
+        board.board.revealed[row * cols + col] = 1
+    board.safe_remaining = board._count_unrevealed_safe()
+    return board
+
+def test_subset_rule():
+    # Hidden: a b c / Revealed: 1 2 1
+    board = make_board(2, 3, [(0, 0), (0, 2)], revealed=[(1, 0), (1, 1), (1, 2)])
+    solver = Solver(board)
+    hint = solver.next_hint()
+    assert (hint.row, hint.col, hint.action, hint.probability) == (0, 1, 'reveal', 0.0)
+    assert solver.mines == {0, 2}
+
+def test_single_cell_rule_flags_mine():
+    board = make_board(2, 2, [(0, 0)], revealed=[(0, 1), (1, 0), (1, 1)])
+    hint = Solver(board).next_hint()
+    assert (hint.row, hint.col, hint.action) == (0, 0, 'flag')
+
+def test_solver_updates_incrementally():
+    board = make_board(2, 3, [(0, 0), (0, 2)], revealed=[(1, 0), (1, 1), (1, 2)])
+    solver = Solver(board)
+    solver.next_hint()
+    # Moves played on the board are seen through the board listener
+    board._flag_cell(0, 0)
+    assert solver.mines == {2}
+    hint = solver.solve_step()
+    assert (hint.row, hint.col) == (0, 1)
+    assert 1 not in solver.safe
+    assert board.is_game_won
+    assert solver.next_hint() is None
+
+def test_undone_numbers_leave_the_frontier():
+    board = GameBoard(rows=9, cols=9, num_mines=10, seed=0)
+    solver = Solver(board)
+    index = 4 * 9 + 4
+    board._reveal_cell(4, 4)
+    solver.next_hint()
+    assert board.board.adjacent[index] and index in solver._frontier
+    board.undo()
+    assert index not in solver._frontier and index not in solver._dirty
+    # Nothing is known: the hint is a guess, not built on the hidden number
+    hint = solver.next_hint()
+    assert not hint.is_certain and index not in solver._frontier
+
+@pytest.mark.parametrize('seed', range(30))
+def test_certain_hints_are_correct(seed):
+    random.seed(seed)
+    board = GameBoard('Medium')
+    solver = Solver(board, seed=seed)
+    while True:
+        hint = solver.next_hint()
+        if hint is None:
+            break
+        is_mine = board.board[hint.row][hint.col].is_mine
+        if hint.probability == 0.0:
+            assert not is_mine
+        elif hint.probability == 1.0:
+            assert is_mine
+        solver.solve_step()
+    assert board.is_game_won or board.is_game_over
@@ -0,0 +1,57 @@
+import pytest
+from ..view.sound_engine import NullSoundBackend, SoundEngine, create_backend
+import settings as st
+
+@pytest.fixture
+def engine(monkeypatch):
+    # Fake sound files, read once
+    monkeypatch.setattr(SoundEngine, '_data', {})
+    monkeypatch.setattr('builtins.open', lambda path, mode='r': _FakeFile(path))
+    return SoundEngine(voices=2, backend=NullSoundBackend(2))
+
+class _FakeFile:
+    def __init__(self, path):
+        self.path = path
+    def __enter__(self):
+        return self
+    def __exit__(self, *args):
+        return False
+    def read(self):
+        return self.path.encode()
+
+def test_every_sound_preloaded(engine):
+    paths = [st.GAME_OVER_PATH, st.VICTORY_PATH, st.SIGIL_PATH] + st.FLOOR_SOUNDS + st.NUMBERS_SOUNDS
+    assert sorted(SoundEngine._data) == sorted(paths)
+    assert SoundEngine._data[st.SIGIL_PATH] == st.SIGIL_PATH.encode()
+
+def test_overlapping_sounds_use_different_voices(engine):
+    engine.play('sigil')
+    engine.play('victory')
+    assert engine.backend.played == [(0, st.SIGIL_PATH), (1, st.VICTORY_PATH)]
+    # Every voice busy: the oldest one is taken over
+    engine.play('game_over')
+    assert engine.backend.played[-1] == (0, st.GAME_OVER_PATH)
+
+def test_idle_voice_holding_the_sound_is_reused(engine):
+    engine.play('sigil')
+    engine.play('victory')
+    engine.backend.finish()
+    engine.play('victory')
+    assert engine.backend.played[-1] == (1, st.VICTORY_PATH)
+
+def test_floor_and_unknown_sounds(engine):
+    engine.play('floor')
+    assert engine.backend.played[-1][1] in st.FLOOR_SOUNDS
+    engine.backend.finish()
+    engine.play('unknown')
+    assert engine.backend.played[-1][1] == st.NUMBERS_SOUNDS[2]
+
+def test_missing_file_is_silent(monkeypatch):
+    monkeypatch.setattr(SoundEngine, '_data', {st.SIGIL_PATH: None})
+    engine = SoundEngine(voices=1, backend=NullSoundBackend(1))
+    engine.play('sigil')
+    assert engine.backend.played == []
+
+def test_null_backend_from_environment(monkeypatch):
+    monkeypatch.setenv('MINESWEEPER_AUDIO', 'null')
+    assert isinstance(create_backend(2), NullSoundBackend)
@@ -1 +1,3 @@
-from .game_view import CustomButton, GameView
\ No newline at end of file
+from .board_widget import BoardWidget, CellRef
+from .game_view import CustomButton, GameView
+from .sound_engine import NullSoundBackend, SoundEngine
\ No newline at end of file
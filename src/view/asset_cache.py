@@ -0,0 +1,83 @@
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QIcon, QPixmap
+import settings as st
+
+class AssetCache:
+    '''
+    Decode every sprite once and keep icons pre-scaled to the cell size.
+
+    The decoded pixmaps are shared by all the instances (a new game does not decode them again),
+    the scaled icons are per instance since they depend on the icon size of the view.
+    The large dialog images are not needed to show the board: they are decoded on demand
+    or by preload_dialogs() once the window is up.
+    '''
+    GROUPS = {
+        'floors': st.FLOOR_IMAGES,
+        'sigils': st.SIGIL_IMAGES,
+        'spirits': st.SPIRIT_IMAGES,
+    }
+    DIALOGS = st.GAME_STATUS
+
+    # Decoded images, by path
+    _pixmaps = {}
+
+    def __init__(self, icon_size : int) -> None:
+        self._icons = {}
+        self.set_icon_size(icon_size)
+
+    @staticmethod
+    def _decode(path : str) -> QPixmap:
+        '''
+        Read and decode an image file.
+        '''
+        return QPixmap(path)
+
+    def pixmap(self, path : str) -> QPixmap:
+        '''
+        Get a decoded image, reading the file only the first time.
+        '''
+        pixmap = self._pixmaps.get(path)
+        if pixmap is None:
+            pixmap = self._pixmaps[path] = self._decode(path)
+        return pixmap
+
+    def preload_dialogs(self) -> None:
+        '''
+        Decode the dialog images ahead of their first display.
+        '''
+        for path in self.DIALOGS:
+            self.pixmap(path)
+
+    def set_icon_size(self, icon_size : int) -> None:
+        '''
+        Scale every sprite to a new icon size, from the decoded images.
+        '''
+        self.icon_size = icon_size
+        self._icons = {}
+        self._scaled = {}
+        for group, paths in self.GROUPS.items():
+            for path in paths:
+                pixmap = self.pixmap(path)
+                if not pixmap.isNull():
+                    pixmap = pixmap.scaled(icon_size, icon_size, Qt.AspectRatioMode.KeepAspectRatio,
+                                           Qt.TransformationMode.SmoothTransformation)
+                self._scaled[path] = pixmap
+                self._icons[path] = QIcon(pixmap)
+
+    def scaled(self, path : str) -> QPixmap:
+        '''
+        Get a sprite scaled to the icon size, for direct painting.
+        '''
+        return self._scaled[path]
+
+    def icon(self, path : str) -> QIcon:
+        '''
+        Get the scaled icon of a sprite.
+        '''
+        return self._icons[path]
+
+    def random_icon(self, group : str) -> QIcon:
+        '''
+        Get the scaled icon of a random sprite of a group ('spirits', 'floors' or 'sigils').
+        '''
+        return self._icons[st.get_random_image(group)]
@@ -0,0 +1,738 @@
+from collections import OrderedDict
+from PyQt6.QtWidgets import QApplication, QScrollArea, QWidget
+from PyQt6.QtCore import Qt, QPoint, QRect, QSize, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QPainter, QPen, QPixmap
+import settings as st
+from .asset_cache import AssetCache
+
+class CellRef:
+    '''
+    Lightweight stand-in for a CustomButton: one cell of a BoardWidget.
+    It has the row/col/revealed/flagged/setText interface the controller uses on buttons,
+    but stores nothing besides its position.
+    '''
+    __slots__ = ('board', 'row', 'col')
+
+    def __init__(self, board : 'BoardWidget', row : int, col : int) -> None:
+        self.board = board
+        self.row = row
+        self.col = col
+
+    @property
+    def index(self) -> int:
+        return self.row * self.board.cols + self.col
+
+    @property
+    def revealed(self) -> bool:
+        return self.board.cells_state[self.index] & BoardWidget.KIND_MASK != BoardWidget.HIDDEN
+
+    @property
+    def flagged(self) -> bool:
+        return self.board.flags[self.index] != 0
+
+    def setText(self, text : str) -> None:
+        '''
+        Same effect as on a button: only the text (the number) of the cell changes.
+        '''
+        self.board.set_number(self.row, self.col, int(text) if text else 0)
+
+    def __eq__(self, other : object) -> bool:
+        return isinstance(other, CellRef) and (self.board, self.row, self.col) == (other.board, other.row, other.col)
+
+    def __hash__(self) -> int:
+        return hash((id(self.board), self.row, self.col))
+
+
+class CellGrid:
+    '''
+    2D access to the cells of a BoardWidget (grid[row][col]), creating CellRef objects on demand.
+    '''
+    __slots__ = ('board',)
+
+    def __init__(self, board : 'BoardWidget') -> None:
+        self.board = board
+
+    def __len__(self) -> int:
+        return self.board.rows
+
+    def __getitem__(self, row : int) -> list[CellRef]:
+        if not 0 <= row < self.board.rows:
+            raise IndexError('Index out of range')
+        return _CellRow(self.board, row)
+
+    def __iter__(self):
+        for row in range(self.board.rows):
+            yield _CellRow(self.board, row)
+
+
+class _CellRow:
+    __slots__ = ('board', 'row')
+
+    def __init__(self, board : 'BoardWidget', row : int) -> None:
+        self.board = board
+        self.row = row
+
+    def __len__(self) -> int:
+        return self.board.cols
+
+    def __getitem__(self, col : int) -> CellRef:
+        if not 0 <= col < self.board.cols:
+            raise IndexError('Index out of range')
+        return CellRef(self.board, self.row, col)
+
+    def __iter__(self):
+        for col in range(self.board.cols):
+            yield CellRef(self.board, self.row, col)
+
+
+class BoardWidget(QWidget):
+    '''
+    Whole board drawn by a single widget, instead of one QPushButton per cell.
+
+    The display state of each cell is packed in one byte (kind in the 2 low bits, sprite or
+    number above) plus one byte for the flag. The board is drawn by tiles of cells rendered into
+    cached pixmaps: paintEvent only blits the tiles inside the area to repaint, and a change only
+    invalidates the tile of its cell. Clicks are mapped to a cell and emitted like
+    CustomButton.click_signal.
+    '''
+    # Emit click type ('left' or 'right') and the CellRef of the clicked cell
+    click_signal = pyqtSignal(str, object)
+
+    # Kinds of cell
+    HIDDEN, FLOOR, NUMBER, SPIRIT = range(4)
+    KIND_MASK = 0b11
+    VALUE_SHIFT = 2
+
+    BACKGROUND = QColor('#1a1a1a')
+    BORDER = QColor('white')
+    TEXT = QColor('white')
+
+    # Approximate size of a tile, in pixels, and number of tiles kept in cache
+    TILE_PIXELS = 256
+    MAX_TILES = 256
+
+    def __init__(self, rows : int, cols : int, cell_size : int, assets : AssetCache, font : QFont,
+                 spacing : int = 2, parent : QWidget = None) -> None:
+        super().__init__(parent)
+        self.rows = rows
+        self.cols = cols
+        self.assets = assets
+        self.font = font
+        self.spacing = spacing
+        # Rendered tiles by (tile row, tile col), least recently used first
+        self._tiles = OrderedDict()
+        # Tiles invalidated and not repainted yet
+        self._pending = set()
+        self.reset()
+        self.set_cell_size(cell_size)
+
+    def reset(self) -> None:
+        '''
+        Hide every cell.
+        '''
+        size = self.rows * self.cols
+        self.cells_state = bytearray(size)
+        # Sigil shown on the cell (index in SIGIL_IMAGES + 1), 0 when not flagged
+        self.flags = bytearray(size)
+        self._tiles.clear()
+        self._pending.clear()
+        self.update()
+
+    def set_cell_size(self, cell_size : int) -> None:
+        '''
+        Change the size of the cells (zoom); the cached tiles are dropped.
+        '''
+        self.cell_size = cell_size
+        self.pitch = cell_size + self.spacing
+        self.tile_cells = max(1, self.TILE_PIXELS // self.pitch)
+        self._tiles.clear()
+        self._pending.clear()
+        if self.assets.icon_size != cell_size:
+            self.assets.set_icon_size(cell_size)
+        self.setFixedSize(self.sizeHint())
+        self.update()
+
+    def set_font(self, font : QFont) -> None:
+        '''
+        Change the font of the numbers; the cached tiles are dropped.
+        '''
+        self.font = font
+        self._tiles.clear()
+        self._pending.clear()
+        self.update()
+
+    def sizeHint(self) -> QSize:
+        return QSize(self.cols * self.pitch - self.spacing, self.rows * self.pitch - self.spacing)
+
+    def cells(self) -> CellGrid:
+        return CellGrid(self)
+
+    def cell_rect(self, row : int, col : int) -> QRect:
+        return QRect(col * self.pitch, row * self.pitch, self.cell_size, self.cell_size)
+
+    def cell_at(self, x : int, y : int) -> tuple[int, int] | None:
+        '''
+        Hit-test a position in widget coordinates.
+
+        :return: The (row, col) of the cell under the position, None in the gaps and outside the board.
+        '''
+        if x < 0 or y < 0:
+            return None
+        col, x_offset = divmod(int(x), self.pitch)
+        row, y_offset = divmod(int(y), self.pitch)
+        if row >= self.rows or col >= self.cols or x_offset >= self.cell_size or y_offset >= self.cell_size:
+            return None
+        return row, col
+
+    def mousePressEvent(self, event) -> None:
+        '''
+        Map the click to its cell and emit it with the click type.
+        '''
+        position = event.position()
+        cell = self.cell_at(position.x(), position.y())
+        if cell is None:
+            return
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.click_signal.emit("left", CellRef(self, *cell))
+        elif event.button() == Qt.MouseButton.RightButton:
+            self.click_signal.emit("right", CellRef(self, *cell))
+        elif event.button() == Qt.MouseButton.MiddleButton:
+            self.click_signal.emit("chord", CellRef(self, *cell))
+
+    def mouseDoubleClickEvent(self, event) -> None:
+        '''
+        A left double click chords, the other buttons behave as single clicks.
+        '''
+        if event.button() != Qt.MouseButton.LeftButton:
+            self.mousePressEvent(event)
+            return
+        position = event.position()
+        cell = self.cell_at(position.x(), position.y())
+        if cell is not None:
+            self.click_signal.emit("chord", CellRef(self, *cell))
+
+    def _sprite(self, group : str) -> int:
+        path = st.get_random_image(group)
+        return AssetCache.GROUPS[group].index(path) + 1
+
+    def number(self, row : int, col : int) -> int:
+        '''
+        Number shown on a cell, 0 if none.
+        '''
+        state = self.cells_state[row * self.cols + col]
+        return state >> self.VALUE_SHIFT if state & self.KIND_MASK == self.NUMBER else 0
+
+    def reveal_cell(self, type : str, cell : CellRef, adjacent_mines : int = None) -> None:
+        '''
+        Same behavior as GameView.reveal_cell on a button.
+        '''
+        index = cell.index
+        if self.cells_state[index] & self.KIND_MASK != self.HIDDEN or self.flags[index]:
+            return
+        if type == 'mine':
+            state = self.SPIRIT | self._sprite('spirits') << self.VALUE_SHIFT
+        elif type == 'safe':
+            state = self.FLOOR | self._sprite('floors') << self.VALUE_SHIFT
+        else:
+            state = self.NUMBER | adjacent_mines << self.VALUE_SHIFT
+        self.cells_state[index] = state
+        self.invalidate_cell(cell.row, cell.col)
+
+    def flag_cell(self, flag : bool, cell : CellRef) -> bool:
+        '''
+        Same behavior as GameView.flag_cell on a button.
+
+        :return: True if a flag was put on the cell.
+        '''
+        index = cell.index
+        if not self.flags[index] and flag:
+            self.flags[index] = self._sprite('sigils')
+        elif self.flags[index] and not flag:
+            self.flags[index] = 0
+        else:
+            return False
+        self.invalidate_cell(cell.row, cell.col)
+        return flag
+
+    def set_number(self, row : int, col : int, number : int) -> None:
+        index = row * self.cols + col
+        state = self.cells_state[index]
+        if state & self.KIND_MASK == self.NUMBER and state >> self.VALUE_SHIFT != number:
+            self.cells_state[index] = self.NUMBER | number << self.VALUE_SHIFT
+            self.invalidate_cell(row, col)
+
+    def hide_cell(self, row : int, col : int) -> None:
+        '''
+        Turn a cell back to hidden.
+        '''
+        index = row * self.cols + col
+        if self.cells_state[index]:
+            self.cells_state[index] = self.HIDDEN
+            self.invalidate_cell(row, col)
+
+    def tile_rect(self, tile_row : int, tile_col : int) -> QRect:
+        span = self.tile_cells * self.pitch
+        return QRect(tile_col * span, tile_row * span, span, span)
+
+    def invalidate_cell(self, row : int, col : int) -> None:
+        '''
+        Drop the cached tile of a cell and schedule its repaint.
+        Several changes in the same tile only cost one repaint.
+        '''
+        key = (row // self.tile_cells, col // self.tile_cells)
+        self._tiles.pop(key, None)
+        if key not in self._pending:
+            self._pending.add(key)
+            self.update(self.tile_rect(*key))
+
+    def visible_range(self, rect : QRect) -> tuple[range, range]:
+        '''
+        Rows and columns of the cells intersecting a rectangle.
+        '''
+        first_row = max(rect.top() // self.pitch, 0)
+        last_row = min(rect.bottom() // self.pitch, self.rows - 1)
+        first_col = max(rect.left() // self.pitch, 0)
+        last_col = min(rect.right() // self.pitch, self.cols - 1)
+        return range(first_row, last_row + 1), range(first_col, last_col + 1)
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        rect = event.rect()
+        span = self.tile_cells * self.pitch
+        for tile_row in range(max(rect.top(), 0) // span, rect.bottom() // span + 1):
+            for tile_col in range(max(rect.left(), 0) // span, rect.right() // span + 1):
+                painter.drawPixmap(tile_col * span, tile_row * span, self._tile(tile_row, tile_col))
+        painter.end()
+
+    def _tile(self, tile_row : int, tile_col : int) -> QPixmap:
+        '''
+        Get the rendered pixmap of a tile, from the cache when possible.
+        '''
+        key = (tile_row, tile_col)
+        pixmap = self._tiles.get(key)
+        if pixmap is not None:
+            self._tiles.move_to_end(key)
+            return pixmap
+        span = self.tile_cells * self.pitch
+        pixmap = QPixmap(span, span)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        painter.translate(-tile_col * span, -tile_row * span)
+        first_row, first_col = tile_row * self.tile_cells, tile_col * self.tile_cells
+        self.paint_cells(painter, range(first_row, min(first_row + self.tile_cells, self.rows)),
+                         range(first_col, min(first_col + self.tile_cells, self.cols)))
+        painter.end()
+        self._tiles[key] = pixmap
+        self._pending.discard(key)
+        if len(self._tiles) > self.MAX_TILES:
+            self._tiles.popitem(last=False)
+        return pixmap
+
+    def paint_cells(self, painter : QPainter, rows : range, cols : range) -> None:
+        '''
+        Draw a block of cells.
+        '''
+        size = self.cell_size
+        radius = min(4, size // 4)
+        groups = {self.FLOOR: st.FLOOR_IMAGES, self.SPIRIT: st.SPIRIT_IMAGES}
+        border = QPen(self.BORDER, 1) if size >= 8 else QPen(Qt.PenStyle.NoPen)
+        painter.setPen(border)
+        painter.setBrush(self.BACKGROUND)
+        painter.setFont(self.font)
+        for row in rows:
+            base = row * self.cols
+            for col in cols:
+                index = base + col
+                rect = self.cell_rect(row, col)
+                painter.drawRoundedRect(rect, radius, radius)
+                state = self.cells_state[index]
+                kind, value = state & self.KIND_MASK, state >> self.VALUE_SHIFT
+                if self.flags[index]:
+                    painter.drawPixmap(rect, self.assets.scaled(st.SIGIL_IMAGES[self.flags[index] - 1]))
+                elif kind in groups:
+                    painter.drawPixmap(rect, self.assets.scaled(groups[kind][value - 1]))
+                elif kind == self.NUMBER and value:
+                    painter.setPen(self.TEXT)
+                    painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, str(value))
+                    painter.setPen(border)
+
+
+class BoardView(QScrollArea):
+    '''
+    Scrollable and zoomable frame around a BoardWidget.
+    Only the visible part of the board is painted; Ctrl + mouse wheel zooms around the cursor.
+    '''
+    MIN_CELL_SIZE = 3
+    MAX_CELL_SIZE = 64
+
+    def __init__(self, board_widget : BoardWidget, parent : QWidget = None) -> None:
+        super().__init__(parent)
+        self.board_widget = board_widget
+        self.setWidget(board_widget)
+        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.setStyleSheet("QScrollArea { background: transparent; border: none; }")
+
+    def zoom(self, steps : int, anchor : QPoint = None) -> None:
+        '''
+        Change the cell size, keeping the cell under the anchor (viewport coordinates) in place.
+
+        :param steps: Positive to zoom in, negative to zoom out.
+        :param anchor: The fixed point, the center of the viewport by default.
+        '''
+        board = self.board_widget
+        cell_size = min(max(board.cell_size + steps * max(1, board.cell_size // 8), self.MIN_CELL_SIZE),
+                        self.MAX_CELL_SIZE)
+        if cell_size == board.cell_size:
+            return
+        if anchor is None:
+            anchor = self.viewport().rect().center()
+        # Position of the anchor on the board, as a fraction of the board size
+        h_bar, v_bar = self.horizontalScrollBar(), self.verticalScrollBar()
+        x_ratio = (h_bar.value() + anchor.x()) / max(board.width(), 1)
+        y_ratio = (v_bar.value() + anchor.y()) / max(board.height(), 1)
+        board.spacing = 2 if cell_size >= 8 else 1
+        board.set_cell_size(cell_size)
+        h_bar.setValue(round(x_ratio * board.width() - anchor.x()))
+        v_bar.setValue(round(y_ratio * board.height() - anchor.y()))
+
+    def wheelEvent(self, event) -> None:
+        if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            steps = 1 if event.angleDelta().y() > 0 else -1
+            self.zoom(steps, event.position().toPoint())
+            event.accept()
+            return
+        super().wheelEvent(event)
+
+
+class EndlessCellRef(CellRef):
+    '''
+    CellRef of an EndlessBoardWidget: rows and columns are any integers.
+    '''
+    __slots__ = ()
+
+    @property
+    def revealed(self) -> bool:
+        return self.board.state(self.row, self.col) & BoardWidget.KIND_MASK != BoardWidget.HIDDEN
+
+    @property
+    def flagged(self) -> bool:
+        return self.board.flag(self.row, self.col) != 0
+
+
+class EndlessCellGrid:
+    '''
+    grid[row][col] access to the cells of an EndlessBoardWidget, for any row and column.
+    '''
+    __slots__ = ('board',)
+
+    def __init__(self, board : 'EndlessBoardWidget') -> None:
+        self.board = board
+
+    def __getitem__(self, row : int) -> '_EndlessCellRow':
+        return _EndlessCellRow(self.board, row)
+
+
+class _EndlessCellRow:
+    __slots__ = ('board', 'row')
+
+    def __init__(self, board : 'EndlessBoardWidget', row : int) -> None:
+        self.board = board
+        self.row = row
+
+    def __getitem__(self, col : int) -> EndlessCellRef:
+        return EndlessCellRef(self.board, self.row, col)
+
+
+class EndlessBoardWidget(QWidget):
+    '''
+    Viewport over an unbounded board, for the endless mode.
+
+    The display state of the cells is packed like in BoardWidget (one state byte and one flag
+    byte per cell), in square chunks created when one of their cells is shown: the cells never
+    revealed nor flagged take no memory. Only the cells inside the widget are painted, so a
+    frame costs the size of the window and not the size of the explored board.
+
+    Dragging with the left button or the mouse wheel (Shift for horizontal) pans, Ctrl + wheel
+    zooms around the cursor, the arrow keys move by one cell and Home goes back to the start.
+    A left click is emitted on release when the mouse did not drag.
+    '''
+    click_signal = pyqtSignal(str, object)
+
+    CHUNK = 32
+    MIN_CELL_SIZE = 8
+    MAX_CELL_SIZE = 64
+
+    def __init__(self, cell_size : int, assets : AssetCache, font : QFont, spacing : int = 2,
+                 parent : QWidget = None) -> None:
+        super().__init__(parent)
+        self.assets = assets
+        self.font = font
+        self.spacing = spacing
+        # Position of the press that may become a click or a drag, None while dragging
+        self._press = None
+        self._drag_from = None
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        self.reset()
+        self.set_cell_size(cell_size)
+
+    def reset(self) -> None:
+        '''
+        Hide every cell and go back to the start cell.
+        '''
+        # (state plane, flag plane) by chunk coordinates
+        self._chunks = {}
+        # Board pixel shown at the center of the widget, the middle of the cell (0, 0) at first
+        self.center_x = self.center_y = None
+        self.update()
+
+    def set_cell_size(self, cell_size : int) -> None:
+        '''
+        Change the size of the cells (zoom), keeping the cell at the center of the widget.
+        '''
+        if self.center_x is not None:
+            scale = (cell_size + self.spacing) / self.pitch
+            self.center_x, self.center_y = self.center_x * scale, self.center_y * scale
+        self.cell_size = cell_size
+        self.pitch = cell_size + self.spacing
+        if self.assets.icon_size != cell_size:
+            self.assets.set_icon_size(cell_size)
+        self.update()
+
+    def set_font(self, font : QFont) -> None:
+        self.font = font
+        self.update()
+
+    def sizeHint(self) -> QSize:
+        return QSize(600, 600)
+
+    def cells(self) -> EndlessCellGrid:
+        return EndlessCellGrid(self)
+
+    def origin(self) -> tuple[int, int]:
+        '''
+        Board pixel at the top left corner of the widget.
+        '''
+        if self.center_x is None:
+            self.center_x = self.center_y = self.cell_size / 2
+        return round(self.center_x - self.width() / 2), round(self.center_y - self.height() / 2)
+
+    def pan(self, dx : float, dy : float) -> None:
+        '''
+        Move the view by a number of pixels.
+        '''
+        self.origin()
+        self.center_x += dx
+        self.center_y += dy
+        self.update()
+
+    def zoom(self, steps : int, anchor : QPoint = None) -> None:
+        '''
+        Change the cell size, keeping the point under the anchor (widget coordinates) in place.
+        '''
+        cell_size = min(max(self.cell_size + steps * max(1, self.cell_size // 8), self.MIN_CELL_SIZE),
+                        self.MAX_CELL_SIZE)
+        if cell_size == self.cell_size:
+            return
+        if anchor is None:
+            anchor = self.rect().center()
+        # The anchor moves away from the center as the board grows: move the center as much
+        offset_x, offset_y = anchor.x() - self.width() / 2, anchor.y() - self.height() / 2
+        self.pan(offset_x, offset_y)
+        self.set_cell_size(cell_size)
+        self.pan(-offset_x, -offset_y)
+
+    def cell_rect(self, row : int, col : int) -> QRect:
+        left, top = self.origin()
+        return QRect(col * self.pitch - left, row * self.pitch - top, self.cell_size, self.cell_size)
+
+    def cell_at(self, x : int, y : int) -> tuple[int, int] | None:
+        '''
+        Hit-test a position in widget coordinates.
+
+        :return: The (row, col) of the cell under the position, None in the gaps.
+        '''
+        left, top = self.origin()
+        col, x_offset = divmod(int(x) + left, self.pitch)
+        row, y_offset = divmod(int(y) + top, self.pitch)
+        if x_offset >= self.cell_size or y_offset >= self.cell_size:
+            return None
+        return row, col
+
+    def _planes(self, row : int, col : int, create : bool = False) -> tuple[bytearray, bytearray] | None:
+        key = (row // self.CHUNK, col // self.CHUNK)
+        planes = self._chunks.get(key)
+        if planes is None and create:
+            planes = self._chunks[key] = (bytearray(self.CHUNK * self.CHUNK), bytearray(self.CHUNK * self.CHUNK))
+        return planes
+
+    def _index(self, row : int, col : int) -> int:
+        return row % self.CHUNK * self.CHUNK + col % self.CHUNK
+
+    def state(self, row : int, col : int) -> int:
+        planes = self._planes(row, col)
+        return planes[0][self._index(row, col)] if planes is not None else BoardWidget.HIDDEN
+
+    def flag(self, row : int, col : int) -> int:
+        planes = self._planes(row, col)
+        return planes[1][self._index(row, col)] if planes is not None else 0
+
+    def number(self, row : int, col : int) -> int:
+        state = self.state(row, col)
+        return state >> BoardWidget.VALUE_SHIFT if state & BoardWidget.KIND_MASK == BoardWidget.NUMBER else 0
+
+    def _sprite(self, group : str) -> int:
+        path = st.get_random_image(group)
+        return AssetCache.GROUPS[group].index(path) + 1
+
+    def reveal_cell(self, type : str, cell : EndlessCellRef, adjacent_mines : int = None) -> None:
+        '''
+        Same behavior as BoardWidget.reveal_cell.
+        '''
+        states, flags = self._planes(cell.row, cell.col, create=True)
+        index = self._index(cell.row, cell.col)
+        if states[index] & BoardWidget.KIND_MASK != BoardWidget.HIDDEN or flags[index]:
+            return
+        if type == 'mine':
+            states[index] = BoardWidget.SPIRIT | self._sprite('spirits') << BoardWidget.VALUE_SHIFT
+        elif type == 'safe':
+            states[index] = BoardWidget.FLOOR | self._sprite('floors') << BoardWidget.VALUE_SHIFT
+        else:
+            states[index] = BoardWidget.NUMBER | adjacent_mines << BoardWidget.VALUE_SHIFT
+        self.invalidate_cell(cell.row, cell.col)
+
+    def flag_cell(self, flag : bool, cell : EndlessCellRef) -> bool:
+        '''
+        Same behavior as BoardWidget.flag_cell.
+
+        :return: True if a flag was put on the cell.
+        '''
+        flags = self._planes(cell.row, cell.col, create=True)[1]
+        index = self._index(cell.row, cell.col)
+        if not flags[index] and flag:
+            flags[index] = self._sprite('sigils')
+        elif flags[index] and not flag:
+            flags[index] = 0
+        else:
+            return False
+        self.invalidate_cell(cell.row, cell.col)
+        return flag
+
+    def set_number(self, row : int, col : int, number : int) -> None:
+        planes = self._planes(row, col)
+        index = self._index(row, col)
+        if planes is not None and planes[0][index] & BoardWidget.KIND_MASK == BoardWidget.NUMBER:
+            planes[0][index] = BoardWidget.NUMBER | number << BoardWidget.VALUE_SHIFT
+            self.invalidate_cell(row, col)
+
+    def hide_cell(self, row : int, col : int) -> None:
+        planes = self._planes(row, col)
+        if planes is not None and planes[0][self._index(row, col)]:
+            planes[0][self._index(row, col)] = BoardWidget.HIDDEN
+            self.invalidate_cell(row, col)
+
+    def invalidate_cell(self, row : int, col : int) -> None:
+        '''
+        Schedule a repaint if the cell is in view; the repaints of one event loop turn are merged.
+        '''
+        if self.rect().intersects(self.cell_rect(row, col)):
+            self.update()
+
+    def mousePressEvent(self, event) -> None:
+        position = event.position()
+        if event.button() == Qt.MouseButton.LeftButton:
+            # A click or the start of a drag, told apart on move and release
+            self._press = self._drag_from = position
+            return
+        cell = self.cell_at(position.x(), position.y())
+        if cell is None:
+            return
+        if event.button() == Qt.MouseButton.RightButton:
+            self.click_signal.emit("right", EndlessCellRef(self, *cell))
+        elif event.button() == Qt.MouseButton.MiddleButton:
+            self.click_signal.emit("chord", EndlessCellRef(self, *cell))
+
+    def mouseMoveEvent(self, event) -> None:
+        if self._drag_from is None:
+            return
+        position = event.position()
+        if self._press is not None:
+            if (position - self._press).manhattanLength() < QApplication.startDragDistance():
+                return
+            self._press = None
+        self.pan(self._drag_from.x() - position.x(), self._drag_from.y() - position.y())
+        self._drag_from = position
+
+    def mouseReleaseEvent(self, event) -> None:
+        if event.button() != Qt.MouseButton.LeftButton:
+            return
+        press, self._press, self._drag_from = self._press, None, None
+        if press is None:
+            return
+        cell = self.cell_at(press.x(), press.y())
+        if cell is not None:
+            self.click_signal.emit("left", EndlessCellRef(self, *cell))
+
+    def mouseDoubleClickEvent(self, event) -> None:
+        '''
+        A left double click chords, the other buttons behave as single clicks.
+        '''
+        if event.button() != Qt.MouseButton.LeftButton:
+            self.mousePressEvent(event)
+            return
+        position = event.position()
+        cell = self.cell_at(position.x(), position.y())
+        if cell is not None:
+            self.click_signal.emit("chord", EndlessCellRef(self, *cell))
+
+    def wheelEvent(self, event) -> None:
+        delta = event.angleDelta()
+        if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            self.zoom(1 if delta.y() > 0 else -1, event.position().toPoint())
+        elif event.modifiers() & Qt.KeyboardModifier.ShiftModifier:
+            self.pan(-delta.y() / 2, 0)
+        else:
+            self.pan(-delta.x() / 2, -delta.y() / 2)
+        event.accept()
+
+    def keyPressEvent(self, event) -> None:
+        moves = {Qt.Key.Key_Left: (-1, 0), Qt.Key.Key_Right: (1, 0), Qt.Key.Key_Up: (0, -1), Qt.Key.Key_Down: (0, 1)}
+        if event.key() in moves:
+            dx, dy = moves[event.key()]
+            self.pan(dx * self.pitch, dy * self.pitch)
+        elif event.key() == Qt.Key.Key_Home:
+            self.center_x = self.center_y = None
+            self.update()
+        else:
+            super().keyPressEvent(event)
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        rect = event.rect()
+        left, top = self.origin()
+        pitch = self.pitch
+        size = self.cell_size
+        radius = min(4, size // 4)
+        groups = {BoardWidget.FLOOR: st.FLOOR_IMAGES, BoardWidget.SPIRIT: st.SPIRIT_IMAGES}
+        border = QPen(BoardWidget.BORDER, 1)
+        painter.setPen(border)
+        painter.setBrush(BoardWidget.BACKGROUND)
+        painter.setFont(self.font)
+        for row in range((rect.top() + top) // pitch, (rect.bottom() + top) // pitch + 1):
+            for col in range((rect.left() + left) // pitch, (rect.right() + left) // pitch + 1):
+                cell = QRect(col * pitch - left, row * pitch - top, size, size)
+                painter.drawRoundedRect(cell, radius, radius)
+                planes = self._planes(row, col)
+                if planes is None:
+                    continue
+                index = self._index(row, col)
+                state, flag = planes[0][index], planes[1][index]
+                kind, value = state & BoardWidget.KIND_MASK, state >> BoardWidget.VALUE_SHIFT
+                if flag:
+                    painter.drawPixmap(cell, self.assets.scaled(st.SIGIL_IMAGES[flag - 1]))
+                elif kind in groups:
+                    painter.drawPixmap(cell, self.assets.scaled(groups[kind][value - 1]))
+                elif kind == BoardWidget.NUMBER and value:
+                    painter.setPen(BoardWidget.TEXT)
+                    painter.drawText(cell, Qt.AlignmentFlag.AlignCenter, str(value))
+                    painter.setPen(border)
+        painter.end()
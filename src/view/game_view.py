@@ -1,8 +1,10 @@
-from PyQt6.QtWidgets import QGridLayout, QPushButton, QWidget, QDialog, QVBoxLayout, QLabel, QHBoxLayout, QComboBox
-from PyQt6.QtCore import Qt, QSize, pyqtSignal, QUrl
-from PyQt6.QtGui import QPixmap, QIcon, QFont, QFontDatabase
-from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
+from PyQt6.QtWidgets import QGridLayout, QPushButton, QWidget, QDialog, QVBoxLayout, QLabel, QHBoxLayout, QComboBox, QMessageBox
+from PyQt6.QtCore import Qt, QSize, QTimer, pyqtSignal
+from PyQt6.QtGui import QIcon, QFont, QFontDatabase, QKeySequence, QShortcut
 import settings as st
+from .asset_cache import AssetCache
+from .board_widget import BoardView, BoardWidget, CellRef, EndlessBoardWidget
+from .sound_engine import SoundEngine
 
 class CustomButton(QPushButton):
     # Define a custom signal to emit click type and button reference
@@ -21,43 +23,80 @@ class CustomButton(QPushButton):
 
     def mousePressEvent(self, event : Qt.MouseButton) -> None:
         '''
-        Override mousePressEvent to differentiate between left and right clicks.
+        Override mousePressEvent to differentiate between left, right and middle (chord) clicks.
         '''
         if event.button() == Qt.MouseButton.LeftButton:
             self.click_signal.emit("left", self)  # Emit signal with click type and button
         elif event.button() == Qt.MouseButton.RightButton:
             self.click_signal.emit("right", self)  # Emit signal with click type and button
+        elif event.button() == Qt.MouseButton.MiddleButton:
+            self.click_signal.emit("chord", self)
+
+    def mouseDoubleClickEvent(self, event : Qt.MouseButton) -> None:
+        '''
+        A left double click chords (the first click already revealed the cell).
+        '''
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.click_signal.emit("chord", self)
+        else:
+            self.mousePressEvent(event)
 
 class GameView(QWidget):
-    def __init__(self, board_settings : tuple[int, int, int, str]) -> None:
+    # Above this number of cells, the board is painted by a single BoardWidget instead of buttons
+    PAINTED_THRESHOLD = 1024
+    # Default size of the cells of a painted board too large for the window, in pixels
+    MIN_CELL_SIZE = 12
+    # Difficulty of the endless games and the size of their cells, in pixels
+    ENDLESS = 'Endless'
+    ENDLESS_CELL_SIZE = 28
+
+    # Font families loaded in the application, by font file (a new game does not load them again)
+    _font_families = {}
+
+    def __init__(self, board_settings : tuple[int, int, int, str], painted : bool = None) -> None:
         super().__init__()
 
         self.buttons = []        
-        self.initUI(board_settings)
+        self.board_widget = None
+        self.board_view = None
+        self.board_area = None
+        self.initUI(board_settings, painted)
         self.show()
+        # Fonts, sounds and dialog images are loaded once the event loop has shown the board
+        QTimer.singleShot(0, self.load_deferred)
+
+    @classmethod
+    def font_family(cls, path : str) -> str:
+        '''
+        Load a font file in the application the first time and return its family.
+        '''
+        family = cls._font_families.get(path)
+        if family is None:
+            font_id = QFontDatabase.addApplicationFont(path)
+            family = cls._font_families[path] = QFontDatabase.applicationFontFamilies(font_id)[0]
+        return family
 
-    def initUI(self, board_settings : tuple[int, int, int, str]) -> None:
+    def initUI(self, board_settings : tuple[int, int, int, str], painted : bool = None) -> None:
         '''
         Initialize the user interface
+        :param painted: Paint the board with a BoardWidget (True) or use buttons (False).
+                        By default, only the boards of more than PAINTED_THRESHOLD cells are painted.
         '''
         self.setWindowTitle("Haunted Manor")
         self.setFixedSize(700, 700)
         self.setWindowIcon(QIcon(st.ICON_PATH))
         self.center_window()
-        # Set the size of the buttons/icons based on the difficulty
-        self.button_size = min(600 // board_settings[0], 600 // board_settings[1])
-        self.icon_size = self.button_size
-        self.font_1_size = self.button_size - 10
+        self.set_board_size(board_settings, painted)
+        # Sprites decoded once and pre-scaled to the icon size
+        self.assets = AssetCache(self.icon_size)
         
         
-        # Set up the fonts
-        self.font_id = QFontDatabase.addApplicationFont(st.FONT_PATH_1)
-        self.font_family = QFontDatabase.applicationFontFamilies(self.font_id)[0]
-        self.font = QFont(self.font_family, self.font_1_size)
-        
-        self.font_id = QFontDatabase.addApplicationFont(st.FONT_PATH_2)
-        self.font_family = QFontDatabase.applicationFontFamilies(self.font_id)[0]
-        self.font_2 = QFont(self.font_family, 12)
+        # Default fonts until the font files are loaded (see load_fonts)
+        self.fonts_loaded = False
+        self.font = QFont()
+        self.font.setPointSize(self.font_1_size)
+        self.font_2 = QFont()
+        self.font_2.setPointSize(12)
         self.font_2.setWeight(QFont.Weight.Bold)
 
         main_layout = QVBoxLayout()
@@ -127,12 +166,12 @@ class GameView(QWidget):
         top_bar.addWidget(self.new_game_button)
 
         # Difficulty selector
-        difficulty_label = QLabel("Difficulty:")
-        difficulty_label.setFont(QFont(self.font_2))
-        top_bar.addWidget(difficulty_label)
+        self.difficulty_label = QLabel("Difficulty:")
+        self.difficulty_label.setFont(QFont(self.font_2))
+        top_bar.addWidget(self.difficulty_label)
 
         self.difficulty_selector = QComboBox()
-        self.difficulty_selector.addItems(["Easy", "Medium", "Hard"])
+        self.difficulty_selector.addItems(["Easy", "Medium", "Hard", self.ENDLESS])
         self.difficulty_selector.setFont(QFont(self.font_2))
         self.difficulty_selector.setStyleSheet("QComboBox { background-color: transparent; color: white; }")
         self.difficulty_selector.setCurrentText(board_settings[3])
@@ -141,6 +180,14 @@ class GameView(QWidget):
         # Add top bar to main layout
         main_layout.addLayout(top_bar)
 
+        # Undo / redo shortcuts (Ctrl+Z, Ctrl+Y or the platform keys)
+        self.undo_shortcut = QShortcut(QKeySequence(QKeySequence.StandardKey.Undo), self)
+        redo_keys = QKeySequence.keyBindings(QKeySequence.StandardKey.Redo)
+        if QKeySequence("Ctrl+Y") not in redo_keys:
+            redo_keys.append(QKeySequence("Ctrl+Y"))
+        self.redo_shortcut = QShortcut(self)
+        self.redo_shortcut.setKeys(redo_keys)
+
         # # # Set up the background music
         # self.player = QMediaPlayer()
         # self.audio_output = QAudioOutput()
@@ -149,15 +196,91 @@ class GameView(QWidget):
         # self.audio_output.setVolume(0.2)
         # self.player.play()
         
-        # Set Sounds effects
-        self.player_2 = QMediaPlayer()
-        self.audio_output_2 = QAudioOutput() 
-        self.player_2.setAudioOutput(self.audio_output_2)
-        self.audio_output_2.setVolume(0.5)
+        # Set Sounds effects (preloaded, several can overlap), created by load_deferred
+        self.sounds = None
  
+        self.board_area = self.build_board(board_settings)
+        main_layout.addWidget(self.board_area, 1)
+
+    def load_deferred(self) -> None:
+        '''
+        Load what the first frame does not need: the fonts, the sound effects and the dialog images.
+        '''
+        self.load_fonts()
+        if self.sounds is None:
+            self.sounds = SoundEngine()
+        self.assets.preload_dialogs()
+
+    def load_fonts(self) -> None:
+        '''
+        Load the font files and apply them to the top bar and the cells.
+        '''
+        if self.fonts_loaded:
+            return
+        self.fonts_loaded = True
+        self.font = QFont(self.font_family(st.FONT_PATH_1), self.font_1_size)
+        self.font_2 = QFont(self.font_family(st.FONT_PATH_2), 12)
+        self.font_2.setWeight(QFont.Weight.Bold)
+        for widget in (self.mine_counter, self.help_button, self.new_game_button, self.difficulty_label,
+                       self.difficulty_selector):
+            widget.setFont(QFont(self.font_2))
+        if self.board_widget is not None:
+            self.board_widget.set_font(self.font)
+            return
+        for row in self.buttons:
+            for btn in row:
+                if btn.text():
+                    btn.setFont(self.font)
+
+    def set_board_size(self, board_settings : tuple[int, int, int, str], painted : bool = None) -> None:
+        '''
+        Choose how the board is drawn and the size of its cells.
+        '''
+        self.rows, self.cols = board_settings[0], board_settings[1]
+        self.endless = board_settings[3] == self.ENDLESS
+        if self.endless:
+            # Unbounded board: always painted, in a viewport the size of the window
+            self.button_size = self.icon_size = self.ENDLESS_CELL_SIZE
+            self.painted = True
+            self.font_1_size = self.button_size - 10
+            return
+        # Set the size of the buttons/icons based on the difficulty
+        self.button_size = min(600 // self.rows, 600 // self.cols)
+        if painted is None:
+            painted = self.rows * self.cols > self.PAINTED_THRESHOLD
+        if painted:
+            self.button_size = max(self.button_size, self.MIN_CELL_SIZE)
+        self.painted = painted
+        self.icon_size = self.button_size
+        self.font_1_size = max(self.button_size - 10, 1)
+
+    def build_board(self, board_settings : tuple[int, int, int, str]) -> QWidget:
+        '''
+        Create the cells of the board.
+        :return: The widget holding the board, to put in the main layout.
+        '''
+        self.buttons = []
+        self.board_widget = None
+        self.board_view = None
+        if self.endless:
+            # Panned with the mouse and the arrow keys, zoomed with Ctrl + wheel
+            self.board_widget = EndlessBoardWidget(self.button_size, self.assets, self.font)
+            self.buttons = self.board_widget.cells()
+            return self.board_widget
+        if self.painted:
+            # One widget painting the whole board
+            self.board_widget = BoardWidget(board_settings[0], board_settings[1], self.button_size, self.assets,
+                                            self.font, spacing=2 if self.button_size >= 8 else 1)
+            # Scrollable and zoomable (Ctrl + wheel), only the visible tiles are painted
+            self.board_view = BoardView(self.board_widget)
+            self.buttons = self.board_widget.cells()
+            return self.board_view
+
         # Create a grid layout
-        grid_layout = QGridLayout()
+        board_area = QWidget()
+        grid_layout = QGridLayout(board_area)
         grid_layout.setSpacing(2)
+        grid_layout.setContentsMargins(0, 0, 0, 0)
 
         # Add buttons to the grid
         for row in range(board_settings[0]):
@@ -172,9 +295,57 @@ class GameView(QWidget):
                 row_buttons.append(btn)
                 grid_layout.addWidget(btn, row, col)
             self.buttons.append(row_buttons)
+        return board_area
+
+    def reset(self, board_settings : tuple[int, int, int, str], painted : bool = None) -> bool:
+        '''
+        Prepare the view for a new game, keeping the window, the fonts, the sprites and the sounds.
+        The cells are only cleared when the board keeps its size, they are created again otherwise.
+        :return: True if new cells were created (their clicks must be connected again).
+        '''
+        endless = board_settings[3] == self.ENDLESS
+        if endless:
+            self.update_view_score(0)
+        else:
+            self.update_view_mine_counter(board_settings[2])
+        # Show the difficulty of the new game without notifying the controller again
+        self.difficulty_selector.blockSignals(True)
+        self.difficulty_selector.setCurrentText(board_settings[3])
+        self.difficulty_selector.blockSignals(False)
+
+        if endless:
+            painted = True
+        elif painted is None:
+            painted = board_settings[0] * board_settings[1] > self.PAINTED_THRESHOLD
+        if (board_settings[0], board_settings[1], painted, endless) == (self.rows, self.cols, self.painted, self.endless):
+            self.clear_board()
+            return False
+
+        self.set_board_size(board_settings, painted)
+        self.assets.set_icon_size(self.icon_size)
+        self.font = QFont(self.font.family(), self.font_1_size)
+        old_area = self.board_area
+        self.board_area = self.build_board(board_settings)
+        self.layout().replaceWidget(old_area, self.board_area)
+        old_area.deleteLater()
+        return True
+
+    def clear_board(self) -> None:
+        '''
+        Hide every cell of the current board.
+        '''
+        if self.board_widget is not None:
+            self.board_widget.reset()
+            return
+        no_icon = QIcon()
+        for row in self.buttons:
+            for btn in row:
+                if btn.revealed or btn.flagged:
+                    btn.setIcon(no_icon)
+                    btn.setText("")
+                    btn.revealed = False
+                    btn.flagged = False
 
-        # Add grid layout to main layout
-        main_layout.addLayout(grid_layout)     
     def on_click(self) -> None:
         '''
         Handle button click event
@@ -184,21 +355,36 @@ class GameView(QWidget):
     def get_buttons(self) -> list[list[CustomButton]]:
         '''
         Return all buttons as a 2D list
+        (CellRef objects created on demand when the board is painted)
         '''
         return self.buttons
     
+    def connect_cell_clicks(self, slot) -> None:
+        '''
+        Connect the click signal of every cell to a slot taking the click type and the cell.
+        '''
+        if self.board_widget is not None:
+            # One signal for the whole painted board
+            self.board_widget.click_signal.connect(slot)
+            return
+        for row in self.buttons:
+            for btn in row:
+                btn.click_signal.connect(slot)
+    
     def reveal_cell(self, type : str, button : CustomButton, adjacent_mines : int = None) -> None:
+        if isinstance(button, CellRef):
+            button.board.reveal_cell(type, button, adjacent_mines)
+            return
         # Put an icon only if the button is not already revealed
         
         if not button.revealed and not button.flagged:
             if type == 'mine':
                 # SPIRIT
-                button.setIcon(QIcon(st.get_random_image('spirits')))
+                button.setIcon(self.assets.random_icon('spirits'))
                 button.setIconSize(QSize(self.icon_size, self.icon_size))
-                print(st.get_random_image('spirits'))
             elif type == 'safe':
                 # FLOOR
-                button.setIcon(QIcon(st.get_random_image('floors')))
+                button.setIcon(self.assets.random_icon('floors'))
                 button.setIconSize(QSize(self.icon_size, self.icon_size))
                 # self.play_sound('floor')
             else:
@@ -209,9 +395,13 @@ class GameView(QWidget):
             button.revealed = True
     
     def flag_cell(self, flag : bool, button : CustomButton) -> None:
+        if isinstance(button, CellRef):
+            if button.board.flag_cell(flag, button):
+                self.play_sound('sigil')
+            return
         # Put an icon only if the button is not already flagged
         if not button.flagged and flag: 
-            button.setIcon(QIcon(st.get_random_image('sigils')))
+            button.setIcon(self.assets.random_icon('sigils'))
             button.setIconSize(QSize(self.icon_size, self.icon_size))
             button.flagged = True 
             self.play_sound('sigil')
@@ -220,6 +410,18 @@ class GameView(QWidget):
             button.setIcon(QIcon())
             button.flagged = False
 
+    def hide_cell(self, button : CustomButton) -> None:
+        '''
+        Turn a revealed cell back to hidden (undo).
+        '''
+        if isinstance(button, CellRef):
+            button.board.hide_cell(button.row, button.col)
+            return
+        if button.revealed:
+            button.setIcon(QIcon())
+            button.setText("")
+            button.revealed = False
+
     def show_message(self, type : str) -> None:
         '''
         Display a message with an image
@@ -244,7 +446,7 @@ class GameView(QWidget):
             
         # Create label for the image
         image_label = QLabel()
-        pixmap = QPixmap(image_path)
+        pixmap = self.assets.pixmap(image_path)
         image_label.setPixmap(pixmap)
         image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
     
@@ -253,23 +455,38 @@ class GameView(QWidget):
         dialog.resize(800, 400)
         dialog.exec()
 
+    def ask_resume(self) -> bool:
+        '''
+        Ask whether to resume the game saved when the application was last closed.
+        '''
+        answer = QMessageBox.question(self, "Unfinished Haunting", "Resume the game left unfinished?",
+                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        return answer == QMessageBox.StandardButton.Yes
+
     def update_view_mine_counter(self, mine_counter : int) -> None:
         '''
         Update the mine counter label
         '''
         self.mine_counter.setText(f"Mines: {mine_counter}")
+
+    def update_view_score(self, score : int) -> None:
+        '''
+        Show the score of an endless game (safe cells revealed) in place of the mine counter.
+        '''
+        self.mine_counter.setText(f"Score: {score}")
         
     def play_sound(self, sound_type: str) -> None:
         """
         Play a sound based on the provided sound type.
 
-        This function plays a sound corresponding to the specified `sound_type`. If `sound_type`
-        matches one of the predefined cases, the corresponding sound file is played. If `sound_type`
-        does not match any predefined case, a default sound (associated with '3') is played.
+        This function plays a sound corresponding to the specified `sound_type` from the sounds
+        preloaded by the SoundEngine. If `sound_type` does not match any predefined case,
+        a default sound (associated with '3') is played.
 
         :param sound_type: A string representing the type of sound to play. It can be one of the following:
                         - 'game_over': Plays the game over sound.
                         - 'victory': Plays the victory sound.
+                        - 'sigil': Plays the sigil sound.
                         - 'floor': Plays a random floor sound.
                         - '1': Plays the sound associated with the number 1.
                         - '2': Plays the sound associated with the number 2.
@@ -279,27 +496,10 @@ class GameView(QWidget):
         :raises: This function does not explicitly raise any exceptions. If an invalid `sound_type` is provided,
                 it defaults to playing the sound associated with '3'.
         """
-        match sound_type:
-            case 'game_over':
-                file_path = st.GAME_OVER_PATH
-            case 'victory':
-                file_path = st.VICTORY_PATH
-            case 'sigil':
-                file_path = st.SIGIL_PATH
-            case 'floor':
-                file_path = st.get_random_image('floor_sound')
-            case '1':
-                file_path = st.NUMBERS_SOUNDS[0]
-            case '2':
-                file_path = st.NUMBERS_SOUNDS[1]
-            case '3':
-                file_path = st.NUMBERS_SOUNDS[2]
-            case _:
-                file_path = st.NUMBERS_SOUNDS[2]  # Default to '3' sound if `sound_type` is unrecognized
-                
-        # Set the source of the player to the chosen file path and play the sound
-        self.player_2.setSource(QUrl.fromLocalFile(file_path))
-        self.player_2.play()
+        if self.sounds is None:
+            # A sound requested before the deferred loading
+            self.sounds = SoundEngine()
+        self.sounds.play(sound_type)
      
     def center_window(self) -> None:
         '''
@@ -0,0 +1,161 @@
+'''
+Sound effects preloaded in memory and played through a small pool of voices.
+
+The files are read once per process. Each voice is a player fed from an in-memory buffer:
+a voice already holding the requested sound is simply rewound, and overlapping effects
+go to different voices instead of cutting each other off.
+'''
+import os
+import settings as st
+
+
+class NullSoundBackend:
+    '''
+    Silent backend, for the tests and the machines without audio.
+    The sounds played are recorded in `played` as (voice, path).
+    '''
+
+    def __init__(self, voices : int) -> None:
+        self.played = []
+        self.playing = set()
+        self._loaded = [None] * voices
+
+    def load(self, voice : int, path : str, data : bytes) -> None:
+        self._loaded[voice] = path
+
+    def play(self, voice : int) -> None:
+        self.playing.add(voice)
+        self.played.append((voice, self._loaded[voice]))
+
+    def is_playing(self, voice : int) -> bool:
+        return voice in self.playing
+
+    def finish(self) -> None:
+        '''
+        Pretend every voice reached the end of its sound.
+        '''
+        self.playing.clear()
+
+
+class QtSoundBackend:
+    '''
+    One QMediaPlayer per voice, reading its sound from a QBuffer.
+    '''
+
+    def __init__(self, voices : int, volume : float = 0.5) -> None:
+        from PyQt6.QtCore import QBuffer, QIODevice, QUrl
+        from PyQt6.QtMultimedia import QAudioOutput, QMediaPlayer
+        self._url = QUrl
+        self._read_only = QIODevice.OpenModeFlag.ReadOnly
+        self._players = []
+        self._outputs = []
+        self._buffers = []
+        for _ in range(voices):
+            player = QMediaPlayer()
+            output = QAudioOutput()
+            output.setVolume(volume)
+            player.setAudioOutput(output)
+            self._players.append(player)
+            self._outputs.append(output)
+            self._buffers.append(QBuffer())
+        self._stopped = QMediaPlayer.PlaybackState.StoppedState
+
+    def load(self, voice : int, path : str, data : bytes) -> None:
+        player = self._players[voice]
+        player.stop()
+        buffer = self._buffers[voice]
+        buffer.close()
+        buffer.setData(data)
+        buffer.open(self._read_only)
+        # The URL only tells the decoder the file type
+        player.setSourceDevice(buffer, self._url.fromLocalFile(path))
+
+    def play(self, voice : int) -> None:
+        player = self._players[voice]
+        player.setPosition(0)
+        player.play()
+
+    def is_playing(self, voice : int) -> bool:
+        return self._players[voice].playbackState() != self._stopped
+
+
+def create_backend(voices : int):
+    '''
+    Pick the audio backend: the null one if MINESWEEPER_AUDIO=null or if Qt Multimedia is not available.
+    '''
+    if os.environ.get('MINESWEEPER_AUDIO', '').lower() == 'null':
+        return NullSoundBackend(voices)
+    try:
+        return QtSoundBackend(voices)
+    except ImportError:
+        # Qt Multimedia or its system libraries are missing
+        return NullSoundBackend(voices)
+
+
+class SoundEngine:
+    '''
+    Play the sound effects of the game by name ('sigil', 'floor', 'game_over', 'victory', '1', '2', '3').
+    '''
+    SOUNDS = {
+        'game_over': [st.GAME_OVER_PATH],
+        'victory': [st.VICTORY_PATH],
+        'sigil': [st.SIGIL_PATH],
+        'floor': st.FLOOR_SOUNDS,
+        '1': [st.NUMBERS_SOUNDS[0]],
+        '2': [st.NUMBERS_SOUNDS[1]],
+        '3': [st.NUMBERS_SOUNDS[2]],
+    }
+    # Sound played for an unknown name
+    DEFAULT = '3'
+
+    # Content of the sound files, by path (read once per process)
+    _data = {}
+
+    def __init__(self, voices : int = 4, backend = None) -> None:
+        self.voices = voices
+        self.backend = backend if backend is not None else create_backend(voices)
+        # Path loaded in each voice, and the voices from the least to the most recently started
+        self._loaded = [None] * voices
+        self._order = list(range(voices))
+        self.preload()
+
+    @classmethod
+    def preload(cls) -> None:
+        '''
+        Read every sound file in memory. A missing file is remembered as silent.
+        '''
+        for paths in cls.SOUNDS.values():
+            for path in paths:
+                if path not in cls._data:
+                    try:
+                        with open(path, 'rb') as file:
+                            cls._data[path] = file.read()
+                    except OSError:
+                        cls._data[path] = None
+
+    def _voice_for(self, path : str) -> int:
+        '''
+        Choose a voice: an idle one already holding the sound, else any idle one, else the oldest.
+        '''
+        idle = [voice for voice in self._order if not self.backend.is_playing(voice)]
+        for voice in idle:
+            if self._loaded[voice] == path:
+                return voice
+        return idle[0] if idle else self._order[0]
+
+    def play(self, name : str) -> None:
+        '''
+        Play a sound effect.
+        :param name: The name of the effect, a random one is chosen for the groups ('floor').
+        '''
+        path = st.ASSETS_RNG.choice(self.SOUNDS.get(name, self.SOUNDS[self.DEFAULT]))
+        data = self._data.get(path)
+        if not data:
+            return
+        voice = self._voice_for(path)
+        if self._loaded[voice] != path:
+            self.backend.load(voice, path, data)
+            self._loaded[voice] = path
+        self.backend.play(voice)
+        self._order.remove(voice)
+        self._order.append(voice)